@@ -0,0 +1 @@
+"""Performance benchmarks of xban, run from the repository root"""
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Compare cold and warm load times of process_yaml
+
+    python -m benchmarks.bench_cache --columns 40 --tiles 1500
+
+cold: empty cache (parse and store), warm: cache hit, nocache: parse
+only. The pure python loader is reported as the reference.
+"""
+
+import os
+import argparse
+import tempfile
+from unittest.mock import patch
+
+import yaml
+from xban.io import process_yaml
+from xban.cache import ParseCache
+from xban.generate import write_board
+from benchmarks.common import timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--columns", type=int, default=40)
+    parser.add_argument("--tiles", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filepath = os.path.join(temp_dir, "board.yaml")
+        write_board(filepath, columns=args.columns, tiles=args.tiles)
+        cache = ParseCache(os.path.join(temp_dir, "cache"))
+
+        def cold():
+            if os.path.isdir(cache.cache_dir):
+                cache.clear()
+            process_yaml(filepath, cache)
+
+        results = {"nocache": timed(lambda: process_yaml(filepath), args.repeat)}
+        with patch("xban.io.Loader", yaml.SafeLoader):
+            results["nocache (pure python)"] = timed(
+                lambda: process_yaml(filepath), args.repeat
+            )
+        results["cold"] = timed(cold, args.repeat)
+        process_yaml(filepath, cache)
+        results["warm"] = timed(lambda: process_yaml(filepath, cache), args.repeat)
+
+        size = os.path.getsize(filepath) / 1024 ** 2
+        print(f"{args.columns} columns x {args.tiles} tiles, {size:.1f} MB")
+        for name, seconds in results.items():
+            print(f"{name:>24}: {seconds * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Shared helpers of the benchmarks"""
+
+import time
+
+
+def timed(func, repeat):
+    """Best wall time of func over repeat runs in seconds"""
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Headless performance benchmarks of xban
+
+    python -m benchmarks.run                       # quick sizes
+    python -m benchmarks.run --full                # 10 to 100k tiles
+    python -m benchmarks.run --save-baseline       # store the baseline
+
+Every case runs on synthetic boards of several sizes (columns x tiles
+per column) with the offscreen Qt platform. The median and the best
+time of --repeat runs and the peak python memory of one run
+(tracemalloc, Qt allocations are not included) are written to --output
+as JSON. If a baseline exists, the cases whose median time or memory
+exceed the baseline by more than --tolerance (and by more than the
+noise floor MIN_TIME / MIN_MEMORY) are reported and fail the run.
+
+The speed of a machine drifts with its load, so every result records
+the time of a fixed python workload run before the cases of its size
+(calibrate). The baseline times are scaled by the ratio of the
+calibrations before they are compared. On another machine --advisory
+only reports the regressions.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import platform
+import tempfile
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import yaml  # noqa: E402
+from PySide6 import __version__ as pyside_version  # noqa: E402
+from PySide6.QtCore import Qt, QEvent, QModelIndex  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from xban.io import process_yaml, xban_content, save_yaml  # noqa: E402
+from xban.board import BanBoard, SubBoard  # noqa: E402
+from xban.generate import write_board  # noqa: E402
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(BASE_PATH, "baseline.json")
+
+# (columns, tiles per column)
+QUICK_SIZES = [(1, 10), (10, 100), (50, 10)]
+FULL_SIZES = QUICK_SIZES + [(1, 10000), (40, 1500), (100, 1000), (500, 200)]
+
+# absolute differences below these are treated as noise
+MIN_TIME = 0.02
+MIN_MEMORY = 1024 ** 2
+
+CASES = {}
+
+
+def case(name):
+    """Register a benchmark case
+
+    The case function is called with a Fixture before every run and
+    returns the function to measure, so the setup is not measured.
+    """
+
+    def register(func):
+        CASES[name] = func
+        return func
+
+    return register
+
+
+class Fixture:
+    """Synthetic board of a given size, written to a temporary file
+
+    The board is generated with a fixed seed, see xban.generate.
+    """
+
+    def __init__(self, columns, tiles, temp_dir):
+        self.columns = columns
+        self.tiles = tiles
+        self.filepath = os.path.join(temp_dir, f"board_{columns}x{tiles}.yaml")
+        write_board(self.filepath, columns=columns, tiles=tiles, seed=0)
+        self.config = process_yaml(self.filepath)
+        self.widgets = []
+
+    def board(self, **options):
+        board = BanBoard(self.filepath, self.config, **options)
+        self.widgets.append(board)
+        return board
+
+    def cleanup(self):
+        for widget in self.widgets:
+            widget.deleteLater()
+        self.widgets = []
+        QApplication.processEvents()
+        # deferred deletes are not handled by processEvents
+        QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+@case("process_yaml")
+def bench_process_yaml(fixture):
+    return lambda: process_yaml(fixture.filepath)
+
+
+@case("xban_content")
+def bench_xban_content(fixture):
+    """Plain yaml content without the xban configuration"""
+    return lambda: xban_content(fixture.filepath, fixture.config[1:])
+
+
+@case("draw_board")
+def bench_draw_board(fixture):
+    def run():
+        board = BanBoard(fixture.filepath, fixture.config)
+        fixture.widgets.append(board)
+        board.show()
+        QApplication.processEvents()
+
+    return run
+
+
+@case("parse_board")
+def bench_parse_board(fixture):
+    return fixture.board().parse_board
+
+
+@case("save_yaml")
+def bench_save_yaml(fixture):
+    config = fixture.board().parse_board()
+    return lambda: save_yaml(fixture.filepath, config)
+
+
+@case("drag_drop")
+def bench_drag_drop(fixture):
+    """Move the first tile of every column to the next column"""
+
+    board = fixture.board()
+    models = board.model.tile_models
+
+    def run():
+        for src, dst in zip(models, models[1:] + models[:1]):
+            if src.rowCount():
+                mimedata = src.mimeData([src.index(0)])
+                dst.dropMimeData(mimedata, Qt.MoveAction, 0, 0, QModelIndex())
+
+    return run
+
+
+@case("color_change")
+def bench_color_change(fixture):
+    board = fixture.board()
+    subboards = [
+        board.sublayout.itemAt(i).widget() for i in range(fixture.columns)
+    ]
+
+    def run():
+        for subboard in subboards:
+            if isinstance(subboard, SubBoard):
+                subboard.color_change("red" if subboard.color != "red" else "blue")
+
+    return run
+
+
+@case("resize")
+def bench_resize(fixture):
+    """Relayout and repaint the board at a series of widths"""
+
+    board = fixture.board()
+    board.resize(1200, 800)
+    board.show()
+    QApplication.processEvents()
+    widths = [board.width() + step for step in (-200, 150, -100, 250, 0)]
+
+    def run():
+        for width in widths:
+            board.resize(width, 800)
+            QApplication.processEvents()
+            board.repaint()
+
+    return run
+
+
+@case("scroll")
+def bench_scroll(fixture, render="quality"):
+    """Scroll every built column from top to bottom in 20 frames"""
+
+    board = fixture.board(render=render)
+    board.resize(1200, 800)
+    board.show()
+    QApplication.processEvents()
+    widgets = [board.sublayout.itemAt(i).widget() for i in range(fixture.columns)]
+    views = [widget.listview for widget in widgets if isinstance(widget, SubBoard)]
+
+    def run():
+        for view in views:
+            scrollbar = view.verticalScrollBar()
+            for frame in range(21):
+                scrollbar.setValue(scrollbar.maximum() * frame // 20)
+                view.viewport().repaint()
+
+    return run
+
+
+@case("scroll_performance")
+def bench_scroll_performance(fixture):
+    """Scroll with the shadows painted from the cached pixmap"""
+    return bench_scroll(fixture, render="performance")
+
+
+@case("hover")
+def bench_hover(fixture):
+    """Hover over and leave every button of the board"""
+
+    from PySide6.QtWidgets import QPushButton
+
+    board = fixture.board()
+    board.resize(1200, 800)
+    board.show()
+    QApplication.processEvents()
+    buttons = board.findChildren(QPushButton)
+
+    def run():
+        for button in buttons:
+            for kind in (QEvent.HoverEnter, QEvent.HoverLeave):
+                QApplication.sendEvent(button, QEvent(kind))
+        # the buttons are repainted once, as at the next frame
+        QApplication.processEvents()
+
+    return run
+
+
+def measure(name, fixture, repeat):
+    """Median and best time over repeat runs, peak memory of one run"""
+
+    times = []
+    for _ in range(repeat):
+        run = CASES[name](fixture)
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+        fixture.cleanup()
+
+    run = CASES[name](fixture)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    fixture.cleanup()
+    return {"time": statistics.median(times), "best": min(times), "peak_memory": peak}
+
+
+def calibrate(repeat=5):
+    """Median seconds of a fixed python workload, the machine speed"""
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sorted(str(i * 7919 % 100003) for i in range(200000))
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_benchmarks(sizes, cases, repeat, log=print):
+    """Run the cases on every board size, return the results by key"""
+
+    QApplication.instance() or QApplication([])
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for columns, tiles in sizes:
+            fixture = Fixture(columns, tiles, temp_dir)
+            calibration = calibrate()
+            for name in cases:
+                key = f"{name}[{columns}x{tiles}]"
+                results[key] = measure(name, fixture, repeat)
+                results[key]["calibration"] = calibration
+                log(
+                    f"{key:>32}: {results[key]['time'] * 1000:10.2f} ms "
+                    f"{results[key]['peak_memory'] / 1024 ** 2:10.2f} MB"
+                )
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the regressions of results against the baseline
+
+    The median times are compared, a regression exceeds the baseline by
+    more than tolerance (relative) and the noise floor (absolute). The
+    baseline times are scaled by the calibrations of both results.
+    """
+
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        scale = 1.0
+        if base.get("calibration") and result.get("calibration"):
+            scale = result["calibration"] / base["calibration"]
+        for metric, minimum in (("time", MIN_TIME), ("peak_memory", MIN_MEMORY)):
+            expected = base[metric] * scale if metric == "time" else base[metric]
+            limit = expected * (1 + tolerance)
+            if result[metric] > limit and result[metric] - expected > minimum:
+                regressions.append(
+                    f"{key} {metric}: {result[metric]:.4g} > {expected:.4g}"
+                )
+    return regressions
+
+
+def metadata():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pyside": pyside_version,
+        "libyaml": yaml.__with_libyaml__,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="run all sizes")
+    parser.add_argument("--case", action="append", choices=sorted(CASES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument(
+        "--advisory", action="store_true", help="report regressions without failing"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store the results as baseline"
+    )
+    args = parser.parse_args(argv)
+
+    sizes = FULL_SIZES if args.full else QUICK_SIZES
+    results = run_benchmarks(sizes, args.case or list(CASES), args.repeat)
+    with open(args.output, "w") as f:
+        json.dump({"meta": metadata(), "results": results}, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.isfile(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)["results"]
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({"meta": metadata(), "results": baseline}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        print("No baseline to compare with")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f)["results"], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions and not args.advisory else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
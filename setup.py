@@ -27,6 +27,7 @@ setuptools.setup(
     entry_points="""
         [console_scripts]
         xban=xban.xban:cli
+        xban-generate=xban.generate:cli
     """,
     python_requires=">=3.6",
     include_package_data=True,
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""Shared fixtures, the GUI tests run with the offscreen Qt platform"""
+
+import os
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+CONFIG = [
+    {
+        "xban_config": {
+            "title": "testfile",
+            "description": "test board",
+            "board_color": ["red", "teal"],
+        }
+    },
+    {"todo": ["a", "b", "c"], "finished": ["d"]},
+]
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """A single QApplication for all GUI tests"""
+
+    QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    yield app
+
+
+@pytest.fixture
+def file_config():
+    """A fresh copy of the test board configuration"""
+
+    config, content = CONFIG
+    return [
+        {"xban_config": dict(config["xban_config"])},
+        {title: list(tiles) for title, tiles in content.items()},
+    ]
@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""Test the board widgets against the shared board model"""
+
+import time
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import Qt, QModelIndex, QItemSelectionModel  # noqa: E402
+from xban.board import BanBoard, encode_tiles  # noqa: E402
+
+
+@pytest.fixture
+def board(qapp, file_config):
+    return BanBoard("test/testfile.yaml", file_config)
+
+
+def subboards(board):
+    return [
+        board.sublayout.itemAt(i).widget()
+        for i in range(board.sublayout.count() - 1)
+    ]
+
+
+def test_parse_board(board, file_config):
+    """Parse board returns the loaded content"""
+    assert board.parse_board() == file_config
+
+
+def test_model_rows(board):
+    """Each column view displays its own column"""
+    todo, finished = subboards(board)
+    assert todo.listview.model().rowCount() == 3
+    assert todo.listview.model().index(1).data() == "b"
+    assert finished.parse() == ("finished", ["d"])
+
+
+def test_drop_between_columns(board):
+    """Dropping moves all the dragged tiles between the column models"""
+    todo, finished = board.model.tile_models
+    mimedata = todo.mimeData([todo.index(0), todo.index(2)])
+    assert finished.dropMimeData(mimedata, Qt.MoveAction, 1, 0, QModelIndex())
+    assert board.parse_board()[1] == {"todo": ["b"], "finished": ["d", "a", "c"]}
+    assert todo.rowCount() == 1 and finished.rowCount() == 3
+
+
+def test_edit_and_color(board):
+    """Edits and color changes go through the board data"""
+    todo = subboards(board)[0]
+    todo.tile_model.setData(todo.tile_model.index(0), "edited")
+    todo.color_change("green")
+    config, content = board.parse_board()
+    assert content["todo"][0] == "edited"
+    assert config["xban_config"]["board_color"] == ["green", "teal"]
+
+
+def test_column_widgets_follow_data(board):
+    """Column insert, move and delete update the widgets"""
+    board.insert_board(("new", ["x"]), "blue")
+    assert [s.parse()[0] for s in subboards(board)] == ["todo", "finished", "new"]
+
+    board.data.move_column(2, 0)
+    assert [s.parse()[0] for s in subboards(board)] == ["new", "todo", "finished"]
+
+    board.delete_board(subboards(board)[1])
+    assert [s.parse()[0] for s in subboards(board)] == ["new", "finished"]
+    assert board.parse_board()[0]["xban_config"]["board_color"] == ["blue", "teal"]
+
+
+def test_add_and_delete_tiles(board):
+    """Adding selects the new tile, deleting removes the selection"""
+    todo = subboards(board)[0]
+    todo.add_listitem()
+    assert todo.listview.currentIndex().row() == 3
+    todo.listview.selectAll()
+    todo.del_listitem()
+    assert todo.parse() == ("todo", [])
+
+
+def test_save_only_when_dirty(qapp, file_config, tmp_path):
+    """Saving an unchanged board leaves the file alone"""
+    filepath = tmp_path / "board.yaml"
+    filepath.write_text("original")
+    board = BanBoard(str(filepath), file_config)
+    board.save_board()
+    assert filepath.read_text() == "original"
+
+    board.model.tile_models[0].setData(board.model.tile_models[0].index(0), "new")
+    board.save_board()
+    board.saver.flush()
+    assert "- new" in filepath.read_text()
+    assert not board.data.dirty
+
+
+def test_saves_are_coalesced(qapp, file_config, tmp_path, monkeypatch):
+    """Saves requested while writing only write the newest snapshot"""
+    import xban.saver
+
+    writes = []
+
+    def write_yaml(filepath, text):
+        writes.append(text)
+        return True
+
+    monkeypatch.setattr(xban.saver, "write_yaml", write_yaml)
+    board = BanBoard(str(tmp_path / "board.yaml"), file_config)
+    model = board.model.tile_models[0]
+    for text in ["one", "two", "three"]:
+        model.setData(model.index(0), text)
+        board.save_board()
+    board.save_board()
+    board.saver.flush()
+
+    assert 1 <= len(writes) <= 2
+    assert "- three" in writes[-1]
+    assert not board.data.dirty
+
+
+def test_edit_during_save_stays_dirty(qapp, file_config, tmp_path):
+    """A column changed after the snapshot is not marked clean"""
+    board = BanBoard(str(tmp_path / "board.yaml"), file_config)
+    model = board.model.tile_models[0]
+    model.setData(model.index(0), "saved")
+    snapshot = board.data.snapshot()
+    model.setData(model.index(1), "unsaved")
+    board.data.mark_clean(snapshot)
+    assert board.data.dirty_columns() == [0]
+    assert board.data.columns[0].yaml is None
+
+
+def test_journal_compacted_by_save(qapp, file_config, tmp_path):
+    """Edits are journaled until the save, a crash recovers them"""
+    from xban.io import process_yaml, save_yaml
+
+    filepath = str(tmp_path / "board.yaml")
+    save_yaml(filepath, file_config)
+    board = BanBoard(filepath, file_config, journal=True)
+    model = board.model.tile_models[0]
+    model.setData(model.index(0), "journaled")
+    assert process_yaml(filepath, replay=True)[1]["todo"][0] == "journaled"
+
+    board.save_board()
+    board.saver.flush()
+    assert not (tmp_path / ".board.yaml.journal").exists()
+
+    # a board recovered from the journal has to be saved again
+    model.setData(model.index(1), "recovered")
+    recovered = BanBoard(filepath, process_yaml(filepath, replay=True), journal=True)
+    assert recovered.data.dirty
+    assert recovered.parse_board()[1]["todo"][:2] == ["journaled", "recovered"]
+
+
+def test_progressive_fill(qapp, file_config, tmp_path):
+    """Columns start as skeletons and are filled by the event loop"""
+    from xban.board import SubBoard, SubBoardSkeleton
+
+    board = BanBoard(str(tmp_path / "board.yaml"), file_config, progressive=True)
+    assert [type(s) for s in subboards(board)] == [SubBoard, SubBoardSkeleton]
+    # the content is complete before the fill
+    assert board.parse_board() == file_config
+
+    filled = []
+    board.filled.connect(lambda: filled.append(True))
+    board.insert_board(("new", []))
+    for _ in range(100):
+        if filled:
+            break
+        qapp.processEvents()
+    assert filled
+    assert all(isinstance(s, SubBoard) for s in subboards(board))
+    assert [s.parse()[0] for s in subboards(board)] == ["todo", "finished", "new"]
+
+
+def test_virtual_columns(qapp, tmp_path):
+    """Only the columns around the viewport are built"""
+    from PySide6.QtWidgets import QScrollArea
+    from xban.board import SubBoard
+
+    columns = 30
+    config = [
+        {"xban_config": {"title": "t", "description": "", "board_color": []}},
+        {f"column {i}": [f"tile {i}"] for i in range(columns)},
+    ]
+    board = BanBoard(str(tmp_path / "board.yaml"), config, virtual=True)
+    board.virtual_margin = 0
+    area = QScrollArea()
+    area.setWidget(board)
+    area.setWidgetResizable(True)
+    area.resize(800, 600)
+    area.show()
+
+    def settle():
+        for _ in range(50):
+            qapp.processEvents()
+        return [isinstance(s, SubBoard) for s in subboards(board)]
+
+    built = settle()
+    assert built[0] and 0 < sum(built) < columns
+
+    area.horizontalScrollBar().setValue(area.horizontalScrollBar().maximum())
+    built = settle()
+    assert built[-1] and not built[0] and sum(built) < columns
+
+    # moving tiles does not depend on the built widgets
+    first, last = board.model.tile_models[0], board.model.tile_models[-1]
+    board.model.move_tiles(first, [0], last, 0)
+    assert board.parse_board()[1][f"column {columns - 1}"] == ["tile 0", "tile 29"]
+    area.close()
+
+
+def test_autosave_debounced(qapp, file_config, tmp_path, monkeypatch):
+    """A burst of edits is saved once after the quiet period"""
+    from xban.saver import AutoSaver
+
+    board = BanBoard(str(tmp_path / "board.yaml"), file_config)
+    saves = []
+    monkeypatch.setattr(board.saver, "save", lambda: saves.append(True))
+    autosaver = AutoSaver(board.data, board.save_board, delay=0.05, max_delay=10)
+    model = board.model.tile_models[0]
+    for text in ["o", "on", "one"]:
+        model.setData(model.index(0), text)
+        qapp.processEvents()
+    assert not saves
+    autosaver.quiet_timer.timeout.emit()
+    assert len(saves) == 1
+
+    # nothing is saved for a clean board
+    board.data.mark_clean()
+    autosaver.autosave()
+    assert len(saves) == 1
+
+
+def test_autosave_max_delay(qapp, file_config, tmp_path, monkeypatch):
+    """Continuous edits are saved after the maximum delay"""
+    from xban.saver import AutoSaver
+
+    board = BanBoard(str(tmp_path / "board.yaml"), file_config)
+    saves = []
+    monkeypatch.setattr(board.saver, "save", lambda: saves.append(True))
+    AutoSaver(board.data, board.save_board, delay=0.05, max_delay=0.2)
+    model = board.model.tile_models[0]
+    start = time.monotonic()
+    while not saves and time.monotonic() - start < 2:
+        model.setData(model.index(0), str(time.monotonic()))
+        time.sleep(0.01)
+        qapp.processEvents()
+    assert saves
+    assert time.monotonic() - start < 1
+
+
+def test_reload_patches_changed_columns(qapp, file_config, tmp_path):
+    """External changes update only the affected widgets"""
+    from xban.io import save_yaml
+
+    filepath = str(tmp_path / "board.yaml")
+    save_yaml(filepath, file_config)
+    board = BanBoard(filepath, file_config, watch=True)
+    todo, finished = subboards(board)
+    todo_model = todo.listview.model()
+
+    file_config[0]["xban_config"]["title"] = "renamed"
+    file_config[1]["finished"].append("e")
+    save_yaml(filepath, file_config)
+    start = time.monotonic()
+    while board.title_edit.text() != "renamed" and time.monotonic() - start < 3:
+        qapp.processEvents()
+        time.sleep(0.01)
+    assert board.title_edit.text() == "renamed"
+    assert subboards(board) == [todo, finished]
+    assert todo.listview.model() is todo_model
+    assert finished.parse() == ("finished", ["d", "e"])
+    assert not board.data.dirty
+
+
+def test_reload_ignores_own_save(qapp, file_config, tmp_path):
+    from xban.io import save_yaml
+
+    filepath = str(tmp_path / "board.yaml")
+    save_yaml(filepath, file_config)
+    board = BanBoard(filepath, file_config)
+    model = board.model.tile_models[0]
+    model.setData(model.index(0), "saved")
+    board.save_board()
+    board.saver.flush()
+    model.setData(model.index(0), "unsaved")
+    board.reload()
+    assert board.parse_board()[1]["todo"][0] == "unsaved"
+
+
+def blocked_writes(monkeypatch):
+    """Hold the background writes until the returned event is set"""
+    import threading
+    import xban.saver
+
+    release = threading.Event()
+    write_yaml = xban.saver.write_yaml
+
+    def blocked(filepath, text):
+        release.wait(5)
+        return write_yaml(filepath, text)
+
+    monkeypatch.setattr(xban.saver, "write_yaml", blocked)
+    return release
+
+
+def test_reload_discards_running_save(qapp, file_config, tmp_path, monkeypatch):
+    """A save of the board before the reload does not keep the old file"""
+    from xban.io import save_yaml, process_yaml
+
+    filepath = str(tmp_path / "board.yaml")
+    save_yaml(filepath, file_config)
+    board = BanBoard(filepath, file_config)
+    release = blocked_writes(monkeypatch)
+    model = board.model.tile_models[0]
+    model.setData(model.index(0), "local")
+    board.save_board()
+    model.setData(model.index(1), "waiting")
+    board.save_board()
+
+    file_config[1]["todo"][2] = "external"
+    save_yaml(filepath, file_config)
+    monkeypatch.setattr(board, "resolve_conflict", lambda: True)
+    board.reload()
+    assert board.saver.pending is None
+    release.set()
+    board.saver.flush()
+    assert process_yaml(filepath) == file_config
+    assert not board.data.dirty
+
+
+def test_reload_ignores_saves_in_flight(qapp, file_config, tmp_path, monkeypatch):
+    """A written save is recognized before its result is handled"""
+    from xban.io import save_yaml
+
+    filepath = str(tmp_path / "board.yaml")
+    save_yaml(filepath, file_config)
+    board = BanBoard(filepath, file_config)
+    release = blocked_writes(monkeypatch)
+    model = board.model.tile_models[0]
+    model.setData(model.index(0), "first")
+    board.save_board()
+    release.set()
+    board.saver.pool.waitForDone()
+    model.setData(model.index(0), "second")
+    monkeypatch.setattr(board, "resolve_conflict", pytest.fail)
+    board.reload()
+    assert board.parse_board()[1]["todo"][0] == "second"
+    board.saver.flush()
+
+def test_reload_conflict(qapp, file_config, tmp_path, monkeypatch):
+    """Unsaved edits are only replaced if the conflict is resolved so"""
+    from xban.io import save_yaml
+
+    filepath = str(tmp_path / "board.yaml")
+    save_yaml(filepath, file_config)
+    board = BanBoard(filepath, file_config)
+    model = board.model.tile_models[0]
+    model.setData(model.index(0), "local")
+
+    file_config[1]["todo"][1] = "external"
+    save_yaml(filepath, file_config)
+    monkeypatch.setattr(board, "resolve_conflict", lambda: False)
+    board.reload()
+    assert board.parse_board()[1]["todo"] == ["local", "b", "c"]
+    assert board.data.dirty
+
+    file_config[1]["todo"][2] = "again"
+    save_yaml(filepath, file_config)
+    monkeypatch.setattr(board, "resolve_conflict", lambda: True)
+    board.reload()
+    assert board.parse_board() == file_config
+    assert not board.data.dirty
+
+
+def test_undo_delete(qapp, board):
+    """Deleted tiles and columns come back with undo, widgets included"""
+    todo, finished = subboards(board)
+    todo.listview.select_rows(1, 1)
+    todo.del_listitem()
+    board.delete_board(finished)
+    qapp.processEvents()
+    assert board.parse_board()[1] == {"todo": ["a", "c"]}
+
+    board.undo()
+    assert [s.parse()[0] for s in subboards(board)] == ["todo", "finished"]
+    assert subboards(board)[0] is todo
+    board.undo()
+    assert todo.parse() == ("todo", ["a", "b", "c"])
+    board.redo()
+    assert todo.parse() == ("todo", ["a", "c"])
+
+
+def test_search_filters_tiles(qapp, board):
+    """Only the matching tiles are shown, edits update the filter"""
+    todo, finished = subboards(board)
+    board.search_edit.setText("B")
+    board.apply_search()
+    assert [todo.listview.isRowHidden(row) for row in range(3)] == [True, False, True]
+    assert finished.listview.isRowHidden(0)
+
+    board.data.set_tile(1, 0, "bd")
+    board.apply_search()
+    assert not finished.listview.isRowHidden(0)
+
+    board.search_edit.clear()
+    board.apply_search()
+    assert not any(todo.listview.isRowHidden(row) for row in range(3))
+    assert todo.listview.matches is None
+
+
+def test_search_after_row_changes(qapp, board):
+    """The index is built by the first search, moved rows are filtered again"""
+    todo, finished = subboards(board)
+    assert board.search_index.ids is None
+    board.search_edit.setText("b")
+    board.apply_search()
+    assert board.search_index.ids is not None
+    board.data.insert_tiles(0, 0, ["bb", "x"])
+    board.apply_search()
+    hidden = [todo.listview.isRowHidden(row) for row in range(5)]
+    assert hidden == [False, True, True, False, True]
+
+    board.search_edit.setText("bb")
+    board.apply_search()
+    hidden = [todo.listview.isRowHidden(row) for row in range(5)]
+    assert hidden == [False, True, True, True, True]
+
+
+def test_search_new_columns(qapp, board):
+    """Columns inserted or restored while searching are filtered"""
+    board.search_edit.setText("alpha")
+    board.apply_search()
+    board.insert_board(("new", ["alpha", "beta"]), "blue")
+    assert board.search_timer.isActive()
+    board.apply_search()
+    new = subboards(board)[2]
+    assert [new.listview.isRowHidden(row) for row in range(2)] == [False, True]
+    qapp.processEvents()
+
+    board.delete_board(subboards(board)[1])
+    qapp.processEvents()
+    assert [s.parse()[0] for s in subboards(board)] == ["todo", "new"]
+    board.undo()
+    assert [s.parse()[0] for s in subboards(board)] == ["todo", "finished", "new"]
+    assert subboards(board)[1].listview.isRowHidden(0)
+    assert board.sublayout.count() == len(board.data.columns) + 1
+
+def test_tile_sizes_cached(qapp, board):
+    """Tile heights are cached by text and measured again for a new width"""
+    from PySide6.QtWidgets import QStyleOptionViewItem
+
+    listview = subboards(board)[0].listview
+    delegate = listview.itemDelegate()
+    model = listview.model()
+    model.setData(model.index(0), "a long tile text wrapping over several lines")
+    option = QStyleOptionViewItem()
+    listview.initViewItemOption(option)
+
+    delegate.set_width(120)
+    narrow = delegate.sizeHint(option, model.index(0))
+    assert delegate.sizeHint(option, model.index(0)) is narrow
+    assert narrow.height() > delegate.sizeHint(option, model.index(1)).height()
+
+    delegate.set_width(1000)
+    assert delegate.sizeHint(option, model.index(0)).height() < narrow.height()
+    assert len(delegate.sizes) == 1
+
+
+def test_get_index(qapp, board):
+    """The column at a position is found on the cached column edges"""
+    board.resize(800, 600)
+    board.show()
+    qapp.processEvents()
+    todo, finished = subboards(board)
+    assert board.get_index(finished.geometry().center()) == 1
+    assert board.get_index(todo.geometry().topLeft()) == 0
+    gap = todo.geometry().topRight()
+    gap.setX(gap.x() + 5)
+    assert board.get_index(gap) == -1
+
+    board.data.move_column(1, 0)
+    qapp.processEvents()
+    assert board.get_index(finished.geometry().center()) == 0
+    board.close()
+
+
+def test_drag_pixmap_cached(qapp, board):
+    """The drag preview is downscaled and cached until the column changes"""
+    todo = subboards(board)[0]
+    todo.resize(400, 1000)
+    pixmap = todo.drag_pixmap()
+    assert pixmap.height() <= todo.drag_preview.height()
+    assert todo.drag_pixmap() is pixmap
+
+    board.data.set_tile(0, 0, "changed")
+    assert todo.drag_pixmap() is not pixmap
+
+
+def test_delete_selection_at_once(qapp, board):
+    """Deleting a scattered selection signals the selection change once"""
+    todo = subboards(board)[0]
+    board.data.insert_tiles(0, -1, [f"tile {i}" for i in range(20)])
+    listview = todo.listview
+    for row in range(0, 23, 2):
+        listview.selectionModel().select(
+            todo.tile_model.index(row), QItemSelectionModel.Select
+        )
+    listview.setRowHidden(22, True)
+    changes = []
+    listview.selectionModel().selectionChanged.connect(lambda *_: changes.append(1))
+    todo.del_listitem()
+
+    assert len(changes) == 1
+    # the hidden row is kept
+    expected = ["b"] + [f"tile {i}" for i in range(0, 20, 2)] + ["tile 19"]
+    assert todo.parse() == ("todo", expected)
+
+
+def test_single_column_selection(qapp, board):
+    """Selecting tiles clears the selection of the previous column only"""
+    todo, finished = subboards(board)
+    todo.listview.select_rows(0, 2)
+    finished.listview.select_rows(0, 1)
+    assert not todo.listview.selectionModel().hasSelection()
+    assert board.selection.views == [finished.listview]
+
+    finished.listview.clearSelection()
+    assert board.selection.active is None
+
+
+def test_multi_column_selection(qapp, file_config):
+    """With multi_select the selected tiles of all columns are dropped together"""
+    board = BanBoard("test/testfile.yaml", file_config, multi_select=True)
+    todo, finished = subboards(board)
+    todo.listview.select_rows(1, 2)
+    finished.listview.select_rows(0, 1)
+    assert board.selection.selected_tiles(finished.listview) == [(0, [1, 2])]
+
+    model = finished.tile_model
+    mimedata = encode_tiles(1, [0], board.selection.selected_tiles(finished.listview))
+    assert model.dropMimeData(mimedata, Qt.MoveAction, 1, 0, QModelIndex())
+    assert board.parse_board()[1] == {"todo": ["a"], "finished": ["b", "c", "d"]}
+
+    todo.listview.select_rows(0, 1)
+    finished.listview.select_rows(0, 1)
+    board.selection.multi = False
+    assert board.selection.views == [finished.listview]
+    assert not todo.listview.selectionModel().hasSelection()
+
+
+def test_shared_color_menu(qapp, board):
+    """One color menu is built on first use and retargeted per column"""
+    todo, finished = subboards(board)
+    assert board._color_menu is None
+    menu = board.color_menu()
+    assert board.color_menu() is menu
+
+    names = [action.defaultWidget().text() for action in menu.actions()]
+    menu.target = finished
+    menu.actions()[names.index("purple")].trigger()
+    assert board.parse_board()[0]["xban_config"]["board_color"] == ["red", "purple"]
+
+
+def test_recolor_keeps_style_sheet(qapp, file_config):
+    """Recoloring sets the color property of the view, not a style sheet"""
+    file_config[0]["xban_config"]["palettes"] = {"ocean": "#1e88e5"}
+    board = BanBoard("test/testfile.yaml", file_config)
+    todo = subboards(board)[0]
+    listview = todo.listview
+    delegate = listview.itemDelegate()
+    delegate.sizes["a"] = size = object()
+    sheet = board.styleSheet()
+    assert listview.styleSheet() == ""
+    assert listview.property("tileColor") == "red"
+
+    todo.color_change("ocean")
+    assert listview.property("tileColor") == "ocean"
+    assert listview.text_color.name() == "#1e88e5"
+    assert board.styleSheet() == sheet
+    assert delegate.sizes["a"] is size
+
+    todo.color_change("#00ff00")
+    assert 'tileColor="#00ff00"' in board.styleSheet()
+    names = [action.defaultWidget().text() for action in board.color_menu().actions()]
+    assert names[-1] == "ocean"
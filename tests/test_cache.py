@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""Test the cache of the processed yaml files"""
+
+import os
+from unittest.mock import patch
+from xban.cache import ParseCache
+from xban.io import process_yaml
+
+DATA = """
+xban_config:
+    title: testfile
+    description: test cache
+    board_color:
+        - red
+---
+todo:
+    - cached
+"""
+
+
+def write(path, text, mtime_ns=None):
+    path.write_text(text)
+    if mtime_ns:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_cache_hit_skips_parsing(tmp_path):
+    """The second load returns the cached content without parsing"""
+
+    board = tmp_path / "board.yaml"
+    write(board, DATA)
+    cache = ParseCache(str(tmp_path / "cache"))
+
+    first = process_yaml(str(board), cache)
+    with patch("xban.io.yaml.load_all", side_effect=AssertionError):
+        assert process_yaml(str(board), cache) == first
+    assert first[1] == {"todo": ["cached"]}
+
+
+def test_cache_detects_same_size_change(tmp_path):
+    """A change with identical size and mtime is caught by the hash"""
+
+    board = tmp_path / "board.yaml"
+    write(board, DATA, 10 ** 18)
+    cache = ParseCache(str(tmp_path / "cache"))
+    process_yaml(str(board), cache)
+
+    write(board, DATA.replace("cached", "edited"), 10 ** 18)
+    assert process_yaml(str(board), cache)[1] == {"todo": ["edited"]}
+
+
+def test_invalid_file_not_cached(tmp_path):
+    """Only valid content is cached"""
+
+    board = tmp_path / "board.yaml"
+    write(board, "- a\n---\n- b\n")
+    cache = ParseCache(str(tmp_path / "cache"))
+    assert process_yaml(str(board), cache) == []
+    assert not (tmp_path / "cache").exists()
+
+
+def test_lru_eviction(tmp_path):
+    """The least recently used entries are removed above the size cap"""
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    boards = []
+    for i in range(3):
+        board = tmp_path / f"board{i}.yaml"
+        write(board, DATA)
+        process_yaml(str(board), cache)
+        entry = cache.entry_path(str(board))
+        os.utime(entry, ns=(i * 10 ** 9, i * 10 ** 9))
+        boards.append(entry)
+
+    # a cache hit refreshes the first board
+    process_yaml(str(tmp_path / "board0.yaml"), cache)
+    cache.max_size = sum(size for _, size, _ in cache.entries()) - 1
+    cache.evict()
+    assert sorted(path for _, _, path in cache.entries()) == sorted(
+        [boards[0], boards[2]]
+    )
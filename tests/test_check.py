@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test the batch validation of board files"""
+
+import pytest
+from xban.check import find_boards, check_file, check_files, Summary
+from xban.generate import write_board
+
+
+@pytest.fixture
+def board_dir(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / ".hidden").mkdir()
+    for i in range(1, 5):
+        write_board(str(tmp_path / "sub" / f"b{i}.yml"), columns=i, tiles=5, seed=i)
+    (tmp_path / "bad.yaml").write_text("a: [")
+    (tmp_path / "notes.txt").write_text("not a board")
+    (tmp_path / ".hidden" / "skipped.yaml").write_text("a: [")
+    return tmp_path
+
+
+def test_find_boards(board_dir):
+    """Only yaml files outside of hidden directories are found"""
+
+    names = [path.split("/")[-1] for path in find_boards([str(board_dir)])]
+    assert names == ["bad.yaml", "b1.yml", "b2.yml", "b3.yml", "b4.yml"]
+    notes = str(board_dir / "notes.txt")
+    assert list(find_boards([notes])) == [notes]
+
+
+def test_check_file(board_dir, capsys):
+    """Parse errors are reported as problems and not printed"""
+
+    result = check_file(str(board_dir / "bad.yaml"))
+    assert not result["valid"]
+    assert "Incorrect" in result["problems"][0]
+    assert capsys.readouterr().out == ""
+
+    result = check_file(str(board_dir / "sub" / "b3.yml"))
+    assert result["valid"]
+    assert (result["columns"], result["tiles"]) == (3, 15)
+
+
+def test_check_files_parallel(board_dir):
+    """The pool gives the same results as the serial check"""
+
+    paths = list(find_boards([str(board_dir)]))
+    key = lambda result: result["path"]
+    serial = sorted(check_files(paths, jobs=1), key=key)
+    parallel = sorted(check_files(paths, jobs=2), key=key)
+    for result in serial + parallel:
+        result.pop("parse_time")
+    assert serial == parallel
+
+
+def test_summary():
+    summary = Summary(slowest=2)
+    for i in range(5):
+        summary.add(
+            {
+                "path": f"b{i}",
+                "valid": i != 3,
+                "columns": 1,
+                "tiles": i,
+                "bytes": 10,
+                "parse_time": float(i % 4),
+            }
+        )
+    result = summary.as_dict()
+    assert (result["files"], result["invalid"], result["tiles"]) == (5, 1, 10)
+    assert [item["path"] for item in result["slowest"]] == ["b3", "b2"]
+
+
+def test_check_incomplete_board(board_dir):
+    """A board without content is a problem of its file, not of the run"""
+
+    config_only = board_dir / "sub" / "config.yaml"
+    config_only.write_text("xban_config:\n  title: t\n")
+    result = check_file(str(config_only))
+    assert not result["valid"]
+    assert result["problems"] == ["the board content document is missing"]
+    paths = list(find_boards([str(board_dir)]))
+    assert len(list(check_files(paths, jobs=2))) == len(paths)
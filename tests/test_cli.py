@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test the command line interface without the GUI"""
+
+import sys
+import json
+import subprocess
+import pytest
+from click.testing import CliRunner
+from xban.xban import cli
+
+# import time budget of the command line module in seconds
+IMPORT_BUDGET = 0.3
+
+DATA = """
+xban_config:
+    title: testfile
+    description: test io
+    board_color:
+        - red
+        - teal
+---
+todo:
+    - need more tests!
+    - and more!
+finished:
+    - io tests
+"""
+
+
+@pytest.fixture
+def board_file(tmp_path):
+    filepath = tmp_path / "board.yaml"
+    filepath.write_text(DATA)
+    return str(filepath)
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    monkeypatch.setenv("XBAN_CACHE_DIR", str(tmp_path / "cache"))
+    return CliRunner()
+
+
+def run_python(code):
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+def test_no_qt_import():
+    """The cli module and the headless commands do not import Qt"""
+
+    code = (
+        "import sys, xban.xban\n"
+        "from click.testing import CliRunner\n"
+        "CliRunner().invoke(xban.xban.cli, ['validate', '--help'])\n"
+        "print(any(name.startswith('PySide6') for name in sys.modules))"
+    )
+    assert run_python(code).stdout.strip() == "False"
+
+
+def test_import_budget():
+    """Importing the cli module stays within the budget"""
+
+    def import_time():
+        stderr = run_python("import xban.xban").stderr
+        line = [line for line in stderr.splitlines() if line.endswith("| xban.xban")]
+        # cumulative import time in microseconds
+        return int(line[0].split("|")[1]) / 1e6
+
+    assert min(import_time() for _ in range(3)) < IMPORT_BUDGET
+
+
+def test_open_default(runner, board_file, monkeypatch):
+    """`xban FILEPATH` opens the board in the GUI"""
+
+    opened = []
+    monkeypatch.setattr(
+        "xban.xban.main_app", lambda *args, **kwargs: opened.append((args, kwargs))
+    )
+    result = runner.invoke(cli, ["--no-cache", board_file])
+    assert result.exit_code == 0
+    args, options = opened[0]
+    assert args[0] == board_file
+    assert list(args[1][1]) == ["todo", "finished"]
+    assert options == {
+        "autosave": 2.0,
+        "autosave_max": 30.0,
+        "multi_select": False,
+        "render": None,
+    }
+
+    runner.invoke(cli, ["open", "--autosave", "0", "--multi-select", board_file])
+    assert opened[1][1]["autosave"] == 0
+    assert opened[1][1]["multi_select"]
+
+    runner.invoke(cli, ["open", "--render", "flat", board_file])
+    assert opened[2][1]["render"] == "flat"
+
+
+def test_validate(runner, board_file, tmp_path):
+    """Invalid files are reported and fail the command"""
+
+    result = runner.invoke(cli, ["validate", board_file])
+    assert result.exit_code == 0
+    assert "1 valid, 0 invalid" in result.output
+
+    invalid = tmp_path / "invalid.yaml"
+    invalid.write_text(DATA.replace("teal", "plaid"))
+    result = runner.invoke(cli, ["validate", "-q", board_file, str(invalid)])
+    assert result.exit_code == 1
+    assert f"FAIL {invalid}: unknown color plaid" in result.output
+    assert "OK" not in result.output
+
+
+def test_incomplete_boards(runner, tmp_path):
+    """Boards without content or configuration mapping are reported"""
+
+    config_only = tmp_path / "config.yaml"
+    config_only.write_text(DATA.split("---")[0])
+    null_config = tmp_path / "null.yaml"
+    null_config.write_text("xban_config:\n---\ntodo: [a]\n")
+    result = runner.invoke(cli, ["validate", str(config_only), str(null_config)])
+    assert result.exit_code == 1
+    assert "content document is missing" in result.output
+    assert "xban_config is not a mapping" in result.output
+    for path in (config_only, null_config):
+        result = runner.invoke(cli, ["stats", str(path)])
+        assert result.exit_code == 1
+        assert "Error:" in result.output
+        assert not isinstance(result.exception, (ValueError, AttributeError))
+
+
+def test_profile(runner, board_file, tmp_path, monkeypatch):
+    """--profile writes the profile and the trace to the current directory"""
+
+    monkeypatch.chdir(tmp_path)
+    result = runner.invoke(cli, ["--profile", "--trace-memory", "validate", board_file])
+    assert result.exit_code == 0
+    assert (tmp_path / "xban-profile.prof").exists()
+    trace = json.loads((tmp_path / "xban-profile.trace.json").read_text())
+    assert "process_yaml" in [event["name"] for event in trace["traceEvents"]]
+
+
+def test_stats(runner, board_file):
+    result = runner.invoke(cli, ["stats", "--json", board_file])
+    assert result.exit_code == 0
+    stats = json.loads(result.output)
+    assert (stats["title"], stats["columns"], stats["tiles"]) == ("testfile", 2, 3)
+    assert stats["column_stats"][1]["color"] == "teal"
+
+
+def test_dump(runner, board_file, tmp_path):
+    """Plain yaml files are dumped with the xban configuration"""
+
+    plain = tmp_path / "plain.yaml"
+    plain.write_text("todo:\n- a\n")
+    result = runner.invoke(cli, ["dump", "--format", "json", str(plain)])
+    assert json.loads(result.output)[1] == {"todo": ["a"]}
+
+    result = runner.invoke(cli, ["dump", board_file])
+    assert result.output.startswith("xban_config:\n  title: testfile")
+    assert runner.invoke(cli, ["dump", str(tmp_path)]).exit_code != 0
+
+
+def test_check(runner, board_file, tmp_path):
+    """The check command prints a JSON line per file and a summary"""
+
+    (tmp_path / "invalid.yaml").write_text("a: [")
+    result = runner.invoke(cli, ["check", "-j", "1", str(tmp_path)])
+    assert result.exit_code == 1
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert [line["type"] for line in lines] == ["file", "file", "summary"]
+    assert lines[-1]["tiles"] == 3
+    assert lines[-1]["invalid"] == 1
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""Test the Qt independent board data"""
+
+from xban.data import BoardData, BoardObserver, ColumnData
+
+
+class Recorder(BoardObserver):
+    """Record the observer hooks in order"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattribute__(self, name):
+        if name.startswith(("tile", "column", "board")):
+            return lambda *args: self.calls.append((name, *args))
+        return super().__getattribute__(name)
+
+
+def test_config_round_trip(file_config):
+    """The board converts back to the same yaml content"""
+
+    data = BoardData.from_config(file_config)
+    assert data.to_config() == file_config
+    assert data.tile_count() == 4
+
+
+def test_settings_round_trip(file_config):
+    """Unknown configuration keys such as the palettes are saved unchanged"""
+
+    file_config[0]["xban_config"]["palettes"] = {"ocean": "#1e88e5"}
+    file_config[0]["xban_config"]["theme"] = "dark"
+    data = BoardData.from_config(file_config)
+    assert data.settings == {"palettes": {"ocean": "#1e88e5"}, "theme": "dark"}
+    assert data.to_config() == file_config
+
+
+def test_missing_color():
+    """Columns without a color fall back to black"""
+
+    config = [
+        {"xban_config": {"title": "t", "description": "", "board_color": []}},
+        {"todo": None, 2021: [1, "b"]},
+    ]
+    data = BoardData.from_config(config)
+    assert [c.color for c in data.columns] == ["black", "black"]
+    assert data.columns[0].tiles == []
+    assert data.columns[1].title == "2021"
+    assert data.columns[1].tiles == ["1", "b"]
+
+
+def test_remove_tiles_blocks(file_config):
+    """Non contiguous rows are removed bottom up in blocks"""
+
+    data = BoardData.from_config(file_config)
+    recorder = Recorder()
+    data.observers.append(recorder)
+
+    assert data.remove_tiles(0, [2, 0]) == ["a", "c"]
+    assert data.columns[0].tiles == ["b"]
+    assert recorder.calls == [
+        ("tiles_about_to_be_removed", 0, 2, 2),
+        ("tiles_removed", 0, 2, 2),
+        ("tiles_about_to_be_removed", 0, 0, 0),
+        ("tiles_removed", 0, 0, 0),
+    ]
+
+
+def test_move_tiles_within_column(file_config):
+    """Moving down in the same column accounts for the removed rows"""
+
+    data = BoardData.from_config(file_config)
+    assert data.move_tiles(0, [0, 1], 0, 3) == 1
+    assert data.columns[0].tiles == ["c", "a", "b"]
+
+
+def test_move_tiles_between_columns(file_config):
+    """Tiles keep their order when moved to another column"""
+
+    data = BoardData.from_config(file_config)
+    assert data.move_tiles(0, [2, 0], 1, 0) == 0
+    assert data.columns[0].tiles == ["b"]
+    assert data.columns[1].tiles == ["a", "c", "d"]
+
+
+def test_move_selection(file_config):
+    """Tiles of several columns are moved together in column order"""
+
+    data = BoardData.from_config(file_config)
+    data.insert_column(-1, ColumnData("new", ["e", "f"]))
+    assert data.move_selection([(2, [1]), (0, [0, 2]), (2, [0])], 0, 2) == 1
+    assert data.columns[0].tiles == ["b", "a", "c", "e", "f"]
+    assert data.columns[2].tiles == []
+
+
+def test_move_column(file_config):
+    """The column move is clamped to the last column"""
+
+    data = BoardData.from_config(file_config)
+    data.insert_column(-1, ColumnData("new"))
+    data.move_column(0, 10)
+    assert [c.title for c in data.columns] == ["finished", "new", "todo"]
+
+
+def test_unchanged_values_not_notified(file_config):
+    """Setting an identical value does not notify the observers"""
+
+    data = BoardData.from_config(file_config)
+    recorder = Recorder()
+    data.observers.append(recorder)
+    data.set_tile(0, 0, "a")
+    data.set_color(0, "red")
+    data.set_title("testfile")
+    assert recorder.calls == []
+    data.set_tile(0, 0, "z")
+    assert recorder.calls == [("tile_about_to_be_changed", 0, 0), ("tile_changed", 0, 0)]
+
+
+def test_dirty_tracking(file_config):
+    """Changes mark the configuration or the touched column only"""
+
+    data = BoardData.from_config(file_config)
+    assert not data.dirty
+    data.set_tile(1, 0, "edited")
+    assert data.dirty and data.dirty_columns() == [1]
+    data.mark_clean()
+    data.set_color(0, "blue")
+    assert data.config_dirty and data.dirty_columns() == []
+    data.mark_clean()
+    data.move_tiles(0, [0], 1, 0)
+    assert data.dirty_columns() == [0, 1]
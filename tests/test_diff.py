@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test the difference between the board data and a board file"""
+
+import random
+from xban.data import BoardData
+from xban.diff import diff_board, diff_tiles
+from xban.journal import apply_operation
+
+
+def config(content, colors=None, title="t"):
+    colors = colors or ["red"] * len(content)
+    return [
+        {"xban_config": {"title": title, "description": "", "board_color": colors}},
+        content,
+    ]
+
+
+def apply(data, ops):
+    for op in ops:
+        apply_operation(data, op)
+    return data.to_config()
+
+
+def test_diff_tiles_skips_common_ends():
+    """Only the changed middle of a column is compared"""
+
+    old = [str(i) for i in range(1000)]
+    new = old[:500] + ["new"] + old[501:]
+    assert diff_tiles(0, old, new) == [
+        {"op": "edit", "col": 0, "row": 500, "text": "new"}
+    ]
+    assert diff_tiles(0, old, old) == []
+
+
+def test_diff_board_minimal(file_config):
+    """Unchanged columns do not get any operation"""
+
+    data = BoardData.from_config(file_config)
+    ops = diff_board(data, [file_config[0], dict(file_config[1], todo=["a", "c", "e"])])
+    assert all(op.get("col") == 0 for op in ops)
+    assert apply(data, ops)[1]["todo"] == ["a", "c", "e"]
+
+
+def test_diff_board_columns():
+    """Added, removed, moved and recolored columns"""
+
+    data = BoardData.from_config(config({"a": ["1"], "b": ["2"], "c": ["3"]}))
+    target = config({"c": ["3"], "new": ["x"], "a": ["1", "4"]}, ["red", "blue", "teal"])
+    ops = diff_board(data, target)
+    kinds = {op["op"] for op in ops}
+    assert kinds == {"remove_column", "add_column", "move_column", "column", "insert"}
+    assert apply(data, ops) == target
+
+
+def test_diff_board_random():
+    """Applying the difference always gives the file content"""
+
+    rng = random.Random(0)
+
+    def board():
+        titles = rng.sample("abcdef", rng.randint(0, 6))
+        colors = [rng.choice(["red", "blue"]) for _ in titles]
+        content = {
+            t: [rng.choice("pqrs") for _ in range(rng.randint(0, 6))] for t in titles
+        }
+        return config(content, colors, rng.choice("xy"))
+
+    for _ in range(500):
+        data = BoardData.from_config(board())
+        target = board()
+        assert apply(data, diff_board(data, target)) == target
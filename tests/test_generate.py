@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test the synthetic board generator"""
+
+import io
+import yaml
+import pytest
+from click.testing import CliRunner
+from xban.generate import generate_board, write_board, parse_range, cli
+from xban.io import process_yaml
+from xban.style import COLOR_DICT
+
+
+def generate(**kwargs):
+    stream = io.StringIO()
+    total = generate_board(stream, **kwargs)
+    return stream.getvalue(), total
+
+
+def test_parse_range():
+    """Single values and MIN:MAX ranges"""
+
+    assert parse_range(5) == (5, 5)
+    assert parse_range("2:7") == (2, 7)
+    with pytest.raises(ValueError):
+        parse_range("7:2")
+
+
+def test_reproducible():
+    """The same seed gives the same board, another seed does not"""
+
+    kwargs = dict(columns=3, tiles="0:20", unicode_ratio=0.3, multiline_ratio=0.3)
+    assert generate(seed=1, **kwargs) == generate(seed=1, **kwargs)
+    assert generate(seed=1, **kwargs)[0] != generate(seed=2, **kwargs)[0]
+
+
+def test_valid_board(tmp_path):
+    """The board is a valid xban file with more columns than colors"""
+
+    filepath = str(tmp_path / "board.yaml")
+    columns = len(COLOR_DICT) + 4
+    total = write_board(
+        filepath,
+        columns=columns,
+        tiles="0:30",
+        length="1:80",
+        distribution="lognormal",
+        unicode_ratio=0.5,
+        multiline_ratio=0.5,
+        seed=3,
+    )
+    config, content = process_yaml(filepath)
+    assert len(config["xban_config"]["board_color"]) == columns
+    assert len(content) == columns
+    assert sum(len(tiles) for tiles in content.values()) == total
+    assert all(
+        1 <= len(tile) <= 81 for tiles in content.values() for tile in tiles
+    )
+
+
+def test_chunked_column(monkeypatch):
+    """Columns are dumped in chunks but load as one list"""
+
+    monkeypatch.setattr("xban.generate.CHUNK_SIZE", 7)
+    text, total = generate(columns=1, tiles=30, length=3, distribution="fixed")
+    assert total == 30
+    config, content = yaml.safe_load_all(text)
+    assert [len(tile) for tile in content["column 0"]] == [3] * 30
+
+
+def test_cli(tmp_path):
+    """The command writes the board and refuses unknown colors"""
+
+    filepath = str(tmp_path / "board.yaml")
+    runner = CliRunner()
+    result = runner.invoke(cli, ["-c", "2", "-t", "5", "--colors", "red", filepath])
+    assert result.exit_code == 0
+    config, content = process_yaml(filepath)
+    assert config["xban_config"]["board_color"] == ["red", "red"]
+    assert sum(len(tiles) for tiles in content.values()) == 10
+
+    result = runner.invoke(cli, ["--colors", "plaid", "-f", filepath])
+    assert result.exit_code != 0
@@ -5,8 +5,9 @@
 """Test xban yaml file processing and saving"""
 
 import yaml
-from xban.io import xban_content, process_yaml
-from xban.style import TILE_STYLE
+from xban.io import xban_content, process_yaml, board_yaml, dump_yaml, write_yaml
+from xban.data import BoardData
+from xban.style import COLOR_DICT
 import logging
 from unittest.mock import patch, mock_open
 
@@ -76,7 +77,17 @@ def test_valid_yaml_xban(caplog):
     color = parsed[0]["xban_config"]["board_color"]
 
     assert len(color) == 2
-    assert color[0] in TILE_STYLE
+    assert color[0] in COLOR_DICT
+
+
+def test_valid_yaml_many_columns():
+    """Colors repeat when there are more columns than tile colors"""
+
+    stream = [{f"column {i}": [] for i in range(len(COLOR_DICT) + 4)}]
+    parsed = xban_content("test/testfile.yaml", stream)
+    color = parsed[0]["xban_config"]["board_color"]
+    assert len(color) == len(COLOR_DICT) + 4
+    assert set(color) <= set(COLOR_DICT)
 
 
 def test_multi_docs_stream(caplog):
@@ -139,3 +150,50 @@ def test_process_yaml_valid(caplog):
         },
         {"todo": ["need more tests!", "and more!"], "finished": ["io tests"],},
     ]
+
+
+def test_board_yaml_matches_full_dump():
+    """Joining the column yaml gives the same text as a full dump"""
+
+    stream = yaml.safe_load_all(DATA)
+    board = BoardData.from_config(list(stream))
+    board.columns[0].tiles.append("multi\nline: text")
+    assert board_yaml(board) == dump_yaml(board.to_config())
+    assert board_yaml(BoardData("empty")) == dump_yaml(BoardData("empty").to_config())
+
+
+def test_board_yaml_reuses_clean_columns():
+    """Only the touched column is dumped again"""
+
+    board = BoardData.from_config(list(yaml.safe_load_all(DATA)))
+    board_yaml(board)
+    cached = board.columns[1].yaml
+    board.set_tile(0, 0, "edited")
+    assert board.columns[0].yaml is None
+    text = board_yaml(board)
+    assert board.columns[1].yaml is cached
+    assert list(yaml.safe_load_all(text)) == board.to_config()
+
+
+def test_write_yaml_atomic(tmp_path):
+    """The target is replaced and no temporary file is left behind"""
+
+    filepath = tmp_path / "board.yaml"
+    filepath.write_text("old")
+    filepath.chmod(0o640)
+    assert write_yaml(str(filepath), "new")
+    assert filepath.read_text() == "new"
+    assert filepath.stat().st_mode & 0o777 == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["board.yaml"]
+
+
+def test_write_yaml_failure_keeps_file(tmp_path, caplog):
+    """A failed write does not truncate the existing board"""
+
+    filepath = tmp_path / "board.yaml"
+    filepath.write_text("old")
+    with patch("os.replace", side_effect=OSError("disk full")):
+        assert not write_yaml(str(filepath), "new")
+    assert filepath.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["board.yaml"]
+    assert "disk full" in caplog.records[-1].message
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test the edit journal and the crash recovery"""
+
+import os
+import pytest
+from xban.io import process_yaml, save_yaml, dump_yaml
+from xban.data import BoardData, ColumnData
+from xban.cache import content_hash
+from xban.journal import Journal, journal_path
+
+
+@pytest.fixture
+def board_file(tmp_path, file_config):
+    filepath = str(tmp_path / "board.yaml")
+    save_yaml(filepath, file_config)
+    return filepath
+
+
+def edit(data):
+    """One mutation of every kind"""
+
+    data.set_title("new title")
+    data.set_tile(0, 1, "edited")
+    data.insert_tiles(1, 0, ["x", "y"])
+    data.move_tiles(0, [0, 2], 1, 1)
+    data.insert_column(1, ColumnData("doing", ["z"], "blue"))
+    data.set_column_title(2, "done")
+    data.set_color(0, "purple")
+    data.move_column(0, 2)
+    data.remove_column(0)
+
+
+def test_replay(board_file):
+    """Replaying the journal reproduces the edited board"""
+
+    data = BoardData.from_config(process_yaml(board_file))
+    journal = Journal(data, board_file)
+    edit(data)
+    journal.close()
+    # the board file itself is unchanged
+    assert process_yaml(board_file) != data.to_config()
+    assert process_yaml(board_file, replay=True) == data.to_config()
+
+
+def test_one_line_per_edit(board_file):
+    data = BoardData.from_config(process_yaml(board_file))
+    journal = Journal(data, board_file)
+    data.set_tile(0, 0, "one")
+    size = os.path.getsize(journal.path)
+    data.set_tile(0, 0, "two")
+    with open(journal.path) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 3
+    assert os.path.getsize(journal.path) == size + len(lines[-1]) + 1
+
+
+def test_full_journal(board_file, monkeypatch):
+    """A long journal asks for a compaction until it is compacted"""
+    import xban.journal
+
+    monkeypatch.setattr(xban.journal, "COMPACT_OPS", 3)
+    data = BoardData.from_config(process_yaml(board_file))
+    requests = []
+    journal = Journal(data, board_file, lambda: requests.append(journal.seq))
+    for i in range(7):
+        data.set_tile(0, 0, str(i))
+    # the compaction requested after the third edit did not happen
+    assert requests == [3, 6]
+    journal.compact(content_hash(dump_yaml(data.to_config())), journal.seq)
+    for i in range(3):
+        data.set_tile(0, 0, str(i))
+    assert requests == [3, 6, 10]
+    journal.close()
+
+
+def test_compact(board_file):
+    """Saved operations are dropped, later ones are kept"""
+
+    data = BoardData.from_config(process_yaml(board_file))
+    journal = Journal(data, board_file)
+    data.set_tile(0, 0, "saved")
+    text, seq = dump_yaml(data.to_config()), journal.seq
+    data.set_tile(0, 1, "unsaved")
+    with open(board_file, "w") as f:
+        f.write(text)
+    journal.compact(content_hash(text), seq)
+    assert [op["text"] for op in journal.operations] == ["unsaved"]
+    assert process_yaml(board_file, replay=True) == data.to_config()
+
+    data2 = BoardData.from_config(process_yaml(board_file, replay=True))
+    text = dump_yaml(data2.to_config())
+    with open(board_file, "w") as f:
+        f.write(text)
+    journal.compact(content_hash(text), journal.seq)
+    assert not os.path.exists(journal.path)
+
+
+def test_continue_recovered_journal(board_file):
+    """A new session continues the journal it recovered from"""
+
+    data = BoardData.from_config(process_yaml(board_file))
+    Journal(data, board_file)
+    data.set_tile(0, 0, "first")
+    recovered = BoardData.from_config(process_yaml(board_file, replay=True))
+    journal = Journal(recovered, board_file)
+    assert journal.recovered and journal.seq == 1
+    recovered.set_tile(0, 1, "second")
+    assert process_yaml(board_file, replay=True)[1]["todo"][:2] == ["first", "second"]
+
+
+def test_stale_journal(board_file, file_config):
+    """A journal of another file version is not replayed"""
+
+    data = BoardData.from_config(process_yaml(board_file))
+    Journal(data, board_file)
+    data.set_tile(0, 0, "edited")
+    file_config[1]["todo"].append("external")
+    save_yaml(board_file, file_config)
+    assert process_yaml(board_file, replay=True) == file_config
+    assert os.path.exists(journal_path(board_file) + ".stale")
+
+
+def test_truncated_journal(board_file):
+    """A partly written last line is ignored"""
+
+    data = BoardData.from_config(process_yaml(board_file))
+    journal = Journal(data, board_file)
+    data.set_tile(0, 0, "complete")
+    journal.close()
+    with open(journal.path, "a") as f:
+        f.write('{"seq": 2, "op": "ed')
+    assert process_yaml(board_file, replay=True)[1]["todo"][0] == "complete"
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""Test the render modes and the frame timer"""
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtWidgets import QWidget  # noqa: E402
+from xban.board import BanBoard, SubBoard  # noqa: E402
+from xban.render import FrameTimer, resolve_mode, shadow_pixmap  # noqa: E402
+
+
+def test_resolve_mode(caplog):
+    assert resolve_mode("auto", 10, threshold=100) == "quality"
+    assert resolve_mode("auto", 100, threshold=100) == "performance"
+    assert resolve_mode("flat", 10**6) == "flat"
+    assert resolve_mode("fancy", 10, threshold=100) == "quality"
+    assert "Unknown render mode fancy" in caplog.text
+
+
+def test_shadow_pixmap_cached(qapp):
+    pixmap = shadow_pixmap(8)
+    assert shadow_pixmap(8) is pixmap
+    assert pixmap.width() == pixmap.height() == 2 * (8 + 10) + 1 + 20
+    image = pixmap.toImage()
+    # transparent outside, opaque in the middle
+    assert image.pixelColor(0, 0).alpha() == 0
+    assert image.pixelColor(pixmap.width() // 2, pixmap.height() // 2).alpha() > 200
+
+
+def test_render_modes(qapp, file_config):
+    """Only the quality mode uses effects, performance paints the shadows"""
+
+    shadows = {}
+    for mode, effect in (("quality", True), ("performance", False), ("flat", False)):
+        board = BanBoard("test/testfile.yaml", file_config, render=mode)
+        widgets = [board.sublayout.itemAt(i).widget() for i in range(3)]
+        assert all((w.graphicsEffect() is not None) == effect for w in widgets)
+
+        board.resize(800, 600)
+        board.show()
+        qapp.processEvents()
+        image = board.grab().toImage()
+        todo = widgets[0].geometry()
+        shadows[mode] = image.pixelColor(todo.right() + 6, todo.center().y())
+        board.close()
+    assert shadows["performance"].lightness() < shadows["flat"].lightness()
+
+    file_config[0]["xban_config"]["render"] = "flat"
+    assert BanBoard("test/testfile.yaml", file_config).render == "flat"
+
+
+def test_auto_threshold(qapp, file_config, monkeypatch):
+    monkeypatch.setattr(BanBoard, "render_threshold", 4)
+    board = BanBoard("test/testfile.yaml", file_config)
+    assert board.render == "performance"
+    assert isinstance(board.sublayout.itemAt(0).widget(), SubBoard)
+    monkeypatch.setattr(BanBoard, "render_threshold", 5)
+    assert BanBoard("test/testfile.yaml", file_config).render == "quality"
+
+
+def test_frame_timer(qapp):
+    window = QWidget()
+    timer = FrameTimer(window, size=3)
+    window.show()
+    for _ in range(5):
+        window.update()
+        qapp.processEvents()
+    stats = timer.stats()
+    assert stats["frames"] >= 5
+    assert len(timer.times) == 3
+    assert 0 <= stats["mean"] <= stats["p95"] <= stats["max"]
+    assert "frames, mean" in timer.summary()
+    window.close()
+
+
+def test_render_option_reaches_board(qapp, file_config, tmp_path, monkeypatch):
+    """`xban open --render` sets the render mode of the window board"""
+    from click.testing import CliRunner
+    import xban.xban
+    from xban.io import save_yaml
+    from xban.mainwindow import xBanWindow
+
+    filepath = str(tmp_path / "board.yaml")
+    save_yaml(filepath, file_config)
+    windows = []
+
+    def main_app(filepath, file_config, **options):
+        window = xBanWindow(xban.xban.BASE_PATH, filepath, file_config, **options)
+        windows.append(window)
+
+    monkeypatch.setattr(xban.xban, "main_app", main_app)
+    args = ["--no-cache", "open", "--render", "performance", filepath]
+    assert CliRunner().invoke(xban.xban.cli, args).exit_code == 0
+    board = windows[0].centralWidget().widget()
+    assert board.render == "performance"
+    assert board.add_btn.graphicsEffect() is None
+    windows[0].close()
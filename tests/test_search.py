@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test the inverted index of the tiles"""
+
+import random
+from xban.data import BoardData, ColumnData
+from xban.search import SearchIndex, tokenize
+
+
+def rows(index, text):
+    """Matching (column title, tile) pairs of the query"""
+
+    matches = index.query(text)
+    return {
+        (column.title, column.tiles[row])
+        for col, column in enumerate(index.data.columns)
+        for row in index.matching_rows(col, matches)
+    }
+
+
+def test_tokenize():
+    assert tokenize("Fix the Café-menu, fix it") == {"fix", "the", "café", "menu", "it"}
+
+
+def test_prefix_and_all_words():
+    data = BoardData.from_config(
+        [
+            {"xban_config": {"title": "t", "description": "", "board_color": []}},
+            {"todo": ["deploy cache", "Deploy docs", "clear cache"], "done": ["depend"]},
+        ]
+    )
+    index = SearchIndex(data)
+    assert index.query("  ") is None
+    assert rows(index, "dep") == {
+        ("todo", "deploy cache"),
+        ("todo", "Deploy docs"),
+        ("done", "depend"),
+    }
+    assert rows(index, "cache DEP") == {("todo", "deploy cache")}
+    assert rows(index, "deploy missing") == set()
+
+
+def test_updated_by_edits(file_config):
+    """The incremental index matches an index built from scratch"""
+
+    data = BoardData.from_config(file_config)
+    index = SearchIndex(data)
+    calls = []
+    index.on_change = lambda: calls.append(True)
+    rng = random.Random(0)
+    words = ["alpha", "beta", "gamma", "delta"]
+
+    def text():
+        return " ".join(rng.sample(words, 2))
+
+    edits = [
+        lambda: data.set_tile(0, 1, "alpha beta"),
+        lambda: data.insert_tiles(1, 0, [text(), text()]),
+        lambda: data.remove_tiles(0, [0, 2]),
+        lambda: data.move_tiles(1, [0, 2], 0, 1),
+        lambda: data.insert_column(1, ColumnData("doing", [text()], "blue")),
+        lambda: data.move_column(0, 2),
+        lambda: data.set_tile(2, 0, "gamma"),
+        lambda: data.remove_column(1),
+    ]
+    for edit in edits:
+        edit()
+        fresh = SearchIndex(BoardData.from_config(data.to_config()))
+        for query in words + ["a", "al be", "gam"]:
+            assert rows(index, query) == rows(fresh, query)
+        assert sorted(index.words) == fresh.words == index.words
+    assert len(index) == sum(len(column.tiles) for column in data.columns)
+    assert len(calls) >= len(edits)
@@ -4,7 +4,7 @@
 
 """Test the xban tile style are correctly formatted"""
 
-from xban.style import TILE_STYLE
+from xban.style import COLOR_DICT, Theme, config_problems, mix
 
 
 BLACK_SYTLE = """
@@ -40,4 +40,43 @@ QListView QTextEdit QScrollBar::handle:vertical {
 
 def test_color_format():
 
-    assert TILE_STYLE["black"] == BLACK_SYTLE
+    assert Theme().tile_style("black") == BLACK_SYTLE
+
+
+def test_theme_palettes():
+    """Built-in, configured and hex colors have palettes, others are black"""
+
+    theme = Theme({"ocean": "#1e88e5", "sand": "#fff", "bad": "blue"})
+    assert theme.palette("red") is COLOR_DICT["red"]
+    assert theme.palette("ocean")["color"] == "#1e88e5"
+    assert theme.palette("#123456")["color"] == "#123456"
+    assert theme.palette("plaid") is theme.palette("black")
+    assert theme.names()[-2:] == ["ocean", "sand"]
+    assert not theme.is_color("bad") and not theme.is_color("#12345")
+    assert mix("#ff0000", "#0000ff", 0.25) == "#4000bf"
+
+    dark = Theme.from_config({"theme": "dark"})
+    assert dark.palette("red")["bgcolor"] != COLOR_DICT["red"]["bgcolor"]
+    assert dark.window_style() and not theme.window_style()
+
+
+def test_theme_styles_memoized():
+    """The style sheets are generated once and keyed by the color property"""
+
+    theme = Theme()
+    assert theme.tile_style("black") == BLACK_SYTLE
+    assert theme.tile_style("black") is theme.tile_style("black")
+    assert theme.menu_style("red") is theme.menu_style("red")
+    sheet = theme.stylesheet({"red", "#123456"})
+    assert 'QListView[tileColor="#123456"]::item {' in sheet
+    assert 'QListView[tileColor="red"] QTextEdit {' in sheet
+
+
+def test_config_problems():
+    assert config_problems({"theme": "dark", "palettes": {"a": "#fff"}}) == []
+    assert config_problems({"theme": "neon", "palettes": {"a": "#ff", "b": {}}}) == [
+        "unknown theme neon",
+        "invalid palette a",
+        "invalid palette b",
+    ]
+    assert config_problems({"palettes": ["#fff"]}) == ["palettes is not a mapping"]
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test the timing spans and the profiling of a run"""
+
+import json
+import logging
+import threading
+import tracemalloc
+from xban.timing import Timings, TIMINGS, start_profiling
+from xban.io import process_yaml
+
+
+def test_spans_recorded():
+    timings = Timings()
+    timings.trace = True
+    calls = []
+    timings.listeners.append(lambda name, seconds: calls.append(name))
+    with timings.span("outer"):
+        with timings.span("inner"):
+            pass
+
+    def work():
+        with timings.span("inner"):
+            pass
+
+    thread = threading.Thread(target=work)
+    with timings.span("save"):
+        thread.start()
+        thread.join()
+
+    assert calls == ["inner", "outer", "inner", "save"]
+    assert timings.stats["inner"].count == 2
+    assert timings.last("missing") is None
+    events = timings.events
+    assert [event["name"] for event in events] == calls
+    assert events[1]["ph"] == "X" and events[1]["ts"] <= events[0]["ts"]
+    assert events[1]["dur"] >= events[0]["dur"]
+    assert events[2]["tid"] != events[3]["tid"]
+    assert timings.summary()[0].startswith("inner: 2x, total")
+
+
+def test_memory_peaks():
+    """The peak of an inner span counts for the outer span as well"""
+
+    timings = Timings()
+    tracemalloc.start()
+    try:
+        with timings.span("outer"):
+            with timings.span("inner"):
+                block = bytearray(4 * 1024 ** 2)
+                del block
+            small = bytearray(1024)
+        del small
+    finally:
+        tracemalloc.stop()
+    assert timings.stats["inner"].peak >= 4 * 1024 ** 2
+    assert timings.stats["outer"].peak >= timings.stats["inner"].peak
+    assert "peak 4.0" in timings.summary()[1]
+
+
+def test_memory_peaks_without_reset(monkeypatch):
+    """Without reset_peak the peaks are the peaks since the start"""
+
+    monkeypatch.delattr(tracemalloc, "reset_peak", raising=False)
+    timings = Timings()
+    tracemalloc.start()
+    try:
+        block = bytearray(4 * 1024 ** 2)
+        del block
+        with timings.span("after"):
+            pass
+    finally:
+        tracemalloc.stop()
+    assert timings.stats["after"].peak > 3 * 1024 ** 2
+
+
+def test_profiling(tmp_path, caplog):
+    """The profile and the trace of the timed phases are written"""
+
+    caplog.set_level(logging.INFO)
+    board = tmp_path / "board.yaml"
+    board.write_text("todo:\n- a\n")
+    prefix = str(tmp_path / "run")
+    finish = start_profiling(True, True, prefix)
+    try:
+        process_yaml(str(board))
+    finally:
+        finish()
+
+    assert not TIMINGS.trace and not tracemalloc.is_tracing()
+    assert (tmp_path / "run.prof").stat().st_size > 0
+    with open(tmp_path / "run.trace.json") as f:
+        events = json.load(f)["traceEvents"]
+    names = [event["name"] for event in events]
+    assert "process_yaml" in names and "xban_content" in names
+    assert "peak_memory" in events[-1]["args"]
+    assert "Traced memory at exit" in caplog.text
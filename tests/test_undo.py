@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test the undo and redo of the board edits"""
+
+import random
+from xban.data import BoardData, ColumnData
+from xban.undo import UndoStack
+
+
+def test_undo_redo_every_edit(file_config):
+    """Each closed command is undone and redone exactly"""
+
+    data = BoardData.from_config(file_config)
+    stack = UndoStack(data)
+    states = [data.to_config()]
+    edits = [
+        lambda: data.set_tile(0, 1, "edited"),
+        lambda: data.insert_tiles(1, 0, ["x", "y"]),
+        lambda: data.remove_tiles(0, [0, 2]),
+        lambda: data.move_tiles(1, [0, 2], 0, 1),
+        lambda: data.insert_column(1, ColumnData("doing", ["z"], "blue")),
+        lambda: data.set_color(0, "purple"),
+        lambda: data.move_column(0, 2),
+        lambda: data.remove_column(1),
+    ]
+    for edit in edits:
+        edit()
+        stack.close()
+        states.append(data.to_config())
+
+    for state in reversed(states[:-1]):
+        assert stack.undo()
+        assert data.to_config() == state
+    assert not stack.undo()
+    for state in states[1:]:
+        assert stack.redo()
+        assert data.to_config() == state
+    assert not stack.redo()
+
+
+def test_one_command_per_action(file_config):
+    """Mutations before close belong to the same command"""
+
+    data = BoardData.from_config(file_config)
+    stack = UndoStack(data)
+    closes = []
+    stack.schedule = closes.append
+    data.move_tiles(0, [0, 1], 1, 0)
+    data.set_color(1, "red")
+    assert closes == [stack.close]
+    stack.close()
+    stack.undo()
+    assert data.to_config() == file_config
+
+
+def test_merge_typing(file_config):
+    """Keystrokes in a title are merged, a new edit after undo is not"""
+
+    data = BoardData.from_config(file_config)
+    stack = UndoStack(data)
+    for title in ["t", "ti", "tit"]:
+        data.set_column_title(0, title)
+        stack.close()
+    data.set_title("board")
+    stack.close()
+    assert len(stack.undo_commands) == 2
+    stack.undo()
+    stack.undo()
+    assert data.to_config() == file_config
+
+    stack.redo()
+    data.set_column_title(0, "title")
+    stack.close()
+    assert len(stack.undo_commands) == 2
+    # a new edit clears the redo history
+    assert not stack.redo_commands
+
+
+def test_memory_limit(file_config):
+    """The oldest commands are dropped first"""
+
+    data = BoardData.from_config(file_config)
+    stack = UndoStack(data, limit=20000)
+    rng = random.Random(0)
+    for i in range(100):
+        data.insert_tiles(0, 0, ["x" * rng.randint(100, 1000)])
+        stack.close()
+    assert stack.size <= 20000
+    assert 5 < len(stack.undo_commands) < 100
+    assert stack.size == sum(command.size for command in stack.undo_commands)
+    kept = len(stack.undo_commands)
+    while stack.undo():
+        pass
+    # the todo column starts with 3 tiles
+    assert len(data.columns[0].tiles) == 3 + 100 - kept
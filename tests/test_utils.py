@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""Test the customized widgets"""
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import QEvent  # noqa: E402
+from xban.utils import BanButton, TimingLabel, QLogHandler, LogPanel  # noqa: E402
+from xban.utils import coalesce  # noqa: E402
+from xban.timing import Timings  # noqa: E402
+
+
+def test_button_states(qapp):
+    """Hover and press change the state colors, not the style sheet"""
+
+    button = BanButton("+")
+    other = BanButton("-")
+    assert button.colors is other.colors
+    assert button.styleSheet() == ""
+
+    states = []
+    for kind in (
+        QEvent.HoverEnter,
+        QEvent.MouseButtonPress,
+        QEvent.MouseButtonRelease,
+        QEvent.HoverEnter,
+        QEvent.HoverLeave,
+    ):
+        button.eventFilter(button, QEvent(kind))
+        states.append(button.state)
+    # the release falls back to default, the menu exit has no hover leave
+    assert states == ["hover", "press", "default", "hover", "default"]
+    assert button.styleSheet() == ""
+    assert button.colors["hover"][1].name() == "#bdbdbd"
+
+
+def test_button_menu_indicator(qapp):
+    """The menu indicator is painted by buttons opening a menu"""
+
+    plain = BanButton("=")
+    menu = BanButton("=", indicator=True)
+    for button in (plain, menu):
+        button.resize(60, 40)
+    assert plain.grab().toImage() != menu.grab().toImage()
+
+
+def test_timing_label(qapp):
+    """The label shows the last phase times, also of spans in other threads"""
+
+    import threading
+
+    timings = Timings()
+    with timings.span("process_yaml"):
+        pass
+    label = TimingLabel(timings)
+    assert label.text().startswith("load ")
+
+    def save():
+        with timings.span("save_yaml"):
+            pass
+
+    thread = threading.Thread(target=save)
+    thread.start()
+    thread.join()
+    with timings.span("parse_board"):
+        pass
+    qapp.processEvents()
+    assert list(label.times) == ["process_yaml", "save_yaml"]
+    assert "  save " in label.text()
+
+    label.detach()
+    assert timings.listeners == []
+
+
+def test_coalesce():
+    """The most severe and latest record is shown with the counts"""
+
+    records = [(20, "a"), (30, "warn 1"), (30, "warn 2"), (20, "b"), (30, "warn 2")]
+    assert coalesce(records) == (30, "warn 2 (x2) (+3 more)")
+    assert coalesce([(20, "a")], count=5) == (20, "a (+4 more)")
+
+
+def test_log_handler_batches(qapp):
+    """A burst of records from a worker thread is delivered as one message"""
+
+    import time
+    import logging
+    import threading
+
+    handler = QLogHandler()
+    handler.history = type(handler.history)(maxlen=50)
+    logger = logging.getLogger("xban-test-sink")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    messages = []
+    handler.signal.log_msg.connect(lambda text, timeout: messages.append(text))
+    panel = LogPanel(handler)
+
+    def burst():
+        for i in range(100):
+            logger.warning(f"invalid tile {i}")
+
+    thread = threading.Thread(target=burst)
+    thread.start()
+    thread.join()
+    assert messages == []
+    deadline = time.perf_counter() + 1
+    while time.perf_counter() < deadline and not messages:
+        qapp.processEvents()
+    assert messages == ["invalid tile 99 (+99 more)"]
+    assert len(handler.history) == 50
+
+    # the warning is still shown, a later info is only kept in the history
+    logger.info("saved")
+    deadline = time.perf_counter() + 1
+    while time.perf_counter() < deadline and handler._scheduled:
+        qapp.processEvents()
+    assert messages == ["invalid tile 99 (+99 more)"]
+    assert handler.history[-1] == (logging.INFO, "saved")
+
+    panel.show()
+    assert panel.toPlainText().splitlines()[-1] == "INFO     saved"
+    logger.removeHandler(handler)
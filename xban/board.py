@@ -1,150 +1,609 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from PySide6.QtCore import Qt, Signal, QMimeData, QSize
-from PySide6.QtGui import QTextCursor, QDrag, QKeySequence, QColor
+import os
+import json
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+from PySide6.QtCore import (
+    Qt,
+    Signal,
+    QObject,
+    QMimeData,
+    QSize,
+    QRect,
+    QPoint,
+    QPointF,
+    QEvent,
+    QModelIndex,
+    QAbstractListModel,
+    QItemSelection,
+    QItemSelectionModel,
+    QTimer,
+    QFileSystemWatcher,
+)
+from PySide6.QtGui import (
+    QTextCursor,
+    QDrag,
+    QKeySequence,
+    QColor,
+    QShortcut,
+    QTextLayout,
+    QTextOption,
+    QPainter,
+)
 from PySide6.QtWidgets import (
+    QApplication,
     QWidget,
     QTextEdit,
     QHBoxLayout,
     QVBoxLayout,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QAbstractItemView,
     QLineEdit,
     QMenu,
     QMessageBox,
-    QGraphicsDropShadowEffect,
     QFrame,
     QStyledItemDelegate,
+    QStyleOptionViewItem,
+    QStyle,
     QScrollBar,
     QWidgetAction,
     QLabel,
 )
 
 from xban.utils import BanButton
-from xban.style import TILE_STYLE, MENU_STYLE
+from xban.style import Theme
+from xban.render import (
+    AUTO_TILES,
+    SHADOW_BLUR,
+    SHADOW_OFFSET,
+    resolve_mode,
+    add_shadow,
+    paint_shadow,
+    shadow_rect,
+)
+from xban.data import BoardData, BoardObserver, ColumnData
 from functools import partial
-from xban.io import save_yaml
+from xban.saver import BoardSaver
+from xban.journal import Journal, apply_operation
+from xban.diff import diff_board
+from xban.undo import UndoStack, UNDO_LIMIT
+from xban.search import SearchIndex
+from xban.timing import timed
+from xban.io import process_yaml
+from xban.cache import content_hash
 import logging
 
 gui_logger = logging.getLogger("xban-board")
 
+# mime type of the tiles dragged between the columns
+TILE_MIME = "application/x-xban-tiles"
+# overlay of the tiles matching the search
+SEARCH_HIGHLIGHT = QColor(255, 213, 79, 90)
+# palettes of the views outside of a board
+DEFAULT_THEME = Theme()
+
+
+def encode_tiles(column, rows, others=()):
+    """Mime data of the dragged rows of column
+
+    others are the (column, rows) selected in the other columns, they
+    are moved along in the multi-column selection mode.
+    """
+
+    payload = {"column": column, "rows": sorted(rows), "others": list(others)}
+    mimedata = QMimeData()
+    mimedata.setData(TILE_MIME, json.dumps(payload).encode())
+    return mimedata
+
+
+def decode_tiles(mimedata):
+    """Decode the dragged tile payload, None if it is not a tile drag"""
+
+    if not mimedata.hasFormat(TILE_MIME):
+        return None
+    return json.loads(bytes(mimedata.data(TILE_MIME)).decode())
+
+
+def board_of(widget):
+    """The BanBoard containing widget, None if there is none"""
+
+    board = widget.parentWidget()
+    while board is not None and not isinstance(board, BanBoard):
+        board = board.parentWidget()
+    return board
+
+
+@contextmanager
+def holding(widget):
+    """BanBoard.holding of the board containing widget
+
+    The dragged subboards (and their views) must not be released by
+    the virtual board until the drag finished.
+    """
+
+    board = board_of(widget)
+    if board is None:
+        yield
+    else:
+        with board.holding():
+            yield
+
 
 class BanBoard(QWidget):
-    """The main board of xBan"""
+    """The main board of xBan
+
+    In progressive mode only the first column is built with the board,
+    the others start as SubBoardSkeleton and are replaced by the real
+    subboards in time-budgeted slices of the event loop (fill_budget
+    seconds per tick). The board data is complete from the start, so
+    saving during the fill saves the full board. filled is emitted once
+    every column is built.
+
+    In virtual mode only the columns close to the visible part of the
+    board (see column_range) are built, the others are kept as
+    skeletons backed by the board data and are built or released again
+    while scrolling and resizing.
+
+    With journal, every edit is appended to the journal of the board
+    file (see xban.journal) and the journal is compacted by the saves.
+
+    With watch, changes of the file made outside of xban are applied to
+    the board (see reload). Only the difference is applied, so only the
+    affected columns and tiles are updated.
+
+    Every edit can be undone (Ctrl+Z) and redone (Ctrl+Shift+Z), see
+    xban.undo. The undo history is capped at undo_limit bytes.
+
+    The tiles are selected in a single column, see SelectionManager.
+    With multi_select, tiles of several columns can be selected and are
+    dragged together.
+
+    The search bar filters the tiles through the inverted index of
+    xban.search, the index is updated with every edit. The filter is
+    applied search_delay seconds after the last keystroke or edit.
+
+    The tile colors come from the theme of the board configuration (see
+    xban.style.Theme). The board holds a single style sheet with the
+    rules of every used color, keyed by the tileColor property of the
+    list views, so recoloring a column only repolishes its view.
+
+    render is the render mode of the shadows (see xban.render), by
+    default the render key of the configuration or auto. In the
+    performance mode the board paints the shadows of the columns and
+    of the add button itself. Auto switches to the performance mode
+    from render_threshold tiles.
+    """
 
-    def __init__(self, filepath, file_config, parent=None):
+    filled = Signal()
+
+    # seconds of subboard construction per event loop tick
+    fill_budget = 0.010
+    # pixels around the visible area where the columns are built
+    virtual_margin = 600
+    # bytes of recorded text in the undo history
+    undo_limit = UNDO_LIMIT
+    # seconds between the last keystroke and the filtering
+    search_delay = 0.05
+    # tiles from which the auto render mode is the performance mode
+    render_threshold = AUTO_TILES
+
+    def __init__(
+        self,
+        filepath,
+        file_config,
+        parent=None,
+        progressive=False,
+        virtual=False,
+        journal=False,
+        watch=False,
+        multi_select=False,
+        render=None,
+    ):
         super().__init__(parent)
 
         self.filepath = filepath
         self.file_config = file_config
+        self.data = BoardData.from_config(file_config)
+        # the index observes the data before the model, so that a column
+        # created by the model is filtered with an up to date index
+        self.search_index = SearchIndex(self.data, self.schedule_search)
+        self.search_matches = None
+        self.model = BoardModel(self.data, self)
+        self.model.columnInserted.connect(self.add_subboard)
+        self.model.columnRemoved.connect(self.remove_subboard)
+        self.model.columnMoved.connect(self.move_subboard)
+        self.model.boardChanged.connect(self.board_update)
+        for signal in (
+            self.model.columnInserted,
+            self.model.columnRemoved,
+            self.model.columnMoved,
+        ):
+            signal.connect(self.schedule_update)
+        self.saver = BoardSaver(self.data, filepath, self)
+        self.journal = None
+        if journal:
+            self.journal = Journal(self.data, filepath, self.request_compaction)
+            self.saver.journal = self.journal
+            # the recovered edits are not in the file yet
+            if self.journal.recovered:
+                self.data.mark_dirty()
+        self.undo_stack = UndoStack(
+            self.data, self.undo_limit, lambda close: QTimer.singleShot(0, close)
+        )
+        self.selection = SelectionManager(self, multi_select)
+        self.search_timer = QTimer(
+            self, interval=int(self.search_delay * 1000), singleShot=True
+        )
+        self.search_timer.timeout.connect(self.apply_search)
+        QShortcut(QKeySequence.Undo, self, self.undo)
+        QShortcut(QKeySequence.Find, self, lambda: self.search_edit.setFocus())
+        QShortcut(QKeySequence.Redo, self, self.redo)
+        self.file_digest = None
+        self.watcher = None
+        self.reload_timer = QTimer(self, interval=200, singleShot=True)
+        self.reload_timer.timeout.connect(self.reload)
+        if watch:
+            self.watcher = QFileSystemWatcher([filepath], self)
+            self.watcher.fileChanged.connect(self.reload_timer.start)
+        self.progressive = progressive
+        self.virtual = virtual
+        self.fill_timer = QTimer(self, interval=0)
+        self.fill_timer.timeout.connect(self.fill_step)
+        self.update_timer = QTimer(self, interval=0, singleShot=True)
+        self.update_timer.timeout.connect(self.update_columns)
+        self._fill_start = time.perf_counter()
+        self._column_size = None
+        self._hold = 0
+        self._edges = None
+        self._color_menu = None
+        self.theme = Theme.from_config(self.data.settings)
+        self._styled_colors = set(self.theme.names())
+        self._styled_colors.update(
+            self.theme.resolve(column.color) for column in self.data.columns
+        )
+        self.setStyleSheet(self.theme.stylesheet(self._styled_colors))
+        self.render = resolve_mode(
+            render or self.data.settings.get("render", "auto"),
+            self.data.tile_count(),
+            self.render_threshold,
+        )
+        gui_logger.debug(f"Render mode {self.render}")
 
-        self.draw_board(file_config)
+        self.draw_board()
         self.setAcceptDrops(True)
 
         gui_logger.info("Main xban board created")
 
-    def draw_board(self, file_config):
+    @timed("draw_board")
+    def draw_board(self):
         """Initiate UI
 
         The UI consists of 2 parts, top is the board title and info
         and button is the subbords with tiles in each ones
-        the subboard is drawn based on file_configuration
+        the subboard is drawn based on the board data
         """
-        config, content = file_config
 
         mainlayout = QVBoxLayout()
         mainlayout.setContentsMargins(20, 20, 20, 20)
 
-        title_edit = QLineEdit(
-            config["xban_config"]["title"],
-            objectName="windowEdit_title",
-            parent=self,
+        self.title_edit = QLineEdit(
+            self.data.title, objectName="windowEdit_title", parent=self,
         )
-        title_edit.setPlaceholderText("Enter title here ...")
+        self.title_edit.setPlaceholderText("Enter title here ...")
+        self.title_edit.textChanged.connect(self.data.set_title)
 
-        info_edit = NoteTile(
-            config["xban_config"]["description"], "windowEdit_text", self
+        self.info_edit = NoteTile(self.data.description, "windowEdit_text", self)
+        self.info_edit.setPlaceholderText("Enter description here ...")
+        self.info_edit.textChanged.connect(
+            lambda: self.data.set_description(self.info_edit.toPlainText())
         )
-        info_edit.setPlaceholderText("Enter description here ...")
 
-        mainlayout.addWidget(title_edit)
-        mainlayout.addWidget(info_edit)
+        self.search_edit = QLineEdit(objectName="windowEdit_search", parent=self)
+        self.search_edit.setPlaceholderText("Search tiles ...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(lambda: self.search_timer.start())
+
+        mainlayout.addWidget(self.title_edit)
+        mainlayout.addWidget(self.info_edit)
+        mainlayout.addWidget(self.search_edit)
 
         self.sublayout = QHBoxLayout()
-        color = config["xban_config"]["board_color"]
         self.sublayout.setContentsMargins(10, 10, 10, 10)
-        
+
         self.sublayout.setSpacing(20)
 
-        add_btn = BanButton(
+        self.add_btn = BanButton(
             "+",
-            clicked=self.insert_board,
+            clicked=lambda: self.insert_board(),
             toolTip="add board",
             objectName="windowBtn_add",
         )
-        shadow = QGraphicsDropShadowEffect(
-            self, blurRadius=10, offset=5, color=QColor("lightgrey")
-        )
-        add_btn.setGraphicsEffect(shadow)
-        self.sublayout.addWidget(add_btn)
+        add_shadow(self.add_btn, self.render)
+        self.sublayout.addWidget(self.add_btn)
 
         mainlayout.addLayout(self.sublayout)
         self.setLayout(mainlayout)
 
-        for i, tile_contents in enumerate(content.items()):
-            # insert the boards
-            self.insert_board(tile_contents, color[i])
+        for index in range(len(self.data.columns)):
+            if (self.progressive or self.virtual) and index > 0:
+                self.add_skeleton(index)
+            else:
+                self.add_subboard(index)
+
+    def board_update(self):
+        """Update the title and description after the board data changed"""
+
+        if self.title_edit.text() != self.data.title:
+            self.title_edit.setText(self.data.title)
+        if self.info_edit.toPlainText() != self.data.description:
+            self.info_edit.setPlainText(self.data.description)
 
+    @timed("insert_board")
     def insert_board(self, content=("", ()), color="black"):
-        """Insert a board into the layout"""
-        new_board = SubBoard(content, color, self)
+        """Append a new board to the board data
+
+        The widget is created by add_subboard once the model reports
+        the new column
+        """
+        title, tiles = content
+        self.data.insert_column(-1, ColumnData(title, tiles, color))
+
+    def create_subboard(self, index):
+        """Create the subboard widget of the column at index"""
+
+        new_board = SubBoard(self.model.tile_models[index], self)
+        if self._column_size is None:
+            self._column_size = new_board.minimumSizeHint()
         new_board.delBoardSig.connect(partial(self.delete_board, new_board))
-        new_board.listwidget.itemSelectionChanged.connect(
-            partial(self.single_selection, new_board.listwidget)
+        self.selection.add_view(new_board.listview)
+        if self.search_matches is not None:
+            self.filter_subboard(index, new_board)
+        return new_board
+
+    def add_subboard(self, index):
+        """Insert the subboard widget of the column at index"""
+
+        # the plus button always stays at the end
+        self.sublayout.insertWidget(index, self.create_subboard(index))
+        self._edges = None
+
+    def add_skeleton(self, index):
+        """Insert a skeleton for the column at index"""
+
+        skeleton = SubBoardSkeleton(self.model.tile_models[index], self)
+        if self._column_size is not None:
+            skeleton.setMinimumSize(self._column_size)
+        self.sublayout.insertWidget(index, skeleton)
+        self._edges = None
+
+    def realize_subboard(self, index):
+        """Replace the skeleton at index with the real subboard"""
+
+        skeleton = self.sublayout.itemAt(index).widget()
+        if not isinstance(skeleton, SubBoardSkeleton):
+            return
+        self.sublayout.replaceWidget(skeleton, self.create_subboard(index))
+        skeleton.deleteLater()
+
+    def release_subboard(self, index):
+        """Replace the subboard at index with a skeleton
+
+        Subboards holding the keyboard focus (an open editor) are kept.
+        """
+
+        board = self.sublayout.itemAt(index).widget()
+        if not isinstance(board, SubBoard):
+            return
+        if board.isAncestorOf(QApplication.focusWidget()):
+            return
+        skeleton = SubBoardSkeleton(board.tile_model, self)
+        skeleton.setMinimumSize(self._column_size)
+        self.sublayout.replaceWidget(board, skeleton)
+        board.deleteLater()
+
+    @contextmanager
+    def holding(self):
+        """Keep the built subboards while in the context (e.g. a drag)"""
+
+        self._hold += 1
+        try:
+            yield
+        finally:
+            self._hold -= 1
+            self.schedule_update()
+
+    def column_range(self):
+        """Range of the column indices that should be built
+
+        Without virtual mode all the columns are built. In virtual mode
+        only the columns within virtual_margin pixels of the visible
+        part of the board, the first column if nothing is visible yet.
+        """
+
+        count = self.sublayout.count() - 1
+        if not self.virtual:
+            return range(count)
+        visible = self.visibleRegion().boundingRect()
+        if visible.isEmpty():
+            return range(min(count, 1))
+
+        lefts, rights = self.column_edges()
+        first = bisect_left(rights, visible.left() - self.virtual_margin, 0, count)
+        last = bisect_right(lefts, visible.right() + self.virtual_margin, 0, count)
+        return range(first, max(first, last))
+
+    def column_edges(self):
+        """Sorted left and right edges of the sublayout items
+
+        The items are laid out from left to right, so both lists are
+        sorted and the item at a position is found with bisect. The
+        edges are cached until the layout changes (see event).
+        """
+
+        if self._edges is None:
+            geometries = [
+                self.sublayout.itemAt(i).geometry()
+                for i in range(self.sublayout.count())
+            ]
+            self._edges = (
+                [geometry.left() for geometry in geometries],
+                [geometry.right() for geometry in geometries],
+            )
+        return self._edges
+
+    def event(self, event):
+        """Drop the cached column edges when the layout is updated
+
+        The painted shadows reach past the widgets, in the performance
+        mode the whole board is repainted after a relayout.
+        """
+
+        if event.type() == QEvent.LayoutRequest:
+            self._edges = None
+            if self.render == "performance":
+                self.update()
+        return super().event(event)
+
+    def paintEvent(self, event):
+        """Paint the shadows of the columns in the performance mode
+
+        Only the items whose shadow intersects the repainted area are
+        looked at, found by bisecting the column edges.
+        """
+
+        if self.render != "performance":
+            return
+        area = event.rect()
+        lefts, rights = self.column_edges()
+        margin = SHADOW_BLUR + SHADOW_OFFSET
+        first = bisect_left(rights, area.left() - margin)
+        last = bisect_right(lefts, area.right() + margin)
+        painter = QPainter(self)
+        for index in range(first, last):
+            widget = self.sublayout.itemAt(index).widget()
+            if widget is self.add_btn:
+                radius = 5
+            elif isinstance(widget, SubBoard):
+                radius = 8
+            else:
+                continue
+            geometry = widget.geometry()
+            if shadow_rect(geometry).intersects(area):
+                paint_shadow(painter, geometry, radius)
+        painter.end()
+
+    def schedule_update(self):
+        """Update the built columns once the event loop is idle"""
+
+        if self.virtual or self.progressive:
+            self.update_timer.start()
+
+    def update_columns(self):
+        """Release the columns out of range and start building the others"""
+
+        target = self.column_range()
+        if self.virtual and not self._hold and not self.visibleRegion().isEmpty():
+            for index in range(self.sublayout.count() - 1):
+                if index not in target:
+                    self.release_subboard(index)
+
+        if self.is_filling() and not self.fill_timer.isActive():
+            self._fill_start = time.perf_counter()
+            self.fill_timer.start()
+
+    def is_filling(self):
+        """True while some columns in range are still skeletons"""
+
+        return any(
+            isinstance(self.sublayout.itemAt(i).widget(), SubBoardSkeleton)
+            for i in self.column_range()
         )
-        # insert second to last
-        self.sublayout.insertWidget(self.sublayout.count() - 1, new_board)
 
-    def delete_board(self, board):
-        """Delete the board"""
+    def fill_step(self, budget=None):
+        """Build subboards until the time budget of the tick is used
+
+        The skeletons in column_range are built from left to right, the
+        range is computed again every tick since the columns or the
+        viewport can change during the fill.
+        """
+
+        deadline = time.perf_counter() + (budget or self.fill_budget)
+        for index in self.column_range():
+            if isinstance(self.sublayout.itemAt(index).widget(), SubBoardSkeleton):
+                self.realize_subboard(index)
+                if time.perf_counter() > deadline:
+                    return
+
+        self.fill_timer.stop()
+        gui_logger.debug(
+            f"Board filled in {time.perf_counter() - self._fill_start:.3f}s"
+        )
+        self.filled.emit()
 
+    def fill(self):
+        """Build all remaining subboards in range at once"""
+
+        self._fill_start = time.perf_counter()
+        self.fill_step(budget=float("inf"))
+
+    def moveEvent(self, event):
+        """The board moves inside the scroll area when scrolled"""
+        super().moveEvent(event)
+        self.schedule_update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._edges = None
+        self.schedule_update()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.schedule_update()
+
+    def remove_subboard(self, index):
+        """Remove the subboard widget of the removed column"""
+
+        board = self.sublayout.itemAt(index).widget()
         self.sublayout.removeWidget(board)
         board.deleteLater()
+        self._edges = None
 
+    def move_subboard(self, src, dst):
+        """Move the subboard widget to follow the column move"""
+
+        board = self.sublayout.itemAt(src).widget()
+        self.sublayout.removeWidget(board)
+        self.sublayout.insertWidget(dst, board)
+        self._edges = None
+
+    def delete_board(self, board):
+        """Delete the board"""
+
+        self.data.remove_column(self.sublayout.indexOf(board))
+
+    @timed("parse_board")
     def parse_board(self):
         """Parse the board to the correct yaml files
 
-        Note this function will rewrite the file
-        """
-        color = []
-        content = {}
-        title = self.layout().itemAt(0).widget().text()
-        description = self.layout().itemAt(1).widget().toPlainText()
-        sublayout = self.layout().itemAt(2)
-        # exclude the plus button
-        for i in range(sublayout.count() - 1):
-            subboard = sublayout.itemAt(i).widget()
-            color.append(subboard.color)
-            sub_content = subboard.parse()
-            content.update({sub_content[0]: sub_content[1]})
-        config = {
-            "xban_config": {
-                "title": title,
-                "description": description,
-                "board_color": color,
-            }
-        }
-        return [config, content]
+        The content is read from the board data, so the widgets are
+        not traversed
+        """
+        return self.data.to_config()
 
     def get_index(self, pos):
-        """Get index of the subboard layout based on the mouse position"""
+        """Get index of the subboard layout based on the mouse position
 
-        sublayout = self.layout().itemAt(2)
-        for i in range(sublayout.count()):
-            if sublayout.itemAt(i).geometry().contains(pos):
-                return i
+        -1 if the position is not on a subboard (or the plus button)
+        """
+
+        index = bisect_left(self.column_edges()[1], pos.x())
+        if index < self.sublayout.count():
+            if self.sublayout.itemAt(index).geometry().contains(pos):
+                return index
         return -1
 
     def dragEnterEvent(self, event):
@@ -163,45 +622,370 @@ class BanBoard(QWidget):
         """Drop Event
 
         When the widget is dropped, determine the current layout index
-        of the cursor and insert widget in the layout
+        of the cursor and move the column there
 
         Note the last widget of the layout is the plus button, hence
         never insert at the end
         """
 
-        position = event.pos()
+        position = event.position().toPoint()
         widget = event.source()
 
-        sublayout = self.layout().itemAt(2)
         index_new = self.get_index(position)
         if index_new >= 0:
-            index = min(index_new, sublayout.count() - 1)
-            sublayout.insertWidget(index, widget)
+            self.data.move_column(self.sublayout.indexOf(widget), index_new)
         event.setDropAction(Qt.MoveAction)
         event.accept()
 
     def save_board(self):
-        """Save the board to yaml file"""
+        """Save the board to yaml file
+
+        Nothing is written if the board has not changed since the last
+        save, otherwise the board is written in the background by the
+        BoardSaver, where only the changed columns are serialized again.
+        """
+
+        if not self.data.dirty:
+            gui_logger.debug(f"No changes to save to {self.filepath}")
+            return
+        self.saver.save()
+
+    def reload(self):
+        """Apply the changes of the file made outside of xban
+
+        Writes of xban itself are recognized by the content hash and
+        ignored. If the board has unsaved edits as well, resolve_conflict
+        decides which version is kept, the local edits are overwritten
+        by the next save otherwise. The saves of the local edits still
+        in flight are discarded, see BoardSaver.discard.
+        """
+
+        # a file replaced by a rename is no longer watched
+        if self.watcher is not None and os.path.exists(self.filepath):
+            if self.filepath not in self.watcher.files():
+                self.watcher.addPath(self.filepath)
+        try:
+            with open(self.filepath, "r") as f:
+                digest = content_hash(f.read())
+        except OSError as e:
+            gui_logger.warning(f"Cannot read {self.filepath}. Error: {str(e)}")
+            return
+        if digest == self.file_digest or self.saver.wrote(digest):
+            return
+        file_config = process_yaml(self.filepath)
+        if not file_config:
+            gui_logger.warning(f"{self.filepath} changed to an invalid board, ignored")
+            return
+        self.file_digest = digest
+
+        ops = diff_board(self.data, file_config)
+        if not ops:
+            return
+        if self.data.dirty and not self.resolve_conflict():
+            gui_logger.warning(
+                f"{self.filepath} changed on disk, the next save overwrites it"
+            )
+            return
+        for op in ops:
+            apply_operation(self.data, op)
+        self.saver.discard()
+        self.data.mark_clean()
+        if self.journal is not None:
+            self.journal.compact(digest, self.journal.seq)
+        gui_logger.info(f"Reloaded {len(ops)} changes from {self.filepath}")
+
+    def resolve_conflict(self):
+        """Ask whether the file replaces the unsaved edits"""
+
+        reply = QMessageBox.question(
+            self,
+            "File Changed",
+            f"{os.path.basename(self.filepath)} changed on disk and the board has "
+            "unsaved edits. Reload the file and discard the edits?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No,
+        )
+        return reply == QMessageBox.Yes
+
+    def undo(self):
+        if not self.undo_stack.undo():
+            gui_logger.info("Nothing to undo")
+
+    def redo(self):
+        if not self.undo_stack.redo():
+            gui_logger.info("Nothing to redo")
+
+    def schedule_search(self):
+        """Filter again after an edit, only while searching"""
+
+        if self.search_matches is not None:
+            self.search_timer.start()
+
+    def apply_search(self):
+        """Filter the tiles of the built subboards by the search text
+
+        The skeletons are filtered once they are built.
+        """
+
+        self.search_matches = self.search_index.query(self.search_edit.text())
+        for index in range(len(self.data.columns)):
+            board = self.sublayout.itemAt(index).widget()
+            if isinstance(board, SubBoard):
+                self.filter_subboard(index, board)
+        if self.search_matches is not None:
+            gui_logger.info(f"{len(self.search_matches)} tiles match the search")
+
+    def filter_subboard(self, index, board):
+        if self.search_matches is None:
+            board.listview.filter_rows(None)
+        else:
+            rows = self.search_index.matching_rows(index, self.search_matches)
+            board.listview.filter_rows(rows)
+
+    def color_menu(self):
+        """The color menu shared by the subboards, built on first use"""
+
+        if self._color_menu is None:
+            self._color_menu = ColorMenu(self.theme, self)
+        return self._color_menu
+
+    def style_color(self, color):
+        """Name of the rules of color in the board style sheet
+
+        The style sheet is only set again for a color without rules (a
+        hex color new to the board), which restyles the whole board.
+        """
+
+        name = self.theme.resolve(color)
+        if name not in self._styled_colors:
+            self._styled_colors.add(name)
+            self.setStyleSheet(self.theme.stylesheet(self._styled_colors))
+        return name
+
+    def request_compaction(self):
+        """Save once the journal is long, the save compacts the journal
+
+        Called from inside a data mutation, so the save is deferred to
+        the event loop.
+        """
+        QTimer.singleShot(0, self.save_board)
+
+
+class SelectionManager(QObject):
+    """Track the column views with selected tiles
+
+    Without multi only one column has a selection: selecting tiles in a
+    column clears the selection of the previously active column, the
+    other columns are not visited. With multi the selections of all
+    columns are kept, see selected_tiles.
+    """
+
+    def __init__(self, parent=None, multi=False):
+        super().__init__(parent)
+        self._multi = multi
+        # views with a selection, the active (last selected) one last
+        self.views = []
+
+    @property
+    def active(self):
+        return self.views[-1] if self.views else None
+
+    @property
+    def multi(self):
+        return self._multi
+
+    @multi.setter
+    def multi(self, multi):
+        """Leaving the multi-column mode keeps the active column only"""
+
+        self._multi = multi
+        if not multi:
+            for view in self.views[:-1]:
+                view.clearSelection()
+
+    def add_view(self, view):
+        view.selectionModel().selectionChanged.connect(
+            lambda *_: self.selection_changed(view)
+        )
+        view.destroyed.connect(lambda *_: self.discard(view))
+
+    def selection_changed(self, view):
+        if not view.selectionModel().hasSelection():
+            self.discard(view)
+            return
+        if view in self.views:
+            self.views.remove(view)
+        elif not self._multi:
+            # clearing a selection calls back into discard
+            others, self.views = self.views, []
+            for other in others:
+                other.clearSelection()
+        self.views.append(view)
+
+    def discard(self, view):
+        if view in self.views:
+            self.views.remove(view)
+
+    def selected_tiles(self, exclude=None):
+        """(column, rows) of the selected tiles, except of view exclude"""
+
+        return [
+            (view.model().column_index(), view.selected_rows())
+            for view in self.views
+            if view is not exclude
+        ]
+
+
+class BoardModel(QObject, BoardObserver):
+    """Shared model of the whole board
+
+    The board model observes the board data and owns one TileModel per
+    column, the column views only display their own TileModel. Column
+    changes are re-emitted as signals for the board widget.
+    """
+
+    columnInserted = Signal(int)
+    columnRemoved = Signal(int)
+    columnMoved = Signal(int, int)
+    boardChanged = Signal()
+
+    def __init__(self, data, parent=None):
+        super().__init__(parent)
+        self.data = data
+        self.tile_models = [TileModel(self, column) for column in data.columns]
+        data.observers.append(self)
 
-        xban_content = self.parse_board()
-        save_yaml(self.filepath, xban_content)
-        gui_logger.info(f"Saved to {self.filepath}")
+    def column_of(self, tile_model):
+        """Index of the column displayed by tile_model"""
+        return self.tile_models.index(tile_model)
 
-    def single_selection(self, selected_board):
-        """ensure that only single tile from a board is selected
+    def move_tiles(self, src_model, rows, dst_model, dst_row, others=()):
+        """Move tiles between (or within) the column models
 
-        This is achieved by emit and received every time there
-        is a selection made. The has selection check makes sure
-        that it does not go into a recursion, since clear
-        selection also triggers the signal
+        others are (column, rows) of further tiles moved along, the
+        selection of the other columns in the multi-column mode.
         """
 
-        if selected_board.selectionModel().hasSelection():
-            for i in range(self.sublayout.count() - 1):
-                subboard = self.sublayout.itemAt(i).widget().listwidget
+        selection = [(self.column_of(src_model), rows)]
+        selection.extend((column, rows) for column, rows in others)
+        return self.data.move_selection(
+            selection, self.column_of(dst_model), dst_row
+        )
+
+    # observer hooks
+
+    def tiles_about_to_be_inserted(self, col, first, last):
+        self.tile_models[col].beginInsertRows(QModelIndex(), first, last)
+
+    def tiles_inserted(self, col, first, last):
+        self.tile_models[col].endInsertRows()
+
+    def tiles_about_to_be_removed(self, col, first, last):
+        self.tile_models[col].beginRemoveRows(QModelIndex(), first, last)
+
+    def tiles_removed(self, col, first, last):
+        self.tile_models[col].endRemoveRows()
+
+    def tile_changed(self, col, row):
+        model = self.tile_models[col]
+        index = model.index(row)
+        model.dataChanged.emit(index, index)
+
+    def column_inserted(self, index):
+        self.tile_models.insert(index, TileModel(self, self.data.columns[index]))
+        self.columnInserted.emit(index)
+
+    def column_removed(self, index):
+        self.tile_models.pop(index)
+        self.columnRemoved.emit(index)
+
+    def column_moved(self, src, dst):
+        self.tile_models.insert(dst, self.tile_models.pop(src))
+        self.columnMoved.emit(src, dst)
+
+    def column_changed(self, index):
+        self.tile_models[index].columnChanged.emit()
+
+    def board_changed(self):
+        self.boardChanged.emit()
+
+
+class TileModel(QAbstractListModel):
+    """List model of the tiles of a single column
+
+    The model does not copy the tiles, it reads the texts directly from
+    the column data. Edits and drops are forwarded to the board data,
+    which notifies the model back through the BoardModel.
+    """
+
+    columnChanged = Signal()
+
+    def __init__(self, board_model, column):
+        super().__init__(board_model)
+        self.board_model = board_model
+        self.column = column
+
+    def column_index(self):
+        return self.board_model.column_of(self)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.column.tiles)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.EditRole):
+            return self.column.tiles[index.row()]
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        self.board_model.data.set_tile(self.column_index(), index.row(), value)
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return (
+            Qt.ItemIsEnabled
+            | Qt.ItemIsSelectable
+            | Qt.ItemIsEditable
+            | Qt.ItemIsDragEnabled
+        )
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def supportedDragActions(self):
+        return Qt.MoveAction
+
+    def mimeTypes(self):
+        return [TILE_MIME]
+
+    def mimeData(self, indexes):
+        """Encode the column and rows of the dragged tiles"""
 
-                if subboard is not selected_board:
-                    subboard.clearSelection()
+        rows = {index.row() for index in indexes}
+        return encode_tiles(self.column_index(), rows)
+
+    def dropMimeData(self, mimedata, action, row, column, parent):
+        """Move the dragged tiles into this column
+
+        The move is done here for both the source and the target, the
+        dragging view does not remove the source rows afterwards.
+        """
+
+        payload = decode_tiles(mimedata)
+        if action != Qt.MoveAction or payload is None:
+            return False
+        if row < 0:
+            row = parent.row() if parent.isValid() else self.rowCount()
+        source = self.board_model.tile_models[payload["column"]]
+        self.board_model.move_tiles(
+            source, payload["rows"], self, row, payload.get("others", ())
+        )
+        return True
 
 
 class SubBoard(QFrame):
@@ -209,34 +993,41 @@ class SubBoard(QFrame):
 
     The board contains the individual "blocks" of the board
     delBoardSig is trigger when the board is deleted
+
+    The column is dragged once the mouse moved the platform drag
+    distance. The drag preview is a downscaled grab of the subboard,
+    cached until the column or the size of the subboard changes.
     """
 
     delBoardSig = Signal()
 
-    def __init__(self, tile_contents, color, parent=None):
+    # largest size of the drag preview
+    drag_preview = QSize(240, 360)
+
+    def __init__(self, tile_model, parent=None):
         super().__init__(parent)
-        title_name, tile_items = tile_contents
-        self.color = color
+        self.tile_model = tile_model
+        self.color = tile_model.column.color
+        self._press_pos = None
+        self._drag_pixmap = None
         self.setObjectName("subBoardFrame")
 
-        shadow = QGraphicsDropShadowEffect(
-            self, blurRadius=10, offset=5, color=QColor("lightgrey")
-        )
-        self.setGraphicsEffect(shadow)
+        board = board_of(self)
+        add_shadow(self, board.render if board is not None else "quality")
 
         board = QVBoxLayout()
         board.setContentsMargins(20, 20, 20, 20)
-        tile_title = NoteTile(title_name, "boardEdit", self)
-        tile_title.setPlaceholderText("Title here ...")
+        self.tile_title = NoteTile(tile_model.column.title, "boardEdit", self)
+        self.tile_title.setPlaceholderText("Title here ...")
+        self.tile_title.textChanged.connect(self.title_change)
 
-        board.addWidget(tile_title)
+        board.addWidget(self.tile_title)
 
-        self.listwidget = BanListWidget(self)
-        self.listwidget.setStyleSheet(TILE_STYLE.get(color, "black"))
-        for tile in tile_items:
-            self.listwidget.add_item(tile)
+        self.listview = BanListView(self)
+        self.listview.setModel(tile_model)
+        self.listview.set_color(self.color)
 
-        board.addWidget(self.listwidget)
+        board.addWidget(self.listview)
 
         btn_layout = QHBoxLayout()
         add_btn = BanButton(
@@ -252,16 +1043,14 @@ class SubBoard(QFrame):
             objectName="boardBtn",
             shortcut=QKeySequence(Qt.Key_Backspace),
         )
-        color_btn = BanButton(
+        self.color_btn = BanButton(
             "\u2261",
             toolTip="change color",
             objectName="boardBtn_color",
             color=[("white", "#bdbdbd"), ("grey", "white")],
+            indicator=True,
         )
-
-        self.color_menu = self.context_menu()
-        color_btn.setMenu(self.color_menu)
-        color_btn.sizeSig.connect(self.menu_resize)
+        self.color_btn.pressed.connect(self.show_color_menu)
 
         destory_btn = BanButton(
             "\u00D7",
@@ -274,101 +1063,159 @@ class SubBoard(QFrame):
         btn_layout.addWidget(add_btn)
         btn_layout.addWidget(del_btn)
 
-        btn_layout.addWidget(color_btn)
+        btn_layout.addWidget(self.color_btn)
         btn_layout.addWidget(destory_btn)
         board.addLayout(btn_layout)
 
         self.setLayout(board)
+        tile_model.columnChanged.connect(self.column_update)
+        for signal in (
+            tile_model.columnChanged,
+            tile_model.rowsInserted,
+            tile_model.rowsRemoved,
+            tile_model.dataChanged,
+            tile_model.modelReset,
+        ):
+            signal.connect(self.clear_drag_pixmap)
+
+    @property
+    def board_data(self):
+        return self.tile_model.board_model.data
 
     def parse(self):
-        """Parse the subboard content into a content list
+        """Parse the subboard content into a content list"""
 
-        In the board layout, the first item is the title widget
-        and the second is the list widget
-        """
-        board = self.layout()
-        title = board.itemAt(0).widget().toPlainText()
+        column = self.tile_model.column
+        return column.title, list(column.tiles)
 
-        tile_items = [
-            self.listwidget.item(i).text()
-            for i in range(self.listwidget.count())
-        ]
-        return title, tile_items
+    def title_change(self):
+        """Pass the edited title to the board data"""
+
+        self.board_data.set_column_title(
+            self.tile_model.column_index(), self.tile_title.toPlainText()
+        )
+
+    def column_update(self):
+        """Update the title and color after the column data changed"""
+
+        column = self.tile_model.column
+        if column.title != self.tile_title.toPlainText():
+            self.tile_title.setPlainText(column.title)
+        if column.color != self.color:
+            self.color = column.color
+            self.listview.set_color(self.color)
 
     def add_listitem(self):
-        """Add entry for listwidget"""
+        """Add entry for listview"""
 
-        self.listwidget.add_item("")
+        row = self.board_data.insert_tiles(self.tile_model.column_index(), -1, [""])
         # set the current row the new item
-        self.listwidget.clearSelection()
-        self.listwidget.setCurrentRow(self.listwidget.count() - 1)
+        self.listview.clearSelection()
+        self.listview.setCurrentIndex(self.tile_model.index(row))
 
     def del_listitem(self):
-        """Delete entry for listwidget"""
+        """Delete the selected entries of the listview
 
-        for item in self.listwidget.selectedItems():
-            self.listwidget.del_item(item)
+        The selection is cleared first, the selection model would
+        otherwise update and signal the selection for every removed
+        block of rows.
+        """
+
+        rows = self.listview.selected_rows()
+        if rows:
+            self.listview.clearSelection()
+            self.board_data.remove_tiles(self.tile_model.column_index(), rows)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._press_pos = event.position().toPoint()
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self._press_pos = None
+        super().mouseReleaseEvent(event)
 
     def mouseMoveEvent(self, event):
         """event call when mouse movement (press and move) detected
 
         This is the core of the drag and drop for the element.
-        The QDrag object will create a the pixel image of the widget
-        HopSpot is set so that it remains where the grab point is
+        The drag starts once the mouse moved startDragDistance from
+        the press, the preview is the cached drag_pixmap and the
+        HotSpot is set so that it remains where the grab point is
         """
 
-        if event.buttons() == Qt.LeftButton:
+        pos = event.position().toPoint()
+        if (
+            event.buttons() == Qt.LeftButton
+            and self._press_pos is not None
+            and (pos - self._press_pos).manhattanLength()
+            >= QApplication.startDragDistance()
+        ):
+            self._press_pos = None
             drag = QDrag(self)
-            widget_image = self.grab()
-            mimedata = QMimeData()
-            drag.setMimeData(mimedata)
-            drag.setPixmap(widget_image)
-            drag.setHotSpot(event.pos() - self.rect().topLeft())
-            drag.exec_()
+            drag.setMimeData(QMimeData())
+            pixmap = self.drag_pixmap()
+            drag.setPixmap(pixmap)
+            width = pixmap.width() / pixmap.devicePixelRatio()
+            scale = width / max(self.width(), 1)
+            drag.setHotSpot(QPoint(int(pos.x() * scale), int(pos.y() * scale)))
+            with holding(self):
+                drag.exec()
 
         super().mouseMoveEvent(event)
 
-    def context_menu(self):
-        """Add context menu triggered by right click
+    def drag_pixmap(self):
+        """Grab of the subboard scaled down to drag_preview, cached"""
 
-        The two purpose is to delete the column
-        and change tile color
-        """
-
-        menu = QMenu(self)
+        if self._drag_pixmap is None:
+            pixmap = self.grab()
+            if (
+                pixmap.width() > self.drag_preview.width()
+                or pixmap.height() > self.drag_preview.height()
+            ):
+                pixmap = pixmap.scaled(
+                    self.drag_preview, Qt.KeepAspectRatio, Qt.SmoothTransformation
+                )
+            self._drag_pixmap = pixmap
+        return self._drag_pixmap
 
-        for color_name in TILE_STYLE:
-            label = QLabel(color_name, self)
+    def clear_drag_pixmap(self):
+        self._drag_pixmap = None
 
-            label.setStyleSheet(MENU_STYLE[color_name])
-            action = QWidgetAction(self)
-            action.setDefaultWidget(label)
-            action.triggered.connect(
-                partial(self.color_change, color=color_name)
-            )
-            menu.addAction(action)
-
-        return menu
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.clear_drag_pixmap()
 
-    def menu_resize(self, size):
-        """Resize the menu to the same width of the button if possible
+    def show_color_menu(self):
+        """Show the color menu of the board below the color button
 
-        A signal is emitted when the button is pressed, and the resize
-        function is triggered.
+        The menu is shared by all the subboards of the board, it is
+        pointed at this column before it is shown. The menu is as wide
+        as the button if possible.
         """
-        self.color_menu.setMinimumWidth(size.width())
+
+        board = board_of(self)
+        if board is not None:
+            menu = board.color_menu()
+        else:
+            menu = ColorMenu(DEFAULT_THEME, self)
+        menu.target = self
+        menu.setMinimumWidth(self.color_btn.width())
+        pos = self.color_btn.mapToGlobal(self.color_btn.rect().bottomLeft())
+        with holding(self):
+            menu.exec(pos)
+        self.color_btn.setDown(False)
 
     def color_change(self, color):
         """Change the color of the tiles"""
-        self.color = color
-        self.layout().itemAt(1).widget().setStyleSheet(TILE_STYLE[color])
+        self.board_data.set_color(self.tile_model.column_index(), color)
 
     def delete_board(self):
         """Send a confirm message to delete the board"""
         reply = QMessageBox.question(
             self,
             "Delete Board",
-            "Confirm to delete the sub-board (cannot be reversed)",
+            "Confirm to delete the sub-board (undo with Ctrl+Z)",
             QMessageBox.Yes | QMessageBox.Cancel,
             QMessageBox.Cancel,
         )
@@ -377,90 +1224,403 @@ class SubBoard(QFrame):
             self.delBoardSig.emit()
 
 
-class BanListWidget(QListWidget):
+class ColorMenu(QMenu):
+    """The color menu of the subboards
+
+    A single menu is shared by the subboards of a board (see
+    BanBoard.color_menu), target is the subboard it was opened for.
+    The menu lists the named colors of the theme.
+    """
+
+    def __init__(self, theme, parent=None):
+        super().__init__(parent)
+        self.target = None
+
+        for color_name in theme.names():
+            label = QLabel(color_name, self)
+
+            label.setStyleSheet(theme.menu_style(color_name))
+            action = QWidgetAction(self)
+            action.setDefaultWidget(label)
+            action.triggered.connect(partial(self.color_change, color_name))
+            self.addAction(action)
+
+    def color_change(self, color):
+        if self.target is not None:
+            self.target.color_change(color)
+
+
+class SubBoardSkeleton(QFrame):
+    """Lightweight stand-in of a SubBoard
+
+    The skeleton only displays the column title, it is used for the
+    columns that are not built yet (see BanBoard progressive mode).
+    """
+
+    def __init__(self, tile_model, parent=None):
+        super().__init__(parent)
+        self.tile_model = tile_model
+        self.setObjectName("subBoardFrame")
+
+        board = QVBoxLayout()
+        board.setContentsMargins(20, 20, 20, 20)
+        self.tile_title = QLabel(
+            tile_model.column.title, objectName="boardSkeleton_title"
+        )
+        self.tile_title.setWordWrap(True)
+        board.addWidget(self.tile_title)
+        board.addStretch()
+        self.setLayout(board)
+        tile_model.columnChanged.connect(self.column_update)
+
+    def parse(self):
+        """Parse the skeleton content, same as SubBoard.parse"""
+
+        column = self.tile_model.column
+        return column.title, list(column.tiles)
+
+    def column_update(self):
+        self.tile_title.setText(self.tile_model.column.title)
+
+
+class BanListView(QListView):
     """Initiate individual note blocks (one layer up from note tiles)
 
-    In order to display full individual note tiles without cropping,
-    the list view needs to update its size when the individual note
-    change; and the individual note needs to resize while the listview
-    widget changes size. This results in two signal-slot: when the
-    listview changes size, it emits widthChangeSig, which connects to
-    NoteTile.adjust that adjust the width of the note. While notetile
-    changes width (or height due to added text) resizeSig is emitted and
-    connects to the BanBlock widget, which change the listwidgetitem's
-    sizeHint().
+    The view displays the TileModel of a single column. The tiles are
+    laid out in batches so that large columns do not block the first
+    paint. Dragging and dropping is handled through the shared board
+    model, which moves the tiles in one operation: the dragging view
+    never removes the source rows itself.
+
+    The color of the tiles is set with set_color, see
+    BanBoard.style_color.
     """
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setItemDelegate(TileDelegate(self))
         self.setDragDropMode(QAbstractItemView.DragDrop)
+        self.setDefaultDropAction(Qt.MoveAction)
+        self.setDragDropOverwriteMode(False)
         self.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.setWordWrap(True)
         self.setAcceptDrops(True)
         self.setEditTriggers(QAbstractItemView.DoubleClicked)
         self.setTextElideMode(Qt.ElideNone)
         self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        # rows matching the search, None without a search
+        self.matches = None
+        # False once rows moved, the hidden rows no longer follow matches
+        self._filtered = True
+        self._width = None
+        self.text_color = QColor("black")
+
+    def set_color(self, color):
+        """Color the tiles through the tileColor property
+
+        Only this view is repolished, the tile sizes are kept. Outside
+        of a board the view gets a style sheet of its own.
+        """
+
+        board = board_of(self)
+        theme = board.theme if board is not None else DEFAULT_THEME
+        if board is not None:
+            self.setProperty("tileColor", board.style_color(color))
+            self.style().unpolish(self)
+            self.style().polish(self)
+        else:
+            self.setStyleSheet(theme.tile_style(theme.resolve(color)))
+        self.text_color = QColor(theme.palette(color)["color"])
+        self.viewport().update()
+
+    def startDrag(self, supportedActions):
+        """Start the drag of the selected tiles
+
+        Unlike the default implementation, the source rows are not
+        removed after the drop since the drop already moved them.
+        """
+
+        rows = self.selected_rows()
+        if not rows:
+            return
+        model = self.model()
+        board = board_of(self)
+        others = ()
+        if board is not None and board.selection.multi:
+            others = board.selection.selected_tiles(self)
+        drag = QDrag(self)
+        drag.setMimeData(encode_tiles(model.column_index(), rows, others))
+        drag.setPixmap(self.viewport().grab(self.visualRect(model.index(rows[0]))))
+        with holding(self):
+            drag.exec(Qt.MoveAction)
+
+    def drop_row(self, pos):
+        """Row before which the tiles dropped at pos are inserted"""
+
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return self.model().rowCount()
+        if pos.y() > self.visualRect(index).center().y():
+            return index.row() + 1
+        return index.row()
 
     def dropEvent(self, event):
         """Drop and drag event
 
-        This is the main function on drop and drop
-        if the source is not self, meaning the item is moved from
-        another widget, need to delete the original item. This can
-        only be done by finding the item row and delete the whole row
-
-        The issue of listwidget is that after the drop event, the
-        new list item is newly created and no longer shares the proper
-        flags. I have found no setting to make item editable global
-        in the listwidget, the current workaround is to reset the flag
-        of each items. (it is much easier to reset all items, then to
-        find out which item is being dropped - this is certainly doable
-        but requires to custom define a item model)
+        This is the main function on drop and drop. The board model
+        moves the dragged tiles (from this or another column) in a
+        single operation, afterwards the moved tiles are selected.
         """
-        if event.source() != self:
-            board = event.source()
-            board.takeItem(board.currentRow())
 
+        self.stopAutoScroll()
+        self.setState(QAbstractItemView.NoState)
+        payload = decode_tiles(event.mimeData())
+        if payload is None:
+            event.ignore()
+            return
+
+        # deselect the moved rows at once, not block by block
+        board = board_of(self)
+        if board is not None:
+            for view in list(board.selection.views):
+                view.clearSelection()
+        model = self.model()
+        board_model = model.board_model
+        others = payload.get("others", ())
+        first = board_model.move_tiles(
+            board_model.tile_models[payload["column"]],
+            payload["rows"],
+            model,
+            self.drop_row(event.position().toPoint()),
+            others,
+        )
         event.setDropAction(Qt.MoveAction)
-        super().dropEvent(event)
+        event.accept()
+        count = len(payload["rows"]) + sum(len(rows) for _, rows in others)
+        self.select_rows(first, count)
+        self.viewport().update()
 
-        for i in range(self.count()):
-            item = self.item(i)
-            item.setFlags(item.flags() | Qt.ItemIsEditable)
+    def resizeEvent(self, event):
+        """Lay out the tiles again if the width changed
 
-    def del_item(self, item):
-        """Delete and item based on the item ID
+        The tile heights depend on the width only, a change of the
+        height does not measure the tiles again.
+        """
 
-        There no way to directly delete the item, and there's isn't
-        a good way to search the row number by item. Here we iterate
-        through all the entries and find the correct row value
+        super().resizeEvent(event)
+        width = self.viewport().width()
+        if width != self._width:
+            self._width = width
+            self.itemDelegate().set_width(width)
+            self.scheduleDelayedItemsLayout()
+
+    def setModel(self, model):
+        super().setModel(model)
+        for signal in (
+            model.rowsInserted,
+            model.rowsRemoved,
+            model.rowsMoved,
+            model.modelReset,
+        ):
+            signal.connect(self._rows_changed)
+
+    def _rows_changed(self, *args):
+        self._filtered = False
+
+    def filter_rows(self, rows):
+        """Show only the rows in rows, every row if rows is None
+
+        Only the rows whose visibility changes are hidden or shown, each
+        change schedules a layout of the view. Narrowing or widening a
+        search only looks at the rows of the previous and the new
+        matches. Starting or ending a search, or filtering after the
+        rows changed, goes through every row.
+        """
 
-        :param item QListWidgetItem: listwidget item
+        count = self.model().rowCount()
+        old = self.matches
+        if not self._filtered:
+            changed = range(count)
+        elif old is None:
+            changed = () if rows is None else (r for r in range(count) if r not in rows)
+        elif rows is None:
+            changed = (row for row in range(count) if row not in old)
+        else:
+            changed = old ^ rows
+        for row in changed:
+            hidden = rows is not None and row not in rows
+            if self._filtered or self.isRowHidden(row) != hidden:
+                self.setRowHidden(row, hidden)
+        self.matches = rows
+        self._filtered = True
+        self.viewport().update()
+
+    def selected_rows(self):
+        """Sorted rows of the selected tiles, hidden tiles excluded
+
+        Read from the selection ranges, a contiguous selection is a
+        single range however many rows it contains.
         """
 
-        for i in range(self.count()):
-            if self.item(i) is item:
-                self.takeItem(i)
+        rows = []
+        for selection_range in self.selectionModel().selection():
+            rows.extend(
+                row
+                for row in range(selection_range.top(), selection_range.bottom() + 1)
+                if not self.isRowHidden(row)
+            )
+        rows.sort()
+        return rows
 
-    def add_item(self, text):
-        """add editable text item
+    def select_rows(self, first, count):
+        """Select count rows starting from first"""
 
-        need to use item widget to make it editable
-        :param text str: content of the item
-        """
-        item = QListWidgetItem(text)
-        item.setFlags(item.flags() | Qt.ItemIsEditable | Qt.ItemIsSelectable)
-        self.addItem(item)
+        if count <= 0 or first < 0:
+            return
+        model = self.model()
+        selection = QItemSelection(model.index(first), model.index(first + count - 1))
+        self.selectionModel().select(selection, QItemSelectionModel.ClearAndSelect)
+        self.setFocus()
 
 
 class TileDelegate(QStyledItemDelegate):
     """Delegate the list widget tile editor to NoteTile
-    And adjust the size properly. This is used in listwidgetview
+
+    The tiles are measured and painted with QTextLayouts wrapped at the
+    width of the view. The heights are cached by text for the current
+    width and the layouts of the recently painted tiles are kept, so
+    relayouts and scrolling do not measure the text again. set_width
+    (called by the view) drops the caches, an edited tile is measured
+    again since its text changed.
     """
 
+    # number of kept text layouts
+    layout_cache = 1000
+    # number of cached heights before the cache is cleared
+    size_cache = 100000
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.width = None
+        self.sizes = {}
+        self.layouts = OrderedDict()
+        self._margins = None
+
+    def set_width(self, width):
+        """Set the view width, the cached sizes and layouts are dropped"""
+
+        if width != self.width:
+            self.width = width
+            self.invalidate()
+
+    def invalidate(self):
+        self.sizes.clear()
+        self.layouts.clear()
+
+    def margins(self, option):
+        """(left, top, right, bottom) between the tile and its text
+
+        The margins, borders and paddings of the style sheet plus the
+        text margin of the style.
+        """
+
+        if self._margins is None:
+            widget = option.widget
+            style = widget.style()
+            opt = QStyleOptionViewItem(option)
+            opt.rect = QRect(0, 0, 1000, 1000)
+            text = style.subElementRect(QStyle.SE_ItemViewItemText, opt, widget)
+            margin = style.pixelMetric(QStyle.PM_FocusFrameHMargin, None, widget) + 1
+            self._margins = (
+                text.left() + margin,
+                text.top(),
+                opt.rect.right() - text.right() + margin,
+                opt.rect.bottom() - text.bottom(),
+            )
+        return self._margins
+
+    def text_width(self, option):
+        left, _, right, _ = self.margins(option)
+        return max(self.width - left - right, 1)
+
+    def layout(self, text, option):
+        """Laid out text for the current width, from the cache if kept"""
+
+        layout = self.layouts.get(text)
+        if layout is not None:
+            self.layouts.move_to_end(text)
+            return layout
+        layout = QTextLayout(text.replace("\n", "\u2028"), option.font)
+        text_option = QTextOption()
+        text_option.setWrapMode(QTextOption.WrapAtWordBoundaryOrAnywhere)
+        layout.setTextOption(text_option)
+        width = self.text_width(option)
+        height = 0
+        layout.beginLayout()
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(width)
+            line.setPosition(QPointF(0, height))
+            height += line.height()
+        layout.endLayout()
+        self.layouts[text] = layout
+        if len(self.layouts) > self.layout_cache:
+            self.layouts.popitem(last=False)
+        return layout
+
+    def paint(self, painter, option, index):
+        """Paint the tile with the cached layout of its text
+
+        The style paints the tile without text (background, border and
+        selection of the style sheet), the text is drawn on top. The
+        tile is highlighted if it matches the search.
+        """
+
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        text, opt.text = opt.text, ""
+        widget = opt.widget
+        widget.style().drawControl(QStyle.CE_ItemViewItem, opt, painter, widget)
+
+        if self.width is None:
+            self.set_width(widget.viewport().width())
+        layout = self.layout(text, opt)
+        left, top, right, bottom = self.margins(opt)
+        rect = opt.rect.adjusted(left, top, -right, -bottom)
+        height = layout.boundingRect().height()
+        painter.save()
+        painter.setClipRect(opt.rect)
+        painter.setPen(widget.text_color)
+        layout.draw(painter, QPointF(rect.left(), rect.top() + (rect.height() - height) / 2))
+        painter.restore()
+
+        matches = self.parent().matches
+        if matches and index.row() in matches:
+            painter.fillRect(option.rect, SEARCH_HIGHLIGHT)
+
+    def sizeHint(self, option, index):
+        """Size of the tile wrapped at the view width, cached by text"""
+
+        if self.width is None:
+            self.set_width(self.parent().viewport().width())
+        text = index.data() or ""
+        size = self.sizes.get(text)
+        if size is None:
+            if len(self.sizes) > self.size_cache:
+                self.sizes.clear()
+            height = self.layout(text, option).boundingRect().height()
+            left, top, right, bottom = self.margins(option)
+            # slightly taller than the text, as the default tiles
+            size = QSize(
+                self.text_width(option) + left + right,
+                round(height) + top + bottom + 10,
+            )
+            self.sizes[text] = size
+        return size
 
     def createEditor(self, parent, option, index):
         """Change the default editor to NoteTile"""
@@ -481,14 +1641,6 @@ class TileDelegate(QStyledItemDelegate):
 
         model.setData(index, editor.toPlainText())
 
-    def sizeHint(self, option, index):
-        """Change the sizehint this is to prevent horizontal crop
-
-        Adjust the width slightly less than the default value
-        """
-        size = super().sizeHint(option, index)
-        return QSize(size.width() - 20, size.height() + 10)
-
     def finish_edit(self):
         """Emit signal when editing is finished
 
@@ -536,9 +1688,13 @@ class NoteTile(QTextEdit):
         """Resize the height based on the text document size
 
         The height is automatically adjusted to 1.1 times of the text
-        height so no scrolling will be displayed
+        height so no scrolling will be displayed. The widget is only
+        resized (and the parent layout updated) if the height changed,
+        most keystrokes do not change the number of lines.
         """
-        self.setFixedHeight(self.document().size().height() * 1.1)
+        height = int(self.document().size().height() * 1.1)
+        if height != self.maximumHeight():
+            self.setFixedHeight(height)
 
     def focusOutEvent(self, event):
         self.tile_finishSig.emit()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Binary cache of the processed yaml files
+
+Parsing large yaml files is the dominant cost of opening a board. The
+cache stores the result of xban_content as a pickle in a per-user cache
+directory, keyed by the real path of the board. An entry is only used if
+the size, modification time and content hash of the file all match,
+the yaml file always stays the source of truth. The total size of the
+cache is capped, the least recently used entries are removed first.
+"""
+
+import os
+import pickle
+import hashlib
+import tempfile
+import logging
+
+cache_logger = logging.getLogger("xban-cache")
+
+# default size cap of the cache directory in bytes
+CACHE_SIZE = 64 * 1024 * 1024
+
+
+def default_cache_dir():
+    """Per-user cache directory, XBAN_CACHE_DIR overrides the default"""
+
+    if os.environ.get("XBAN_CACHE_DIR"):
+        return os.environ["XBAN_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "xban")
+
+
+def content_hash(text):
+    """Hash of the file content, text can be str or bytes"""
+
+    if isinstance(text, str):
+        text = text.encode("utf-8", "surrogatepass")
+    return hashlib.sha1(text).hexdigest()
+
+
+class ParseCache:
+    """LRU cache of processed yaml files
+
+    :param cache_dir str: cache directory, created when needed
+    :param max_size int: size cap of the cache directory in bytes
+    """
+
+    suffix = ".xbancache"
+
+    def __init__(self, cache_dir=None, max_size=CACHE_SIZE):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_size = max_size
+
+    def entry_path(self, filepath):
+        name = hashlib.sha1(os.path.realpath(filepath).encode()).hexdigest()
+        return os.path.join(self.cache_dir, name + self.suffix)
+
+    @staticmethod
+    def file_key(filepath, text):
+        """Key of the file: real path, size, mtime and content hash"""
+
+        stat = os.stat(filepath)
+        return (
+            os.path.realpath(filepath),
+            stat.st_size,
+            stat.st_mtime_ns,
+            content_hash(text),
+        )
+
+    def get(self, filepath, text):
+        """Return the cached content of filepath, None on a miss
+
+        :param text: content of the file, used for the hash
+        """
+        try:
+            key = self.file_key(filepath, text)
+            entry = self.entry_path(filepath)
+            with open(entry, "rb") as f:
+                cached_key, content = pickle.load(f)
+        except Exception as e:
+            cache_logger.debug(f"Cache miss for {filepath}: {str(e)}")
+            return None
+
+        if cached_key != key:
+            cache_logger.debug(f"Cache outdated for {filepath}")
+            return None
+        try:
+            # refresh the access time for the LRU eviction
+            os.utime(entry)
+        except OSError:
+            pass
+        return content
+
+    def put(self, filepath, text, content):
+        """Store the processed content of filepath"""
+
+        try:
+            key = self.file_key(filepath, text)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump((key, content), f, pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, self.entry_path(filepath))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except Exception as e:
+            cache_logger.debug(f"Cannot cache {filepath}: {str(e)}")
+            return
+        self.evict()
+
+    def entries(self):
+        """Cache entries as (mtime, size, path), least recently used first"""
+
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(self.suffix):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def evict(self):
+        """Remove the least recently used entries above the size cap"""
+
+        try:
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_size:
+                    break
+                os.unlink(path)
+                total -= size
+        except OSError as e:
+            cache_logger.debug(f"Cannot evict cache entries: {str(e)}")
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.unlink(path)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Batch validation of board files, used by `xban check`
+
+The files are parsed by a pool of worker processes. Only a bounded
+number of files is in flight at a time and every result is handed to
+the caller as soon as it arrives, the aggregate Summary keeps constant
+size (the slowest files are kept in a small heap). This module does not
+import Qt.
+"""
+
+import os
+import time
+import heapq
+import fnmatch
+import logging
+from contextlib import contextmanager
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+    FIRST_COMPLETED,
+)
+from xban.io import io_logger, process_yaml, check_content
+
+
+BOARD_PATTERNS = ("*.yaml", "*.yml")
+
+# files submitted per worker process before waiting for results
+QUEUE_FACTOR = 4
+
+
+def find_boards(paths, patterns=BOARD_PATTERNS):
+    """Yield the board files of paths, directories are searched recursively
+
+    Files given directly are yielded regardless of their extension,
+    hidden directories are skipped.
+    """
+
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                    yield os.path.join(root, name)
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@contextmanager
+def captured_errors():
+    """Collect the messages of the io logger instead of printing them"""
+
+    handler = _ListHandler()
+    propagate = io_logger.propagate
+    io_logger.addHandler(handler)
+    io_logger.propagate = False
+    try:
+        yield handler.messages
+    finally:
+        io_logger.removeHandler(handler)
+        io_logger.propagate = propagate
+
+
+def check_file(filepath):
+    """Validate a single file and return the result as a dict
+
+    The errors logged while processing become the problems of the file,
+    an unexpected exception is the problem of the file as well.
+    """
+
+    result = {
+        "path": filepath,
+        "valid": False,
+        "problems": [],
+        "columns": 0,
+        "tiles": 0,
+        "bytes": 0,
+        "parse_time": 0.0,
+    }
+    try:
+        result["bytes"] = os.path.getsize(filepath)
+    except OSError as e:
+        result["problems"].append(str(e))
+        return result
+
+    with captured_errors() as errors:
+        start = time.perf_counter()
+        file_config = process_yaml(filepath)
+        result["parse_time"] = time.perf_counter() - start
+    if not file_config:
+        result["problems"] = errors or ["invalid yaml or xban format"]
+        return result
+
+    try:
+        result["problems"] = check_content(file_config)
+        if len(file_config) > 1:
+            content = file_config[1]
+            result["columns"] = len(content)
+            result["tiles"] = sum(
+                len(tiles) for tiles in content.values() if isinstance(tiles, list)
+            )
+    except Exception as e:
+        result["problems"] = [f"cannot check the content: {e!r}"]
+    result["valid"] = not result["problems"]
+    return result
+
+
+class Summary:
+    """Aggregate statistics of the checked files
+
+    :param slowest int: number of the slowest files to keep
+    """
+
+    def __init__(self, slowest=10):
+        self.slowest = slowest
+        self.files = 0
+        self.invalid = 0
+        self.columns = 0
+        self.tiles = 0
+        self.bytes = 0
+        self.parse_time = 0.0
+        self._heap = []
+
+    def add(self, result):
+        self.files += 1
+        self.invalid += not result["valid"]
+        self.columns += result["columns"]
+        self.tiles += result["tiles"]
+        self.bytes += result["bytes"]
+        self.parse_time += result["parse_time"]
+        item = (result["parse_time"], result["path"])
+        if len(self._heap) < self.slowest:
+            heapq.heappush(self._heap, item)
+        elif self.slowest:
+            heapq.heappushpop(self._heap, item)
+
+    def as_dict(self):
+        return {
+            "files": self.files,
+            "valid": self.files - self.invalid,
+            "invalid": self.invalid,
+            "columns": self.columns,
+            "tiles": self.tiles,
+            "bytes": self.bytes,
+            "parse_time": self.parse_time,
+            "slowest": [
+                {"path": path, "parse_time": parse_time}
+                for parse_time, path in sorted(self._heap, reverse=True)
+            ],
+        }
+
+
+def check_files(filepaths, jobs=None):
+    """Check the files and yield the results in completion order
+
+    :param jobs int: number of worker processes, defaults to the number
+        of cores, 1 checks the files in this process
+    """
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        for filepath in filepaths:
+            yield check_file(filepath)
+        return
+
+    limit = jobs * QUEUE_FACTOR
+    with ProcessPoolExecutor(jobs) as executor:
+        pending = set()
+        for filepath in filepaths:
+            pending.add(executor.submit(check_file, filepath))
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(pending):
+            yield future.result()
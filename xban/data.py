@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Qt independent storage of the board content
+
+The whole board is held in plain python lists (one list of strings per
+column) so that large boards stay compact. The Qt item models in
+board.py only wrap these structures and are kept in sync through the
+BoardObserver hooks, every mutation of the board should go through the
+BoardData methods.
+
+BoardData also tracks which parts changed since the last save: the
+configuration (title, description, colors and column order) and each
+column separately. A column caches its serialized yaml until it is
+touched again, see io.board_yaml. Saves work on a BoardSnapshot, so
+that the yaml can be dumped outside of the GUI thread.
+"""
+
+import itertools
+
+
+_column_uid = itertools.count()
+
+
+class BoardObserver:
+    """Interface notified by BoardData around every mutation
+
+    The *_about_to_be_* hooks are called before the data changes (this
+    is required by the Qt item models), the rest right after. Subclasses
+    only override the hooks they need, the defaults do nothing.
+    """
+
+    def tiles_about_to_be_inserted(self, col, first, last):
+        pass
+
+    def tiles_inserted(self, col, first, last):
+        pass
+
+    def tiles_about_to_be_removed(self, col, first, last):
+        pass
+
+    def tiles_removed(self, col, first, last):
+        pass
+
+    def tile_about_to_be_changed(self, col, row):
+        pass
+
+    def tile_changed(self, col, row):
+        pass
+
+    def column_inserted(self, index):
+        pass
+
+    def column_about_to_be_removed(self, index):
+        pass
+
+    def column_removed(self, index):
+        pass
+
+    def column_moved(self, src, dst):
+        pass
+
+    def column_about_to_be_changed(self, index):
+        pass
+
+    def column_changed(self, index):
+        pass
+
+    def board_about_to_be_changed(self):
+        pass
+
+    def board_changed(self):
+        pass
+
+
+class ColumnData:
+    """A single column (sub-board) of the board
+
+    :param title str: title of the column
+    :param tiles iterable: text of the tiles
+    :param color str: color name of the tiles
+
+    dirty is set when the title or the tiles change and yaml is the
+    cached yaml text of the column (None when it needs to be dumped).
+    version is increased on every change and uid identifies the column
+    for the lifetime of the process.
+    """
+
+    __slots__ = ("title", "color", "tiles", "dirty", "yaml", "version", "uid")
+
+    def __init__(self, title="", tiles=(), color="black"):
+        self.title = title
+        self.color = color
+        self.tiles = list(tiles)
+        self.dirty = False
+        self.yaml = None
+        self.version = 0
+        self.uid = next(_column_uid)
+
+    def touch(self):
+        """Mark the column as changed and drop the cached yaml"""
+        self.dirty = True
+        self.yaml = None
+        self.version += 1
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def __repr__(self):
+        return f"ColumnData({self.title!r}, <{len(self.tiles)} tiles>, {self.color!r})"
+
+
+def _blocks(rows):
+    """Group sorted row numbers into (first, last) contiguous blocks"""
+
+    blocks = []
+    for row in rows:
+        if blocks and blocks[-1][1] == row - 1:
+            blocks[-1][1] = row
+        else:
+            blocks.append([row, row])
+    return blocks
+
+
+class BoardSnapshot:
+    """Copy of the board content taken for a save
+
+    The snapshot does not share mutable state with the board: config is
+    the (copied) configuration document and each entry of columns is a
+    [title, tiles, yaml, uid, version] list. The tiles are only copied for
+    the columns without cached yaml, the dumped yaml is filled in by
+    io.snapshot_yaml and handed back with BoardData.mark_clean.
+    """
+
+    __slots__ = ("config", "columns", "config_version")
+
+    def __init__(self, config, columns, config_version):
+        self.config = config
+        self.columns = columns
+        self.config_version = config_version
+
+    def content(self):
+        """Content document of the snapshot, requires copied tiles"""
+        return {title: list(tiles) for title, tiles, *_ in self.columns}
+
+    def key(self):
+        """Versions of the snapshot, equal keys mean equal content"""
+        return (
+            self.config_version,
+            tuple((uid, version) for _, _, _, uid, version in self.columns),
+        )
+
+
+class BoardData:
+    """Content of a xban board: title, description and columns
+
+    settings holds the other keys of the xban configuration (such as
+    the theme and palettes, see style.Theme), they are saved unchanged.
+    """
+
+    def __init__(self, title="", description="", columns=None, settings=None):
+        self.title = title
+        self.description = description
+        self.columns = list(columns or [])
+        self.settings = dict(settings or {})
+        self.observers = []
+        self.config_dirty = False
+        self.config_version = 0
+
+    @classmethod
+    def from_config(cls, file_config):
+        """Create the board from the processed yaml content
+
+        The columns without a matching color fall back to black.
+
+        :param file_config list: [config, content] from process_yaml
+        """
+        config, content = file_config
+        xban_config = config["xban_config"]
+        colors = xban_config.get("board_color") or []
+
+        columns = []
+        for i, (title, tiles) in enumerate(content.items()):
+            color = colors[i] if i < len(colors) else "black"
+            columns.append(
+                ColumnData(str(title), (str(tile) for tile in tiles or ()), color)
+            )
+        return cls(
+            str(xban_config.get("title") or ""),
+            str(xban_config.get("description") or ""),
+            columns,
+            {
+                key: value
+                for key, value in xban_config.items()
+                if key not in ("title", "description", "board_color")
+            },
+        )
+
+    def to_config(self):
+        """Convert the board to the yaml content format"""
+
+        config = {
+            "xban_config": {
+                "title": self.title,
+                "description": self.description,
+                "board_color": [column.color for column in self.columns],
+                **self.settings,
+            }
+        }
+        content = {}
+        for column in self.columns:
+            content[column.title] = list(column.tiles)
+        return [config, content]
+
+    @property
+    def dirty(self):
+        """True if anything changed since the last mark_clean"""
+        return self.config_dirty or any(column.dirty for column in self.columns)
+
+    def dirty_columns(self):
+        """Indices of the columns changed since the last mark_clean"""
+        return [i for i, column in enumerate(self.columns) if column.dirty]
+
+    def _touch_config(self):
+        self.config_dirty = True
+        self.config_version += 1
+
+    def snapshot(self):
+        """Take a BoardSnapshot of the current content
+
+        Columns with duplicated titles are merged in the yaml mapping,
+        in that case all tiles are copied so the content can be dumped
+        as a whole.
+        """
+        config = self.to_config()[0]
+        titles = {column.title for column in self.columns}
+        merged = len(titles) != len(self.columns)
+        columns = []
+        for column in self.columns:
+            copy = merged or column.yaml is None
+            columns.append(
+                [
+                    column.title,
+                    tuple(column.tiles) if copy else None,
+                    None if merged else column.yaml,
+                    column.uid,
+                    column.version,
+                ]
+            )
+        return BoardSnapshot(config, columns, self.config_version)
+
+    def mark_clean(self, snapshot=None):
+        """Reset the change tracking, called after a successful save
+
+        With a snapshot, only the parts that did not change since the
+        snapshot was taken are marked clean and the columns get the
+        dumped yaml of the snapshot as cache. The cached column yaml is
+        kept, the next save only dumps the columns touched after.
+        """
+        if snapshot is None:
+            self.config_dirty = False
+            for column in self.columns:
+                column.dirty = False
+            return
+
+        if snapshot.config_version == self.config_version:
+            self.config_dirty = False
+        for column in self.cache_yaml(snapshot):
+            column.dirty = False
+
+    def mark_dirty(self):
+        """Mark the whole board as changed, e.g. after a recovery"""
+        self._touch_config()
+        for column in self.columns:
+            column.touch()
+
+    def cache_yaml(self, snapshot):
+        """Cache the yaml dumped from the snapshot in the columns
+
+        Only the columns unchanged since the snapshot was taken take
+        the yaml, these columns are returned.
+        """
+        saved = {
+            (uid, version): text for _, _, text, uid, version in snapshot.columns
+        }
+        unchanged = []
+        for column in self.columns:
+            key = (column.uid, column.version)
+            if key in saved:
+                unchanged.append(column)
+                if column.yaml is None:
+                    column.yaml = saved[key]
+        return unchanged
+
+    def tile_count(self):
+        """Total number of tiles of the board"""
+        return sum(len(column) for column in self.columns)
+
+    def _notify(self, hook, *args):
+        for observer in self.observers:
+            getattr(observer, hook)(*args)
+
+    # board
+
+    def set_title(self, title):
+        if title != self.title:
+            self._notify("board_about_to_be_changed")
+            self.title = title
+            self._touch_config()
+            self._notify("board_changed")
+
+    def set_description(self, description):
+        if description != self.description:
+            self._notify("board_about_to_be_changed")
+            self.description = description
+            self._touch_config()
+            self._notify("board_changed")
+
+    # columns
+
+    def insert_column(self, index, column):
+        """Insert a column, a negative index appends to the end"""
+
+        if index < 0 or index > len(self.columns):
+            index = len(self.columns)
+        self.columns.insert(index, column)
+        column.touch()
+        self._touch_config()
+        self._notify("column_inserted", index)
+        return index
+
+    def remove_column(self, index):
+        """Remove and return the column at index"""
+
+        self._notify("column_about_to_be_removed", index)
+        column = self.columns.pop(index)
+        self._touch_config()
+        self._notify("column_removed", index)
+        return column
+
+    def move_column(self, src, dst):
+        """Move column src so that it ends up at index dst"""
+
+        dst = max(0, min(dst, len(self.columns) - 1))
+        if src == dst:
+            return
+        self.columns.insert(dst, self.columns.pop(src))
+        self._touch_config()
+        self._notify("column_moved", src, dst)
+
+    def set_column_title(self, index, title):
+        column = self.columns[index]
+        if title != column.title:
+            self._notify("column_about_to_be_changed", index)
+            column.title = title
+            column.touch()
+            self._notify("column_changed", index)
+
+    def set_color(self, index, color):
+        column = self.columns[index]
+        if color != column.color:
+            self._notify("column_about_to_be_changed", index)
+            column.color = color
+            self._touch_config()
+            self._notify("column_changed", index)
+
+    # tiles
+
+    def insert_tiles(self, col, row, texts):
+        """Insert the texts as new tiles before row"""
+
+        texts = list(texts)
+        tiles = self.columns[col].tiles
+        if row < 0 or row > len(tiles):
+            row = len(tiles)
+        if not texts:
+            return row
+        last = row + len(texts) - 1
+        self._notify("tiles_about_to_be_inserted", col, row, last)
+        tiles[row:row] = texts
+        self.columns[col].touch()
+        self._notify("tiles_inserted", col, row, last)
+        return row
+
+    def remove_tiles(self, col, rows):
+        """Remove the tiles at rows and return their texts in row order"""
+
+        rows = sorted(set(rows))
+        tiles = self.columns[col].tiles
+        texts = [tiles[row] for row in rows]
+        if rows:
+            self.columns[col].touch()
+        # remove from the bottom so the remaining rows stay valid
+        for first, last in reversed(_blocks(rows)):
+            self._notify("tiles_about_to_be_removed", col, first, last)
+            del tiles[first : last + 1]
+            self._notify("tiles_removed", col, first, last)
+        return texts
+
+    def set_tile(self, col, row, text):
+        tiles = self.columns[col].tiles
+        if tiles[row] != text:
+            self._notify("tile_about_to_be_changed", col, row)
+            tiles[row] = text
+            self.columns[col].touch()
+            self._notify("tile_changed", col, row)
+
+    def move_tiles(self, src, rows, dst, dst_row):
+        """Move the tiles at rows of column src before dst_row of column dst
+
+        dst_row refers to the row before the move. The moved tiles keep
+        their relative order, the new row of the first one is returned.
+        """
+
+        return self.move_selection([(src, rows)], dst, dst_row)
+
+    def move_selection(self, selection, dst, dst_row):
+        """Move the tiles of several columns before dst_row of column dst
+
+        selection is a list of (column, rows). The moved tiles are
+        inserted in column and row order, dst_row refers to the row
+        before the move. The new row of the first tile is returned.
+        """
+
+        columns = {}
+        for col, rows in selection:
+            columns.setdefault(col, set()).update(rows)
+        texts = []
+        for col, rows in sorted(columns.items()):
+            rows = sorted(rows)
+            if col == dst:
+                dst_row -= sum(1 for row in rows if row < dst_row)
+            texts.extend(self.remove_tiles(col, rows))
+        return self.insert_tiles(dst, dst_row, texts)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Difference between the board data and a processed board file
+
+diff_board returns the operations that turn the BoardData into the
+content of the file, in the format of the journal operations (see
+journal.apply_operation). Applied through the BoardData methods, only
+the affected columns and rows of the views are updated.
+
+Columns are matched by title, a renamed column is removed and added
+again. Within a column the common head and tail of the tiles are
+skipped before the remaining tiles are compared with difflib, so the
+cost follows the size of the change rather than the size of the column.
+"""
+
+from difflib import SequenceMatcher
+from xban.data import BoardData
+
+
+def diff_tiles(col, old, new):
+    """Operations turning the tiles old of column col into new
+
+    The operations are ordered from the bottom of the column up, so
+    every row refers to the tiles before the change.
+    """
+
+    if old == new:
+        return []
+    size = min(len(old), len(new))
+    start = 0
+    while start < size and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < size - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    old = old[start : len(old) - end]
+    new = new[start : len(new) - end]
+
+    ops = []
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+        row = start + i1
+        if tag == "equal":
+            continue
+        if tag == "replace" and i2 - i1 == j2 - j1:
+            ops.extend(
+                {"op": "edit", "col": col, "row": row + k, "text": new[j1 + k]}
+                for k in range(i2 - i1)
+            )
+            continue
+        if tag in ("replace", "delete"):
+            ops.append(
+                {"op": "remove", "col": col, "first": row, "last": start + i2 - 1}
+            )
+        if tag in ("replace", "insert"):
+            ops.append({"op": "insert", "col": col, "row": row, "tiles": new[j1:j2]})
+    return ops
+
+
+def diff_board(data, file_config):
+    """Operations turning the BoardData into the processed file content
+
+    :param data BoardData: the board
+    :param file_config list: [config, content] from process_yaml
+    """
+
+    target = BoardData.from_config(file_config)
+    ops = []
+    if (target.title, target.description) != (data.title, data.description):
+        ops.append(
+            {"op": "board", "title": target.title, "description": target.description}
+        )
+
+    # remove the columns missing in the file and duplicated titles
+    wanted = {column.title for column in target.columns}
+    current = {}
+    titles = []
+    for column in data.columns:
+        if column.title in wanted and column.title not in current:
+            current[column.title] = column
+            titles.append(column.title)
+        else:
+            titles.append(None)
+    for index in reversed(range(len(titles))):
+        if titles[index] is None:
+            ops.append({"op": "remove_column", "index": index})
+            del titles[index]
+
+    # add and reorder, the columns before index are in place
+    for index, column in enumerate(target.columns):
+        if column.title not in current:
+            titles.insert(index, column.title)
+            ops.append(
+                {
+                    "op": "add_column",
+                    "index": index,
+                    "title": column.title,
+                    "color": column.color,
+                    "tiles": list(column.tiles),
+                }
+            )
+            continue
+        src = titles.index(column.title)
+        if src != index:
+            titles.insert(index, titles.pop(src))
+            ops.append({"op": "move_column", "src": src, "dst": index})
+
+    for index, column in enumerate(target.columns):
+        old = current.get(column.title)
+        if old is None:
+            continue
+        if old.color != column.color:
+            ops.append(
+                {
+                    "op": "column",
+                    "index": index,
+                    "title": column.title,
+                    "color": column.color,
+                }
+            )
+        ops.extend(diff_tiles(index, old.tiles, column.tiles))
+    return ops
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Synthetic xban boards for benchmarks and capacity testing
+
+The generated boards are valid xban yaml and reproducible: the same
+options and seed always produce the same file. The tiles are streamed
+to the file in chunks, so boards of hundreds of MB never need to fit in
+memory. Use the xban-generate command or generate_board/write_board.
+"""
+
+import os
+import math
+import random
+import click
+import yaml
+from xban.io import Dumper
+from xban.style import COLOR_DICT
+
+# tiles dumped per yaml chunk
+CHUNK_SIZE = 1000
+
+WORDS = (
+    "fix update review write test deploy plan draft design refactor "
+    "meeting release docs bug feature board tile column backlog sprint "
+    "client server cache index query report email call check merge"
+).split()
+
+UNICODE_CHARS = "éèüößñçåøæłžšđ–—…“”€£¥αβγδλπΩжзщюя中文字测试日本語한국어🙂🚀✅📌"
+
+DISTRIBUTIONS = ("uniform", "lognormal", "fixed")
+
+
+def parse_range(value):
+    """Parse 'N' or 'MIN:MAX' into a (min, max) tuple"""
+
+    if isinstance(value, (tuple, list)):
+        low, high = value
+    elif ":" in str(value):
+        low, high = str(value).split(":", 1)
+    else:
+        low = high = value
+    low, high = int(low), int(high)
+    if low < 0 or high < low:
+        raise ValueError(f"invalid range {value}")
+    return low, high
+
+
+class TileGenerator:
+    """Random tile texts with a length distribution and unicode mix
+
+    :param length tuple: (min, max) length of the tile text
+    :param distribution str: uniform, lognormal (skewed to short tiles)
+        or fixed (always the max length)
+    :param unicode_ratio float: fraction of non-ASCII characters
+    :param multiline_ratio float: fraction of tiles with line breaks
+    """
+
+    def __init__(
+        self,
+        rng,
+        length=(5, 60),
+        distribution="uniform",
+        unicode_ratio=0.0,
+        multiline_ratio=0.0,
+    ):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"unknown distribution {distribution}")
+        self.rng = rng
+        self.low, self.high = parse_range(length)
+        self.distribution = distribution
+        self.unicode_ratio = unicode_ratio
+        self.multiline_ratio = multiline_ratio
+        # median of the lognormal distribution at a quarter of the range
+        self.mu = math.log(max(1.0, self.low + (self.high - self.low) / 4))
+
+    def length(self):
+        if self.distribution == "fixed":
+            return self.high
+        if self.distribution == "lognormal":
+            value = int(self.rng.lognormvariate(self.mu, 0.75))
+            return max(self.low, min(self.high, value))
+        return self.rng.randint(self.low, self.high)
+
+    def text(self):
+        rng = self.rng
+        size = self.length()
+        words = []
+        total = 0
+        while total < size:
+            word = rng.choice(WORDS)
+            if self.unicode_ratio and rng.random() < self.unicode_ratio * 4:
+                word = "".join(
+                    rng.choice(UNICODE_CHARS)
+                    if rng.random() < self.unicode_ratio
+                    else char
+                    for char in word
+                ) + rng.choice(UNICODE_CHARS)
+            words.append(word)
+            total += len(word) + 1
+        text = " ".join(words)[:size].strip()
+        if self.multiline_ratio and rng.random() < self.multiline_ratio:
+            cut = rng.randint(0, len(text))
+            text = text[:cut] + "\n" + text[cut:]
+        return text
+
+
+def board_colors(rng, columns, colors="cycle"):
+    """Colors of the columns
+
+    :param colors: "cycle" through the tile colors, "random" colors or
+        a list of color names that is cycled
+    """
+
+    if colors == "random":
+        return [rng.choice(list(COLOR_DICT)) for _ in range(columns)]
+    palette = list(COLOR_DICT) if colors == "cycle" else list(colors)
+    for color in palette:
+        if color not in COLOR_DICT:
+            raise ValueError(f"unknown color {color}")
+    return [palette[i % len(palette)] for i in range(columns)]
+
+
+def _dump(data):
+    return yaml.dump(data, Dumper=Dumper, default_flow_style=False, sort_keys=False)
+
+
+def generate_board(
+    stream,
+    columns=10,
+    tiles=100,
+    length=(5, 60),
+    distribution="uniform",
+    unicode_ratio=0.0,
+    multiline_ratio=0.0,
+    colors="cycle",
+    seed=0,
+    title="synthetic board",
+):
+    """Write a synthetic board to the text stream
+
+    :param columns int: number of columns
+    :param tiles: tiles per column, 'N' or a 'MIN:MAX' range
+    Other parameters see TileGenerator and board_colors.
+    Returns the total number of tiles.
+    """
+
+    rng = random.Random(seed)
+    tile_range = parse_range(tiles)
+    generator = TileGenerator(
+        rng, length, distribution, unicode_ratio, multiline_ratio
+    )
+    config = {
+        "xban_config": {
+            "title": title,
+            "description": f"generated with seed {seed}",
+            "board_color": board_colors(rng, columns, colors),
+        }
+    }
+    stream.write(_dump(config))
+    stream.write("---\n")
+    if not columns:
+        stream.write("{}\n")
+        return 0
+
+    total = 0
+    for column in range(columns):
+        count = rng.randint(*tile_range)
+        if not count:
+            stream.write(_dump({f"column {column}": []}))
+            continue
+        # the generated titles are plain yaml scalars
+        stream.write(f"column {column}:\n")
+        for start in range(0, count, CHUNK_SIZE):
+            chunk = [
+                generator.text() for _ in range(min(CHUNK_SIZE, count - start))
+            ]
+            stream.write(_dump(chunk))
+        total += count
+    return total
+
+
+def write_board(filepath, **kwargs):
+    """Write a synthetic board to filepath, see generate_board"""
+
+    with open(filepath, "w") as f:
+        return generate_board(f, **kwargs)
+
+
+@click.command()
+@click.option("-c", "--columns", default=10, show_default=True, help="Number of columns")
+@click.option(
+    "-t", "--tiles", default="100", show_default=True, help="Tiles per column, N or MIN:MAX"
+)
+@click.option(
+    "-l", "--length", default="5:60", show_default=True, help="Tile text length, N or MIN:MAX"
+)
+@click.option(
+    "--distribution",
+    type=click.Choice(DISTRIBUTIONS),
+    default="uniform",
+    show_default=True,
+    help="Distribution of the tile text length",
+)
+@click.option("--unicode", "unicode_ratio", default=0.0, help="Fraction of non-ASCII characters")
+@click.option("--multiline", "multiline_ratio", default=0.0, help="Fraction of multi-line tiles")
+@click.option(
+    "--colors",
+    default="cycle",
+    show_default=True,
+    help="cycle, random or comma separated color names",
+)
+@click.option("-s", "--seed", default=0, show_default=True, help="Random seed")
+@click.option("-f", "--force", is_flag=True, help="Overwrite an existing file")
+@click.argument("filepath", type=click.Path(dir_okay=False, resolve_path=True))
+def cli(
+    columns,
+    tiles,
+    length,
+    distribution,
+    unicode_ratio,
+    multiline_ratio,
+    colors,
+    seed,
+    force,
+    filepath,
+):
+    """Generate a synthetic xban board at FILEPATH"""
+
+    if os.path.exists(filepath) and not force:
+        if not click.confirm(f"{filepath} exists, overwrite?"):
+            return
+    if colors not in ("cycle", "random"):
+        colors = [color.strip() for color in colors.split(",")]
+    try:
+        total = write_board(
+            filepath,
+            columns=columns,
+            tiles=tiles,
+            length=length,
+            distribution=distribution,
+            unicode_ratio=unicode_ratio,
+            multiline_ratio=multiline_ratio,
+            colors=colors,
+            seed=seed,
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    click.echo(f"Generated {columns} columns and {total} tiles in {filepath}")
@@ -3,15 +3,28 @@
 
 import yaml
 import os
+import shutil
+import tempfile
 import logging
-from xban.style import TILE_STYLE
+from xban.style import COLOR_DICT, Theme, config_problems
+from xban.journal import replay_journal
+from xban.timing import timed
 import random
 
 """Interaction with yaml files"""
 
 io_logger = logging.getLogger("xban-io")
 
+# use the libyaml bindings when available, they are several times faster
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
+# the process umask, used for the mode of newly created files
+UMASK = os.umask(0o022)
+os.umask(UMASK)
+
+
+@timed("xban_content")
 def xban_content(filepath, yaml_stream):
     """Check and correct yaml_stream into the correct xban format
 
@@ -44,36 +57,187 @@ def xban_content(filepath, yaml_stream):
         else:
             # if the yaml file does not have the configuration
             # check the length and add the color
+            # colors repeat when there are more columns than colors
             content_len = len(yaml_stream[0])
-            color = random.sample(TILE_STYLE.keys(), content_len)
+            styles = list(COLOR_DICT)
+            if content_len <= len(styles):
+                color = random.sample(styles, content_len)
+            else:
+                color = random.choices(styles, k=content_len)
             xban_config_default["xban_config"]["board_color"].extend(color)
             return [xban_config_default, yaml_stream[0]]
     else:
         return [xban_config_default, {}]
 
 
-def process_yaml(filepath):
+@timed("process_yaml")
+def process_yaml(filepath, cache=None, replay=False):
     """Process yaml file
 
     if the file cannot be opened, an error will be logged
     the detailed file processing see xban_content()
+
+    :param cache ParseCache: optional cache of the processed content,
+        the file is only parsed if the cache misses
+    :param replay bool: apply the edits of a journal left over from a
+        crash, see journal.replay_journal
     """
     try:
         with open(filepath, "r") as f:
-            yaml_stream = list(yaml.load_all(f, Loader=yaml.SafeLoader))
+            text = f.read()
 
-        return xban_content(filepath, yaml_stream)
+        content = None
+        if cache is not None:
+            content = cache.get(filepath, text)
+            if content is not None:
+                io_logger.debug(f"Loaded {filepath} from cache")
+
+        if content is None:
+            yaml_stream = list(yaml.load_all(text, Loader=Loader))
+            content = xban_content(filepath, yaml_stream)
+            if content and cache is not None:
+                cache.put(filepath, text, content)
+        if content and replay:
+            content = replay_journal(filepath, text, content)
+        return content
     except Exception as e:
         io_logger.error(f"Incorrect {filepath}. Error: {str(e)}")
         return []
 
 
-def save_yaml(filepath, xban_content):
-    """Save the xban configuration to yaml format"""
-    try:
-        with open(filepath, "w+") as f:
-            yaml.safe_dump_all(
-                xban_content, f, default_flow_style=False, sort_keys=False
+def structure_problems(xban_content):
+    """Problems of the processed documents that prevent reading the board
+
+    process_yaml accepts a file of the xban_config document alone, more
+    than two documents and an xban_config that is not a mapping.
+    """
+
+    if len(xban_content) < 2:
+        return ["the board content document is missing"]
+    if len(xban_content) > 2:
+        return [f"{len(xban_content)} yaml documents instead of 2"]
+    if not isinstance(xban_content[0]["xban_config"], dict):
+        return ["xban_config is not a mapping"]
+    return []
+
+
+def check_content(xban_content):
+    """Check the processed [config, content] beyond the yaml structure
+
+    The colors are the built-in colors, the palettes of the
+    configuration and hex colors. The GUI opens such files anyway
+    (unknown colors fall back to black, tiles are converted to text),
+    but a board file should not rely on it. Returns the list of
+    problems, empty if the content is valid.
+    """
+
+    problems = structure_problems(xban_content)
+    if problems:
+        return problems
+    config, content = xban_content
+    problems = config_problems(config["xban_config"])
+    theme = Theme.from_config(config["xban_config"])
+    colors = config["xban_config"].get("board_color") or []
+    if not isinstance(colors, list):
+        return problems + ["board_color is not a list"]
+    for color in colors:
+        if not theme.is_color(color):
+            problems.append(f"unknown color {color}")
+    if len(colors) < len(content):
+        problems.append(f"{len(content) - len(colors)} columns without color")
+    for title, tiles in content.items():
+        if tiles is None:
+            continue
+        if not isinstance(tiles, list):
+            problems.append(f"column {title} is not a list")
+        elif not all(isinstance(tile, (str, int, float)) for tile in tiles):
+            problems.append(f"column {title} has nested tiles")
+    return problems
+
+
+def dump_yaml(xban_content):
+    """Dump the [config, content] documents to yaml text"""
+
+    return yaml.dump_all(
+        xban_content, Dumper=Dumper, default_flow_style=False, sort_keys=False
+    )
+
+
+def snapshot_yaml(snapshot):
+    """Dump a BoardSnapshot to yaml text
+
+    Only the columns without cached yaml are serialized, the dumped
+    yaml is stored back into the snapshot columns. The content document
+    is joined from the column yaml, the result is identical to dumping
+    the whole board with dump_yaml. This function does not touch the
+    board itself and is safe to run outside of the GUI thread.
+    """
+
+    columns = snapshot.columns
+    # duplicated titles are merged by the mapping, dump it as a whole
+    if not columns or len({column[0] for column in columns}) != len(columns):
+        return dump_yaml([snapshot.config, snapshot.content()])
+
+    parts = [
+        yaml.dump(
+            snapshot.config, Dumper=Dumper, default_flow_style=False, sort_keys=False
+        ),
+        "---\n",
+    ]
+    for column in columns:
+        title, tiles, text = column[:3]
+        if text is None:
+            text = column[2] = yaml.dump(
+                {title: list(tiles)}, Dumper=Dumper, default_flow_style=False
             )
+        parts.append(text)
+    return "".join(parts)
+
+
+def board_yaml(board):
+    """Dump a BoardData to yaml text, reusing the cached column yaml"""
+
+    snapshot = board.snapshot()
+    text = snapshot_yaml(snapshot)
+    board.cache_yaml(snapshot)
+    return text
+
+
+def write_yaml(filepath, text):
+    """Write the yaml text to filepath, return True on success
+
+    The text is written to a temporary file in the same directory which
+    then replaces the target, an interrupted save never leaves a
+    truncated board behind. Symbolic links are resolved and the file
+    mode of an existing target is kept.
+    """
+
+    filepath = os.path.realpath(filepath)
+    try:
+        fd, temp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(filepath)}.", dir=os.path.dirname(filepath)
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(filepath):
+                shutil.copymode(filepath, temp_path)
+            else:
+                os.chmod(temp_path, 0o666 & ~UMASK)
+            os.replace(temp_path, filepath)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return True
     except Exception as e:
         io_logger.error(f"Cannot save {filepath}. Error: {str(e)}")
+        return False
+
+
+@timed("save_yaml")
+def save_yaml(filepath, xban_content):
+    """Save the xban configuration to yaml format"""
+
+    return write_yaml(filepath, dump_yaml(xban_content))
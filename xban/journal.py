@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Append-only journal of the board edits
+
+Every mutation of the BoardData is appended as one JSON line to a hidden
+journal next to the board file (.board.yaml.journal), so an edit costs
+a single small write instead of a full save. The first line records the
+content hash of the board file the operations apply to:
+
+    {"base": "<sha1 of the board file>", "seq": 12}
+    {"seq": 13, "op": "edit", "col": 0, "row": 2, "text": "new text"}
+
+After a successful save the journal is compacted: the operations
+included in the saved snapshot are dropped and the remaining ones are
+written under the hash of the new file. If xban crashes, the journal is
+left behind and process_yaml replays it on the next start. A journal
+whose base does not match the board file (the file changed outside of
+xban) is not replayed but kept aside as .journal.stale.
+
+This module does not import Qt.
+"""
+
+import os
+import json
+import logging
+from xban.data import BoardData, BoardObserver, ColumnData
+from xban.cache import content_hash
+
+journal_logger = logging.getLogger("xban-journal")
+
+# pending operations before the board asks for a compaction
+COMPACT_OPS = 500
+
+
+def journal_path(filepath):
+    """Path of the journal of the board file"""
+
+    file_dir, filename = os.path.split(os.path.realpath(filepath))
+    return os.path.join(file_dir, f".{filename}.journal")
+
+
+def read_journal(path):
+    """Return the (base, seq, operations) of the journal file
+
+    A truncated last line (crash while writing) is ignored. Returns
+    None if there is no journal.
+    """
+
+    try:
+        with open(path, "r") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            journal_logger.warning(f"Ignored a corrupted line of {path}")
+            break
+    if not records or "base" not in records[0]:
+        return None
+    header = records[0]
+    return header["base"], header["seq"], records[1:]
+
+
+def apply_operation(data, op):
+    """Apply a journal operation to the BoardData"""
+
+    kind = op["op"]
+    if kind == "insert":
+        data.insert_tiles(op["col"], op["row"], op["tiles"])
+    elif kind == "remove":
+        data.remove_tiles(op["col"], range(op["first"], op["last"] + 1))
+    elif kind == "edit":
+        data.set_tile(op["col"], op["row"], op["text"])
+    elif kind == "add_column":
+        data.insert_column(
+            op["index"], ColumnData(op["title"], op["tiles"], op["color"])
+        )
+    elif kind == "remove_column":
+        data.remove_column(op["index"])
+    elif kind == "move_column":
+        data.move_column(op["src"], op["dst"])
+    elif kind == "column":
+        data.set_column_title(op["index"], op["title"])
+        data.set_color(op["index"], op["color"])
+    elif kind == "board":
+        data.set_title(op["title"])
+        data.set_description(op["description"])
+    else:
+        raise ValueError(f"unknown operation {kind}")
+
+
+def replay_journal(filepath, text, file_config):
+    """Apply the journal left over from a crash to the processed content
+
+    :param text str: text of the board file, to check the journal base
+    :param file_config list: [config, content] of process_yaml
+    Returns the content with the operations applied, or file_config if
+    there is nothing to replay.
+    """
+
+    path = journal_path(filepath)
+    journal = read_journal(path)
+    if journal is None:
+        return file_config
+    base, seq, operations = journal
+    if base != content_hash(text):
+        journal_logger.warning(
+            f"{filepath} changed since the journal was written, "
+            f"the journal is kept as {path}.stale"
+        )
+        os.replace(path, path + ".stale")
+        return file_config
+    if not operations:
+        return file_config
+
+    data = BoardData.from_config(file_config)
+    applied = 0
+    for op in operations:
+        if op["seq"] <= seq:
+            continue
+        try:
+            apply_operation(data, op)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            journal_logger.error(f"Cannot replay the journal of {filepath}. Error: {e}")
+            break
+        applied += 1
+    journal_logger.info(f"Recovered {applied} unsaved edits of {filepath}")
+    return data.to_config()
+
+
+class Journal(BoardObserver):
+    """Record the edits of a BoardData in the journal file
+
+    :param data BoardData: the board, the journal registers as observer
+    :param filepath str: path of the board file
+    :param on_full: called when COMPACT_OPS operations are pending, again
+        after every COMPACT_OPS more operations until compact is called
+
+    An existing journal (replayed by process_yaml) is continued. seq is
+    the number of the last operation, see the BoardSaver for how it is
+    tied to a save.
+    """
+
+    def __init__(self, data, filepath, on_full=None):
+        self.data = data
+        self.filepath = filepath
+        self.path = journal_path(filepath)
+        self.on_full = on_full
+        self.file = None
+        self.failed = False
+        self.base = None
+        self.base_seq = 0
+        self.seq = 0
+        self.operations = []
+        self.compact_at = COMPACT_OPS
+
+        journal = read_journal(self.path)
+        if journal is not None:
+            self.base, self.base_seq, operations = journal
+            self.operations = [op for op in operations if op["seq"] > self.base_seq]
+            self.seq = self.operations[-1]["seq"] if self.operations else self.base_seq
+        data.observers.append(self)
+
+    @property
+    def recovered(self):
+        """True if the journal has operations missing in the board file"""
+        return bool(self.operations)
+
+    def append(self, op):
+        """Append the operation, one write of a single line"""
+
+        if self.failed:
+            return
+        self.seq += 1
+        op = {"seq": self.seq, **op}
+        try:
+            if self.file is None:
+                self._open()
+            self.file.write(json.dumps(op, ensure_ascii=False) + "\n")
+            self.file.flush()
+        except OSError as e:
+            self.failed = True
+            journal_logger.error(f"Cannot write the journal {self.path}. Error: {e}")
+            return
+        self.operations.append(op)
+        if len(self.operations) >= self.compact_at and self.on_full is not None:
+            # asked again if the compaction failed or did not happen
+            self.compact_at = len(self.operations) + COMPACT_OPS
+            self.on_full()
+
+    def _open(self):
+        """Start the journal of this session and open it for appending
+
+        The journal is written anew, a corrupted line left by a crash
+        would otherwise hide the operations appended after it.
+        """
+
+        if self.base is None:
+            with open(self.filepath, "r") as f:
+                self.base = content_hash(f.read())
+        self._rewrite()
+        self.file = open(self.path, "a")
+
+    def _rewrite(self):
+        """Write the header and the pending operations to a new journal"""
+
+        lines = [json.dumps({"base": self.base, "seq": self.base_seq})]
+        lines.extend(json.dumps(op, ensure_ascii=False) for op in self.operations)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, self.path)
+
+    def compact(self, digest, seq):
+        """Drop the operations up to seq, saved in the file with hash digest
+
+        The journal is removed when no operations are pending, the next
+        edit starts a new one.
+        """
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.base, self.base_seq = digest, seq
+        self.operations = [op for op in self.operations if op["seq"] > seq]
+        self.compact_at = COMPACT_OPS
+        try:
+            if self.operations:
+                self._rewrite()
+                self.file = open(self.path, "a")
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+        except OSError as e:
+            journal_logger.error(f"Cannot compact the journal {self.path}. Error: {e}")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    # BoardObserver hooks
+
+    def tiles_inserted(self, col, first, last):
+        tiles = self.data.columns[col].tiles[first : last + 1]
+        self.append({"op": "insert", "col": col, "row": first, "tiles": tiles})
+
+    def tiles_removed(self, col, first, last):
+        self.append({"op": "remove", "col": col, "first": first, "last": last})
+
+    def tile_changed(self, col, row):
+        text = self.data.columns[col].tiles[row]
+        self.append({"op": "edit", "col": col, "row": row, "text": text})
+
+    def column_inserted(self, index):
+        column = self.data.columns[index]
+        self.append(
+            {
+                "op": "add_column",
+                "index": index,
+                "title": column.title,
+                "color": column.color,
+                "tiles": list(column.tiles),
+            }
+        )
+
+    def column_removed(self, index):
+        self.append({"op": "remove_column", "index": index})
+
+    def column_moved(self, src, dst):
+        self.append({"op": "move_column", "src": src, "dst": dst})
+
+    def column_changed(self, index):
+        column = self.data.columns[index]
+        self.append(
+            {"op": "column", "index": index, "title": column.title, "color": column.color}
+        )
+
+    def board_changed(self):
+        self.append(
+            {
+                "op": "board",
+                "title": self.data.title,
+                "description": self.data.description,
+            }
+        )
@@ -5,20 +5,21 @@
 
 import sys
 import os
-from functools import partial
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QIcon, QColor, QScreen, QGuiApplication
+from PySide6.QtGui import QIcon, QScreen, QGuiApplication
 from PySide6.QtWidgets import (
     QMainWindow,
     QScrollArea,
     QStatusBar,
     QApplication,
     QStyleFactory,
-    QGraphicsDropShadowEffect,
+    QDockWidget,
 )
 import logging
 from xban.board import BanBoard
-from xban.utils import BanButton, QLogHandler
+from xban.render import FrameTimer, add_shadow
+from xban.saver import AutoSaver
+from xban.utils import BanButton, QLogHandler, LogPanel, TimingLabel
 
 
 main_logger = logging.getLogger("xban-main")
@@ -30,16 +31,53 @@ class xBanWindow(QMainWindow):
     The main window serves three major purposes:
     - statusbar (sand the save button)
     - scrollable area
+
+    autosave is the quiet period in seconds before the board is saved
+    automatically (0 disables autosave), autosave_max the maximum time
+    an edit stays unsaved while editing continuously. multi_select
+    allows selecting tiles in several columns (see BanBoard). render
+    is the render mode of the shadows (see xban.render), the save button
+    only has a shadow in the quality mode. The frame times of the window
+    are logged at debug level. The status bar shows the last load, draw
+    and save times. The log records reach the status bar in rate limited
+    batches (see QLogHandler), the log button (Ctrl+L) shows the recent
+    records in a panel.
     """
 
-    def __init__(self, base_path, file, file_config, parent=None):
+    def __init__(
+        self,
+        base_path,
+        file,
+        file_config,
+        parent=None,
+        autosave=2.0,
+        autosave_max=30.0,
+        multi_select=False,
+        render=None,
+    ):
         super().__init__(parent)
 
-        board = BanBoard(file, file_config)
+        # show the window before all columns are built and only build
+        # the columns around the visible area
+        board = BanBoard(
+            file,
+            file_config,
+            progressive=True,
+            virtual=True,
+            journal=True,
+            watch=True,
+            multi_select=multi_select,
+            render=render,
+        )
         board_area = QScrollArea()
         board_area.setWidget(board)
         board_area.setWidgetResizable(True)
         self.setCentralWidget(board_area)
+        self.autosaver = None
+        if autosave > 0:
+            self.autosaver = AutoSaver(
+                board.data, board.save_board, autosave, autosave_max, self
+            )
 
         self.stbar = QStatusBar()
 
@@ -51,34 +89,55 @@ class xBanWindow(QMainWindow):
             shortcut="Ctrl+S",
         )
 
-        shadow = QGraphicsDropShadowEffect(
-            self, blurRadius=10, offset=5, color=QColor("lightgrey")
-        )
-        save_btn.setGraphicsEffect(shadow)
+        add_shadow(save_btn, board.render)
         save_btn.pressed.connect(board.save_board)
 
+        self.log_handler = QLogHandler(self)
+        logging.getLogger().addHandler(self.log_handler)
+        self.log_handler.signal.log_msg.connect(self.stbar.showMessage)
+        self.log_dock = QDockWidget("Log", self, objectName="logDock")
+        self.log_dock.setWidget(LogPanel(self.log_handler))
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.log_dock)
+        self.log_dock.hide()
+        log_btn = BanButton(
+            "log",
+            objectName="appBtn_log",
+            toolTip="show the log",
+            shortcut="Ctrl+L",
+        )
+        log_btn.pressed.connect(self.log_dock.toggleViewAction().trigger)
+
+        self.timing_label = TimingLabel(parent=self)
+        self.stbar.addPermanentWidget(self.timing_label)
+        self.stbar.addPermanentWidget(log_btn)
         self.stbar.addPermanentWidget(save_btn)
         self.setStatusBar(self.stbar)
-        log_handler = QLogHandler(self)
-        root_logger = logging.getLogger()
-        root_logger.addHandler(log_handler)
-        log_handler.signal.log_msg.connect(
-            partial(self.stbar.showMessage, timeout=1500)
-        )
         self.stbar.showMessage(f"Initiate {file}", 1500)
+        self.frame_timer = FrameTimer(self)
         self.show()
 
     def closeEvent(self, event):
-        """Auto save when close"""
-
-        self.centralWidget().widget().save_board()
+        """Auto save when close, waiting for the background saves"""
+
+        board = self.centralWidget().widget()
+        if self.autosaver is not None:
+            self.autosaver.stop()
+        board.save_board()
+        board.saver.flush()
+        board.journal.close()
+        self.timing_label.detach()
+        logging.getLogger().removeHandler(self.log_handler)
+        main_logger.debug(f"Render mode {board.render}: {self.frame_timer.summary()}")
+        # the filter would outlive its python attributes at exit
+        self.removeEventFilter(self.frame_timer)
         super().closeEvent(event)
 
 
-def main_app(base_path, file, file_config):
+def main_app(base_path, file, file_config, **options):
     """Run the GUI of xBan
 
-    The function initiates and resize the application
+    The function initiates and resize the application,
+    the options are passed to xBanWindow
     """
     app = QApplication(sys.argv)
 
@@ -89,9 +148,11 @@ def main_app(base_path, file, file_config):
         style = style_sheet.read()
 
     app.setWindowIcon(QIcon(os.path.join(base_path, "xBanUI.png")))
-    xBanApp = xBanWindow(base_path, file, file_config)
+    xBanApp = xBanWindow(base_path, file, file_config, **options)
 
-    xBanApp.setStyleSheet(style)
+    # the theme adds the dark mode, the tile colors are set by the board
+    board = xBanApp.centralWidget().widget()
+    xBanApp.setStyleSheet(style + board.theme.window_style())
 
     # resize and move screen to center
 
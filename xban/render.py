@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Render modes of the board and frame time measurement
+
+The render mode decides how the shadows of the columns and buttons are
+drawn (see style.RENDER_MODES):
+
+- quality: the widgets have a QGraphicsDropShadowEffect. An effect
+  renders its widget offscreen on every repaint, so every scrolled
+  frame of a tall column renders the whole column again
+- performance: the board paints the shadows behind the widgets from a
+  cached nine-slice pixmap (see paint_shadow), the widgets have no
+  effect and repaint on their own
+- flat: no shadows
+- auto: performance for boards of at least threshold tiles, quality
+  otherwise
+
+FrameTimer measures the time a window takes to paint its frames.
+"""
+
+import time
+import logging
+from collections import deque
+from functools import lru_cache
+from PySide6.QtCore import QObject, QEvent, QRect, QRectF, Qt
+from PySide6.QtGui import QColor, QImage, QPainter, QPainterPath, QPen, QPixmap
+from PySide6.QtWidgets import (
+    QGraphicsBlurEffect,
+    QGraphicsDropShadowEffect,
+    QGraphicsScene,
+)
+from xban.style import RENDER_MODES
+
+render_logger = logging.getLogger("xban-render")
+
+# tiles of the board above which auto uses the performance mode
+AUTO_TILES = 5000
+SHADOW_BLUR = 10
+SHADOW_OFFSET = 5
+SHADOW_COLOR = "lightgrey"
+
+
+def resolve_mode(mode, tile_count, threshold=AUTO_TILES):
+    """The render mode used for a board of tile_count tiles
+
+    Unknown modes fall back to auto.
+    """
+
+    if mode not in RENDER_MODES:
+        render_logger.warning(f"Unknown render mode {mode}, using auto")
+        mode = "auto"
+    if mode == "auto":
+        return "performance" if tile_count >= threshold else "quality"
+    return mode
+
+
+def add_shadow(widget, mode):
+    """Give the widget a drop shadow effect in the quality mode"""
+
+    if mode == "quality":
+        shadow = QGraphicsDropShadowEffect(
+            widget,
+            blurRadius=SHADOW_BLUR,
+            offset=SHADOW_OFFSET,
+            color=QColor(SHADOW_COLOR),
+        )
+        widget.setGraphicsEffect(shadow)
+
+
+@lru_cache(maxsize=None)
+def shadow_pixmap(radius, blur=SHADOW_BLUR, color=SHADOW_COLOR):
+    """Blurred rounded square, the nine-slice source of the shadows
+
+    The corners of the square are radius + blur wide and there is a
+    single pixel between them, which is stretched along the edges.
+    """
+
+    shape = 2 * (radius + blur) + 1
+    size = shape + 2 * blur
+    path = QPainterPath()
+    path.addRoundedRect(QRectF(blur, blur, shape, shape), radius, radius)
+    scene = QGraphicsScene()
+    item = scene.addPath(path, QPen(Qt.NoPen), QColor(color))
+    # the drop shadow effect fades out about twice as fast as a blur
+    item.setGraphicsEffect(QGraphicsBlurEffect(blurRadius=blur / 2))
+
+    image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    scene.render(painter, QRectF(0, 0, size, size), QRectF(0, 0, size, size))
+    painter.end()
+    return QPixmap.fromImage(image)
+
+
+def shadow_rect(rect, blur=SHADOW_BLUR, offset=SHADOW_OFFSET):
+    """Area covered by the shadow of the widget geometry rect"""
+    return QRect(rect).translated(offset, offset).adjusted(-blur, -blur, blur, blur)
+
+
+def paint_shadow(painter, rect, radius, blur=SHADOW_BLUR, offset=SHADOW_OFFSET):
+    """Paint the shadow of the widget geometry rect from nine slices
+
+    The corners are copied, the edges and the center are stretched.
+    Targets narrower than two corners get smaller corners.
+    """
+
+    pixmap = shadow_pixmap(radius, blur)
+    target = shadow_rect(rect, blur, offset)
+    size = pixmap.width()
+    corner = 2 * blur + radius
+    width = min(corner, target.width() // 2)
+    height = min(corner, target.height() // 2)
+    source_edges = [0, corner, size - corner, size]
+    xs = [target.left(), target.left() + width, target.right() + 1 - width]
+    xs.append(target.right() + 1)
+    ys = [target.top(), target.top() + height, target.bottom() + 1 - height]
+    ys.append(target.bottom() + 1)
+    for i in range(3):
+        for j in range(3):
+            painter.drawPixmap(
+                QRect(xs[i], ys[j], xs[i + 1] - xs[i], ys[j + 1] - ys[j]),
+                pixmap,
+                QRect(
+                    source_edges[i],
+                    source_edges[j],
+                    source_edges[i + 1] - source_edges[i],
+                    source_edges[j + 1] - source_edges[j],
+                ),
+            )
+
+
+class FrameTimer(QObject):
+    """Measure the frames painted by a top level widget
+
+    The UpdateRequest event of the window paints all of its pending
+    updates, the filter handles the event itself to time it. The last
+    size frame times are kept and a summary is logged every report
+    frames at debug level.
+    """
+
+    def __init__(self, window, size=300, report=100):
+        super().__init__(window)
+        self.window = window
+        self.times = deque(maxlen=size)
+        self.frames = 0
+        self.report = report
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.UpdateRequest:
+            start = time.perf_counter()
+            obj.event(event)
+            self.record(time.perf_counter() - start)
+            return True
+        return False
+
+    def record(self, seconds):
+        self.times.append(seconds)
+        self.frames += 1
+        if self.report and self.frames % self.report == 0:
+            render_logger.debug(self.summary())
+
+    def stats(self):
+        """Mean, 95th percentile and maximum of the kept frame times"""
+
+        if not self.times:
+            return {"frames": self.frames, "mean": 0.0, "p95": 0.0, "max": 0.0}
+        times = sorted(self.times)
+        return {
+            "frames": self.frames,
+            "mean": sum(times) / len(times),
+            "p95": times[min(len(times) - 1, int(len(times) * 0.95))],
+            "max": times[-1],
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (
+            f"{stats['frames']} frames, mean {stats['mean'] * 1000:.1f} ms, "
+            f"p95 {stats['p95'] * 1000:.1f} ms, max {stats['max'] * 1000:.1f} ms"
+        )
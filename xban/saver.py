@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Background saving of the board
+
+The board is snapshotted on the GUI thread, the yaml is dumped and
+written (atomically, see io.write_yaml) by a worker in a single thread
+pool. While a save is running, further saves are coalesced: only the
+newest snapshot is kept and written after the running one finishes.
+The result is reported with the logging, which reaches the status bar
+through the QLogHandler. With a journal, the journal is compacted after
+every successful save.
+
+The AutoSaver requests the saves by itself, after the board has been
+quiet for a while.
+"""
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+from xban.io import snapshot_yaml, write_yaml
+from xban.cache import content_hash
+from xban.data import BoardObserver
+from xban.timing import span
+import logging
+
+saver_logger = logging.getLogger("xban-saver")
+
+
+class SaveSignals(QObject):
+    """Signals of the save job, QRunnable cannot emit signals itself"""
+
+    finished = Signal(object)
+
+
+class SaveJob(QRunnable):
+    """Dump and write a board snapshot in the thread pool"""
+
+    def __init__(self, filepath, snapshot, seq=0, digests=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.filepath = filepath
+        self.snapshot = snapshot
+        self.seq = seq
+        self.digest = None
+        # digests of the saves in flight, the digest is added before writing
+        self.digests = digests if digests is not None else set()
+        self.signals = SaveSignals()
+        self.success = False
+        self.handled = False
+        self.stale = False
+
+    def run(self):
+        try:
+            with span("save_yaml"):
+                text = snapshot_yaml(self.snapshot)
+                self.digest = content_hash(text)
+                self.digests.add(self.digest)
+                self.success = write_yaml(self.filepath, text)
+        except Exception as e:
+            saver_logger.error(f"Cannot save {self.filepath}. Error: {str(e)}")
+            self.success = False
+        self.signals.finished.emit(self)
+
+
+class BoardSaver(QObject):
+    """Save the board data off the GUI thread
+
+    saved is emitted on the GUI thread with the result of every write,
+    digest is the content hash of the last written file and digests the
+    hashes of the files being written, see wrote. journal is the
+    optional Journal of the board, each save records the journal
+    position of its snapshot.
+    """
+
+    saved = Signal(bool)
+
+    def __init__(self, data, filepath, parent=None):
+        super().__init__(parent)
+        self.data = data
+        self.filepath = filepath
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.current = None
+        self.pending = None
+        self.journal = None
+        self.digest = None
+        self.digests = set()
+
+    def wrote(self, digest):
+        """True if the file content of digest was written by the saver"""
+        return digest == self.digest or digest in self.digests
+
+    def discard(self):
+        """Drop the saves of the board before it was replaced by the file
+
+        The waiting save is dropped. The running save cannot be stopped,
+        once it is written the board is marked dirty and saved again.
+        """
+        self.pending = None
+        if self.current is not None:
+            self.current.stale = True
+
+    def save(self):
+        """Snapshot the board and write it in the background
+
+        If the same content is already being written (or waiting to be)
+        nothing is done, a newer snapshot replaces the waiting one.
+        """
+        snapshot = self.data.snapshot()
+        seq = self.journal.seq if self.journal is not None else 0
+        key = snapshot.key()
+        for job in (self.current, self.pending):
+            if job is not None and job.snapshot.key() == key:
+                return
+        job = SaveJob(self.filepath, snapshot, seq, self.digests)
+        if self.current is None:
+            self._start(job)
+        else:
+            self.pending = job
+
+    def _start(self, job):
+        job.signals.finished.connect(self._job_done)
+        self.current = job
+        self.pool.start(job)
+
+    def _job_done(self, job):
+        """Handle the finished job on the GUI thread"""
+
+        if job.handled:
+            return
+        job.handled = True
+        self.current = None
+        self.digests.discard(job.digest)
+        if job.stale:
+            if job.success:
+                self.digest = job.digest
+            # the old snapshot replaced the reloaded file
+            saver_logger.warning(f"Saving the reloaded board to {self.filepath}")
+            self.data.mark_dirty()
+            self.saved.emit(job.success)
+            self.save()
+            return
+        if job.success:
+            self.digest = job.digest
+            self.data.mark_clean(job.snapshot)
+            if self.journal is not None:
+                self.journal.compact(job.digest, job.seq)
+            saver_logger.info(f"Saved to {self.filepath}")
+        self.saved.emit(job.success)
+
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            self._start(pending)
+
+    def flush(self):
+        """Block until every requested save is written"""
+
+        while self.current is not None:
+            self.pool.waitForDone()
+            self._job_done(self.current)
+
+
+class AutoSaver(QObject, BoardObserver):
+    """Save the board automatically after it changed
+
+    Every change of the board data (tile edits, title and description
+    typing, drops, color changes...) restarts the quiet timer, the save
+    is requested once no change happened for delay seconds. During
+    continuous editing the board is saved at the latest max_delay
+    seconds after the first unsaved change. The save itself runs in the
+    background through save (BanBoard.save_board), which skips a board
+    that is not dirty.
+
+    :param data BoardData: the board, the autosaver registers as observer
+    :param save: function requesting the save
+    :param delay float: quiet period in seconds
+    :param max_delay float: maximum age of an unsaved change in seconds
+    """
+
+    def __init__(self, data, save, delay=2.0, max_delay=30.0, parent=None):
+        super().__init__(parent)
+        self.data = data
+        self.save = save
+        self.quiet_timer = QTimer(self, singleShot=True)
+        self.quiet_timer.setInterval(int(delay * 1000))
+        self.quiet_timer.timeout.connect(self.autosave)
+        self.stale_timer = QTimer(self, singleShot=True)
+        self.stale_timer.setInterval(int(max(delay, max_delay) * 1000))
+        self.stale_timer.timeout.connect(self.autosave)
+        data.observers.append(self)
+
+    def changed(self, *args):
+        self.quiet_timer.start()
+        if not self.stale_timer.isActive():
+            self.stale_timer.start()
+
+    tiles_inserted = tiles_removed = tile_changed = changed
+    column_inserted = column_removed = column_moved = column_changed = changed
+    board_changed = changed
+
+    def autosave(self):
+        self.quiet_timer.stop()
+        self.stale_timer.stop()
+        if self.data.dirty:
+            saver_logger.debug("Autosave")
+            self.save()
+
+    def stop(self):
+        """Stop the pending autosave and stop listening to the board"""
+
+        self.quiet_timer.stop()
+        self.stale_timer.stop()
+        if self in self.data.observers:
+            self.data.observers.remove(self)
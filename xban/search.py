@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Full-text search over the tiles of a board
+
+SearchIndex is an inverted index from the words of the tiles to tile
+ids. It is built from the BoardData on the first query, so opening a
+board does not tokenize it, and then kept up to date through the
+BoardObserver hooks, an edit only re-indexes the changed tiles. The ids of each column are kept in a list parallel to the tiles,
+so the ids follow the tiles when rows are inserted, removed or moved.
+
+A query matches the tiles containing all of its words, the words of the
+query match as prefixes ("dep" finds "deploy"). The sorted vocabulary
+is searched with bisect, a query does not look at the tiles themselves.
+
+This module does not import Qt.
+"""
+
+import re
+import itertools
+from bisect import bisect_left, insort
+from xban.data import BoardObserver
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Set of the lower case words of text"""
+    return set(WORD.findall(text.casefold()))
+
+
+class SearchIndex(BoardObserver):
+    """Inverted index of the tiles of a BoardData
+
+    :param data BoardData: the board, the index registers as observer
+    :param on_change: called after the board changed
+    """
+
+    def __init__(self, data, on_change=None):
+        self.data = data
+        self.on_change = on_change
+        self._next_id = itertools.count()
+        # word -> ids of the tiles containing it
+        self.postings = {}
+        # sorted words, for the prefix search
+        self.words = []
+        # id -> words of the tile
+        self.tokens = {}
+        # per column, the ids of the tiles in row order, None until built
+        self.ids = None
+        data.observers.append(self)
+
+    def build(self):
+        """Index the whole board, once before the first query"""
+
+        if self.ids is None:
+            columns = self.data.columns
+            self.ids = [self._add_tiles(column.tiles, False) for column in columns]
+            self.words = sorted(self.postings)
+
+    def _add_tiles(self, tiles, sort=True):
+        ids = []
+        for text in tiles:
+            tile_id = next(self._next_id)
+            self._index(tile_id, text, sort)
+            ids.append(tile_id)
+        return ids
+
+    def _index(self, tile_id, text, sort=True):
+        """Add the words of the tile, sort keeps the vocabulary sorted"""
+
+        words = tokenize(text)
+        self.tokens[tile_id] = words
+        for word in words:
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = set()
+                if sort:
+                    insort(self.words, word)
+            posting.add(tile_id)
+
+    def _unindex(self, tile_id):
+        for word in self.tokens.pop(tile_id):
+            posting = self.postings[word]
+            posting.discard(tile_id)
+            if not posting:
+                del self.postings[word]
+                del self.words[bisect_left(self.words, word)]
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    def __len__(self):
+        self.build()
+        return len(self.tokens)
+
+    def prefix_ids(self, prefix):
+        """Ids of the tiles with a word starting with prefix"""
+
+        ids = set()
+        for i in range(bisect_left(self.words, prefix), len(self.words)):
+            word = self.words[i]
+            if not word.startswith(prefix):
+                break
+            ids |= self.postings[word]
+        return ids
+
+    def query(self, text):
+        """Ids of the tiles matching all words of text, None if empty"""
+
+        words = sorted(tokenize(text), key=len, reverse=True)
+        if not words:
+            return None
+        self.build()
+        # the longest words are the most selective
+        result = self.prefix_ids(words[0])
+        for word in words[1:]:
+            if not result:
+                break
+            result &= self.prefix_ids(word)
+        return result
+
+    def matching_rows(self, col, matches):
+        """Rows of column col whose tile id is in matches"""
+
+        self.build()
+        return {row for row, tile_id in enumerate(self.ids[col]) if tile_id in matches}
+
+    # BoardObserver hooks, the index is only updated once it is built
+
+    def tiles_inserted(self, col, first, last):
+        if self.ids is not None:
+            tiles = self.data.columns[col].tiles[first : last + 1]
+            self.ids[col][first:first] = self._add_tiles(tiles)
+        self._changed()
+
+    def tiles_about_to_be_removed(self, col, first, last):
+        if self.ids is not None:
+            for tile_id in self.ids[col][first : last + 1]:
+                self._unindex(tile_id)
+            del self.ids[col][first : last + 1]
+
+    def tiles_removed(self, col, first, last):
+        self._changed()
+
+    def tile_changed(self, col, row):
+        if self.ids is not None:
+            tile_id = self.ids[col][row]
+            self._unindex(tile_id)
+            self._index(tile_id, self.data.columns[col].tiles[row])
+        self._changed()
+
+    def column_inserted(self, index):
+        if self.ids is not None:
+            self.ids.insert(index, self._add_tiles(self.data.columns[index].tiles))
+        self._changed()
+
+    def column_about_to_be_removed(self, index):
+        if self.ids is not None:
+            for tile_id in self.ids.pop(index):
+                self._unindex(tile_id)
+
+    def column_removed(self, index):
+        self._changed()
+
+    def column_moved(self, src, dst):
+        if self.ids is not None:
+            self.ids.insert(dst, self.ids.pop(src))
+        self._changed()
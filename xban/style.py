@@ -1,8 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-"""The script outlines the style sheet for tile colors"""
+"""The script outlines the style sheet for tile colors
 
+The Theme holds the palettes of the tile colors of a board: the
+built-in colors of COLOR_DICT, the palettes of the board configuration
+and palettes derived from hex colors, in a light or a dark variant.
+The style sheets are generated on first use and memoized.
+
+The tile rules are keyed by the tileColor property of the list views
+(see Theme.stylesheet), so a single style sheet covers every column and
+a column is recolored by changing the property of its view.
+"""
+
+import re
 
 COLOR_DICT = {
     "black": {"bgcolor": "#D9D7D7", "color": "black", "bcolor": "#414141"},
@@ -60,18 +71,221 @@ QLabel:hover {{
 }}
 """
 
+# the window in dark mode, added after xBanStyle.css
+DARK_WINDOW = """
+QWidget {
+  background-color: #202124;
+  color: #e8eaed;
+}
+QToolTip, QMenu {
+  background-color: #2b2c2f;
+  color: #e8eaed;
+}
+QTextEdit, QListView, QLabel#boardSkeleton_title, QFrame#subBoardFrame,
+QMessageBox, QMessageBox QLabel, QMessageBox QPushButton {
+  background-color: #2b2c2f;
+  color: #e8eaed;
+}
+QFrame#subBoardFrame {
+  border: 0.5px solid #3c4043;
+}
+QScrollBar:vertical, QScrollBar:horizontal {
+  background: #2b2c2f;
+}
+"""
+
+HEX_COLOR = re.compile(r"#(?:[0-9a-fA-F]{3}){1,2}")
+WHITE = "#ffffff"
+DARK_BASE = "#2b2c2f"
+DARK_BLACK = {"bgcolor": "#3c4043", "color": "#e8eaed", "bcolor": "#5f6368"}
+THEMES = ("light", "dark")
+# shadow drawing of the board, see xban.render. Defined here and not in
+# xban.render (which imports Qt) as config_problems validates the render
+# key of the board config and the cli offers the modes without Qt
+RENDER_MODES = ("auto", "quality", "performance", "flat")
+
 
 # The following code is for widget background and currently that is not added
 # BG_FORMAT = """background-image: url('{}') 100px 100px stretch stretch;
 # background-repeat: no-repeat; background-position: center center;
 # """
 
-"""Tile style is the color style sheet for the tiles and menu style is
-the color style sheet for the drop down menu"""
 
-TILE_STYLE = {}
-MENU_STYLE = {}
+def is_hex(color):
+    """True if color is a #rgb or #rrggbb hex color"""
+    return isinstance(color, str) and HEX_COLOR.fullmatch(color) is not None
+
+
+def mix(color, base, amount):
+    """Blend the hex colors, amount is the share of color in 0..1"""
+
+    def rgb(value):
+        value = value.lstrip("#")
+        if len(value) == 3:
+            value = "".join(c * 2 for c in value)
+        return [int(value[i : i + 2], 16) for i in (0, 2, 4)]
+
+    mixed = (
+        round(c * amount + b * (1 - amount)) for c, b in zip(rgb(color), rgb(base))
+    )
+    return "#" + "".join(f"{c:02x}" for c in mixed)
+
+
+def hex_palette(color, dark=False):
+    """Tile palette derived from the hex text color"""
+
+    if dark:
+        return {
+            "bgcolor": mix(color, DARK_BASE, 0.25),
+            "color": mix(color, WHITE, 0.6),
+            "bcolor": mix(color, DARK_BASE, 0.6),
+        }
+    return {
+        "bgcolor": mix(color, WHITE, 0.12),
+        "color": color,
+        "bcolor": mix(color, WHITE, 0.4),
+    }
+
+
+def check_palette(palette):
+    """Palette of a configured value, None if it is invalid
+
+    The value is a hex color or a mapping of hex bgcolor, color and
+    bcolor.
+    """
+
+    if is_hex(palette):
+        return palette
+    if isinstance(palette, dict) and set(palette) == {"bgcolor", "color", "bcolor"}:
+        if all(is_hex(value) for value in palette.values()):
+            return dict(palette)
+    return None
+
+
+def config_problems(xban_config):
+    """Problems of the theme, palettes and render mode of the configuration"""
+
+    problems = []
+    theme = xban_config.get("theme")
+    if theme is not None and theme not in THEMES:
+        problems.append(f"unknown theme {theme}")
+    render = xban_config.get("render")
+    if render is not None and render not in RENDER_MODES:
+        problems.append(f"unknown render mode {render}")
+    palettes = xban_config.get("palettes")
+    if palettes is None:
+        return problems
+    if not isinstance(palettes, dict):
+        return problems + ["palettes is not a mapping"]
+    for name, palette in palettes.items():
+        if check_palette(palette) is None:
+            problems.append(f"invalid palette {name}")
+    return problems
+
+
+class Theme:
+    """Palettes and style sheets of the tile colors
+
+    :param palettes dict: name -> hex color or mapping of bgcolor,
+        color and bcolor, invalid palettes are ignored
+    :param dark bool: use the dark variants of the palettes
+
+    A palette given as a single hex color is derived with hex_palette,
+    as is any hex color used as a column color. Unknown colors fall
+    back to black.
+    """
+
+    def __init__(self, palettes=None, dark=False):
+        self.dark = dark
+        self.palettes = {}
+        for name, palette in (palettes or {}).items():
+            palette = check_palette(palette)
+            if palette is not None:
+                self.palettes[str(name)] = palette
+        self._palettes = {}
+        self._tile_styles = {}
+        self._menu_styles = {}
+        self._rules = {}
+
+    @classmethod
+    def from_config(cls, xban_config):
+        """Theme of the theme and palettes keys of the board configuration"""
+
+        palettes = xban_config.get("palettes")
+        return cls(
+            palettes if isinstance(palettes, dict) else None,
+            xban_config.get("theme") == "dark",
+        )
+
+    def names(self):
+        """The named colors, built-in colors first"""
+        extra = [name for name in self.palettes if name not in COLOR_DICT]
+        return list(COLOR_DICT) + extra
+
+    def is_color(self, color):
+        return isinstance(color, str) and (
+            color in self.palettes or color in COLOR_DICT or is_hex(color)
+        )
+
+    def resolve(self, color):
+        """The color itself if it is known, black otherwise"""
+        return color if self.is_color(color) else "black"
+
+    def palette(self, color):
+        """The bgcolor, color and bcolor of the tiles of color"""
+
+        color = self.resolve(color)
+        palette = self._palettes.get(color)
+        if palette is None:
+            palette = self.palettes.get(color)
+            if palette is None and color in COLOR_DICT:
+                if not self.dark:
+                    palette = COLOR_DICT[color]
+                elif color == "black":
+                    palette = DARK_BLACK
+                else:
+                    palette = COLOR_DICT[color]["color"]
+            if palette is None:
+                palette = color
+            if isinstance(palette, str):
+                palette = hex_palette(palette, self.dark)
+            self._palettes[color] = palette
+        return palette
+
+    def tile_style(self, color):
+        """Style sheet of a single list view of color"""
+
+        style = self._tile_styles.get(color)
+        if style is None:
+            style = self._tile_styles[color] = WIDGET_FORMAT.format(
+                **self.palette(color)
+            )
+        return style
+
+    def menu_style(self, color):
+        """Style sheet of the color menu label of color"""
+
+        style = self._menu_styles.get(color)
+        if style is None:
+            style = self._menu_styles[color] = MENU_FORMAT.format(
+                **self.palette(color)
+            )
+        return style
+
+    def rules(self, color):
+        """Tile rules of color keyed by the tileColor property"""
+
+        rules = self._rules.get(color)
+        if rules is None:
+            rules = self._rules[color] = self.tile_style(color).replace(
+                "QListView", f'QListView[tileColor="{color}"]'
+            )
+        return rules
+
+    def stylesheet(self, colors):
+        """One style sheet with the tile rules of all the colors"""
+        return "".join(self.rules(color) for color in sorted(colors))
 
-for color_name, setting in COLOR_DICT.items():
-    TILE_STYLE[color_name] = WIDGET_FORMAT.format(**setting)
-    MENU_STYLE[color_name] = MENU_FORMAT.format(**setting)
+    def window_style(self):
+        """Additions to the window style sheet"""
+        return DARK_WINDOW if self.dark else ""
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Named timing spans of the load, render and save phases
+
+The phases are timed with span (a context manager) or timed (a
+decorator) under a name: process_yaml, xban_content, draw_board,
+insert_board, parse_board and save_yaml (io.save_yaml and the
+background saves of the GUI). The spans are recorded by TIMINGS:
+
+- the duration of the last span, the count and the total per name
+- with trace, every span as a Chrome trace event, see write_trace.
+  The timeline opens in chrome://tracing or Perfetto
+- while tracemalloc is tracing, the peak of the traced memory during
+  the span above the memory at its start
+
+The listeners are called with (name, seconds) after every span, in the
+thread of the span. The recording is thread safe, the saves run in a
+worker thread. tracemalloc has a single peak for all threads, so the
+peaks of spans running at the same time include each other. Before
+python 3.9 the peak cannot be reset, the peak of a span is then the
+peak since tracemalloc started.
+
+start_profiling implements `xban --profile` and `xban --trace-memory`.
+
+This module does not import Qt.
+"""
+
+import os
+import time
+import json
+import logging
+import cProfile
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager
+
+timing_logger = logging.getLogger("xban-timing")
+
+PROFILE_PREFIX = "xban-profile"
+
+
+class SpanStats:
+    """Recorded durations (seconds) and memory peak (bytes) of a name"""
+
+    __slots__ = ("count", "total", "last", "peak")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.peak = None
+
+
+class Timings:
+    """Recorder of the timing spans, see the module documentation"""
+
+    def __init__(self):
+        self.stats = {}
+        self.events = []
+        self.trace = False
+        self.listeners = []
+        self._lock = threading.Lock()
+        # per thread stack of [start memory, peak of the inner spans]
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def _memory_stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block as the span name"""
+
+        stack = None
+        if tracemalloc.is_tracing():
+            stack = self._memory_stack()
+            current, peak = tracemalloc.get_traced_memory()
+            # the peak is reset for this span, keep it for the outer one
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            stack.append([current, 0])
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            memory = None
+            if stack is not None:
+                start_memory, inner = stack.pop()
+                if tracemalloc.is_tracing():
+                    peak = max(tracemalloc.get_traced_memory()[1], inner)
+                    memory = max(peak - start_memory, 0)
+                    if stack:
+                        stack[-1][1] = max(stack[-1][1], peak)
+            self.record(name, start, seconds, memory)
+
+    def record(self, name, start, seconds, memory=None):
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = SpanStats()
+            stats.count += 1
+            stats.total += seconds
+            stats.last = seconds
+            if memory is not None:
+                stats.peak = max(stats.peak or 0, memory)
+            if self.trace:
+                event = {
+                    "name": name,
+                    "cat": "xban",
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": seconds * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+                if memory is not None:
+                    event["args"] = {"peak_memory": memory}
+                self.events.append(event)
+        for listener in list(self.listeners):
+            listener(name, seconds)
+
+    def last(self, name):
+        """Seconds of the last span name, None if it never ran"""
+
+        stats = self.stats.get(name)
+        return stats.last if stats is not None else None
+
+    def summary(self):
+        """The count, total and last duration of every name"""
+
+        with self._lock:
+            items = sorted(self.stats.items())
+        lines = []
+        for name, stats in items:
+            line = (
+                f"{name}: {stats.count}x, total {stats.total * 1000:.1f} ms, "
+                f"last {stats.last * 1000:.1f} ms"
+            )
+            if stats.peak is not None:
+                line += f", peak {stats.peak / 1024 ** 2:.2f} MB"
+            lines.append(line)
+        return lines
+
+    def write_trace(self, filepath):
+        """Write the recorded events as a Chrome trace JSON file"""
+
+        with self._lock:
+            events = list(self.events)
+        with open(filepath, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+TIMINGS = Timings()
+
+
+def span(name):
+    """Time the enclosed block as the span name of TIMINGS"""
+    return TIMINGS.span(name)
+
+
+def timed(name):
+    """Decorator timing every call of the function as the span name"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with TIMINGS.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def start_profiling(profile=False, trace_memory=False, prefix=PROFILE_PREFIX):
+    """Start profiling the run, returns the function finishing it
+
+    With profile, the run is profiled with cProfile and the spans are
+    traced, the finish writes PREFIX.prof (see pstats) and
+    PREFIX.trace.json. With trace_memory, tracemalloc traces the run and
+    the finish logs the memory peak of every span.
+    """
+
+    profiler = None
+    if profile:
+        TIMINGS.trace = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if trace_memory:
+        tracemalloc.start()
+
+    def finish():
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(f"{prefix}.prof")
+            TIMINGS.write_trace(f"{prefix}.trace.json")
+            TIMINGS.trace = False
+            TIMINGS.events = []
+            timing_logger.info(
+                f"Profile written to {prefix}.prof and {prefix}.trace.json"
+            )
+        if trace_memory:
+            for line in TIMINGS.summary():
+                timing_logger.info(line)
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            timing_logger.info(f"Traced memory at exit {current / 1024 ** 2:.2f} MB")
+
+    return finish
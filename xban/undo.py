@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Undo and redo of the board edits
+
+The UndoStack observes the BoardData and records every mutation as a
+pair of operations in the journal format (see journal.apply_operation):
+the operation itself and its inverse. Only the changed tiles are
+stored, never a copy of the board, and undoing goes through the
+BoardData methods so only the affected widgets are updated.
+
+The mutations of one user action (a drop removes and inserts tiles)
+belong to one command. They are collected until close is called, the
+board schedules it at the end of the event loop iteration. Consecutive
+keystrokes in the same text (the title, the description or a column
+title) are merged into one command. The recorded text is limited to
+limit bytes, the oldest commands are dropped first.
+
+This module does not import Qt.
+"""
+
+from xban.data import BoardObserver
+from xban.journal import apply_operation
+
+# approximate memory of an operation without its text
+OP_SIZE = 200
+UNDO_LIMIT = 16 * 1024 * 1024
+
+
+def op_size(op):
+    """Approximate memory of an operation in bytes"""
+
+    size = OP_SIZE
+    for value in op.values():
+        if isinstance(value, str):
+            size += len(value)
+        elif isinstance(value, list):
+            size += sum(len(tile) + 50 for tile in value)
+    return size
+
+
+class UndoCommand:
+    """One undoable user action
+
+    redo are the operations in the order they happened, undo their
+    inverses in the same order (they are applied backwards).
+    """
+
+    __slots__ = ("redo", "undo", "size")
+
+    def __init__(self):
+        self.redo = []
+        self.undo = []
+        self.size = 0
+
+    def add(self, redo, undo):
+        self.redo.append(redo)
+        self.undo.append(undo)
+        self.size += op_size(redo) + op_size(undo)
+
+    def merge_key(self):
+        """Target of a typed text change, None if it cannot merge
+
+        The titles and the description are changed on every keystroke,
+        tile edits are only committed when the editor closes.
+        """
+
+        if len(self.redo) != 1:
+            return None
+        op, inverse = self.redo[0], self.undo[0]
+        if op["op"] == "column" and op["title"] != inverse["title"]:
+            return ("column", op["index"])
+        if op["op"] == "board":
+            field = "title" if op["title"] != inverse["title"] else "description"
+            return ("board", field)
+        return None
+
+
+class UndoStack(BoardObserver):
+    """Command stack of a BoardData
+
+    :param data BoardData: the board, the stack registers as observer
+    :param limit int: maximum recorded size in bytes
+    :param schedule: schedule(close) is called with the first mutation
+        of a command, without it close has to be called explicitly
+    """
+
+    def __init__(self, data, limit=UNDO_LIMIT, schedule=None):
+        self.data = data
+        self.limit = limit
+        self.schedule = schedule
+        self.undo_commands = []
+        self.redo_commands = []
+        self.size = 0
+        self.current = None
+        self.merge = True
+        self.applying = False
+        self._before = None
+        data.observers.append(self)
+
+    def record(self, redo, undo):
+        if self.applying:
+            return
+        if self.current is None:
+            self.current = UndoCommand()
+            if self.schedule is not None:
+                self.schedule(self.close)
+        self.current.add(redo, undo)
+
+    def close(self):
+        """Finish the current command and push it on the stack"""
+
+        command, self.current = self.current, None
+        if command is None:
+            return
+        self.redo_commands = []
+        key = command.merge_key()
+        if self.merge and key is not None and self.undo_commands:
+            top = self.undo_commands[-1]
+            if top.merge_key() == key:
+                self.size -= top.size
+                top.redo = command.redo
+                top.size = op_size(top.redo[0]) + op_size(top.undo[0])
+                self.size += top.size
+                return
+        self.merge = True
+        self.undo_commands.append(command)
+        self.size += command.size
+        # drop the oldest commands, the newest one is always kept
+        while self.size > self.limit and len(self.undo_commands) > 1:
+            self.size -= self.undo_commands.pop(0).size
+
+    def _apply(self, ops):
+        self.applying = True
+        try:
+            for op in ops:
+                apply_operation(self.data, op)
+        finally:
+            self.applying = False
+
+    def undo(self):
+        """Undo the last command, returns False if there is none"""
+
+        self.close()
+        if not self.undo_commands:
+            return False
+        command = self.undo_commands.pop()
+        self.size -= command.size
+        self._apply(reversed(command.undo))
+        self.redo_commands.append(command)
+        # the next edit starts a new command
+        self.merge = False
+        return True
+
+    def redo(self):
+        """Redo the last undone command, returns False if there is none"""
+
+        self.close()
+        if not self.redo_commands:
+            return False
+        command = self.redo_commands.pop()
+        self._apply(command.redo)
+        self.undo_commands.append(command)
+        self.size += command.size
+        self.merge = False
+        return True
+
+    def clear(self):
+        self.current = None
+        self.undo_commands = []
+        self.redo_commands = []
+        self.size = 0
+
+    # BoardObserver hooks
+
+    def tiles_inserted(self, col, first, last):
+        tiles = self.data.columns[col].tiles[first : last + 1]
+        self.record(
+            {"op": "insert", "col": col, "row": first, "tiles": tiles},
+            {"op": "remove", "col": col, "first": first, "last": last},
+        )
+
+    def tiles_about_to_be_removed(self, col, first, last):
+        tiles = self.data.columns[col].tiles[first : last + 1]
+        self.record(
+            {"op": "remove", "col": col, "first": first, "last": last},
+            {"op": "insert", "col": col, "row": first, "tiles": tiles},
+        )
+
+    def tile_about_to_be_changed(self, col, row):
+        self._before = self.data.columns[col].tiles[row]
+
+    def tile_changed(self, col, row):
+        text = self.data.columns[col].tiles[row]
+        self.record(
+            {"op": "edit", "col": col, "row": row, "text": text},
+            {"op": "edit", "col": col, "row": row, "text": self._before},
+        )
+
+    def _column(self, index):
+        column = self.data.columns[index]
+        return {
+            "op": "add_column",
+            "index": index,
+            "title": column.title,
+            "color": column.color,
+            "tiles": list(column.tiles),
+        }
+
+    def column_inserted(self, index):
+        self.record(self._column(index), {"op": "remove_column", "index": index})
+
+    def column_about_to_be_removed(self, index):
+        self.record({"op": "remove_column", "index": index}, self._column(index))
+
+    def column_moved(self, src, dst):
+        self.record(
+            {"op": "move_column", "src": src, "dst": dst},
+            {"op": "move_column", "src": dst, "dst": src},
+        )
+
+    def column_about_to_be_changed(self, index):
+        column = self.data.columns[index]
+        self._before = (column.title, column.color)
+
+    def column_changed(self, index):
+        column = self.data.columns[index]
+        title, color = self._before
+        self.record(
+            {"op": "column", "index": index, "title": column.title, "color": column.color},
+            {"op": "column", "index": index, "title": title, "color": color},
+        )
+
+    def board_about_to_be_changed(self):
+        self._before = (self.data.title, self.data.description)
+
+    def board_changed(self):
+        title, description = self._before
+        self.record(
+            {
+                "op": "board",
+                "title": self.data.title,
+                "description": self.data.description,
+            },
+            {"op": "board", "title": title, "description": description},
+        )
@@ -5,16 +5,52 @@
 """This script host some customized utilities"""
 
 
-from PySide6.QtWidgets import QPushButton
-from PySide6.QtCore import QEvent
+import time
+from collections import deque
+from functools import lru_cache
+from PySide6.QtWidgets import (
+    QPushButton,
+    QStyle,
+    QStyleOptionButton,
+    QLabel,
+    QPlainTextEdit,
+)
+from PySide6.QtCore import Qt, QEvent
+from PySide6.QtGui import QColor, QPainter, QPalette, QTextCursor
 import logging
-from PySide6.QtCore import Signal, QThread, QSize
+from PySide6.QtCore import Signal, QObject, QTimer, QPoint, QRect, QSize
+from xban.timing import TIMINGS
+
+
+@lru_cache(maxsize=None)
+def button_colors(default, hover, press):
+    """QColors (text, background) of the button states, shared by buttons
+
+    Each argument is a (text, background) pair of color names.
+    """
+
+    return {
+        state: (QColor(text), QColor(background))
+        for state, (text, background) in zip(
+            ("default", "hover", "press"), (default, hover, press)
+        )
+    }
 
 
 class BanButton(QPushButton):
-    """Custom pushbutton to adjust hover event"""
+    """Custom pushbutton to adjust hover event
+
+    The button paints its rounded background and its text itself with
+    the precomputed colors of its state. A state change only repaints
+    the button, the style sheet is not set again (which would parse it
+    and polish the button on every hover). A button opening a menu
+    paints the menu indicator in its bottom right corner.
+    """
 
-    sizeSig = Signal(QSize)
+    # corner radius of the background, as the style sheet border-radius
+    radius = 5
+    # offset of the menu indicator from the corner, none while pressed
+    indicator_offset = 4
 
     def __init__(self, *args, **kwargs):
         """Assign hover color and event filter
@@ -24,6 +60,7 @@ class BanButton(QPushButton):
         :param color list of tuples: first tuple is the hover colors and
             second is the press colors.
             The behavior is after pressed the color return to before.
+        :param indicator bool: paint a menu indicator
         """
 
         hover, press = kwargs.pop("color", []) or [
@@ -31,14 +68,17 @@ class BanButton(QPushButton):
             ("white", "grey"),
         ]
         default_color = kwargs.pop("default_color", []) or ("grey", "white")
-        style_format = "QPushButton {{color: {}; background-color: {};}}"
-        self.default_c = style_format.format(*default_color)
-        self.hover_c = style_format.format(*hover)
-        self.press_c = style_format.format(*press)
+        self.indicator = kwargs.pop("indicator", False)
+        self.colors = button_colors(tuple(default_color), tuple(hover), tuple(press))
+        self.state = "default"
 
         super().__init__(*args, **kwargs)
         self.installEventFilter(self)
-        self.setStyleSheet(self.default_c)
+
+    def set_state(self, state):
+        if state != self.state:
+            self.state = state
+            self.update()
 
     def eventFilter(self, object, event):
         """Workaround for hover event painting
@@ -52,51 +92,248 @@ class BanButton(QPushButton):
         """
 
         if event.type() == QEvent.HoverEnter:
-            self.setStyleSheet(self.hover_c)
+            self.set_state("hover")
 
         elif event.type() == QEvent.HoverLeave:
-            self.setStyleSheet(self.default_c)
+            self.set_state("default")
 
         elif event.type() == QEvent.MouseButtonPress:
-            self.setStyleSheet(self.press_c)
+            self.set_state("press")
 
         elif event.type() == QEvent.MouseButtonRelease:
-            self.setStyleSheet(self.default_c)
+            self.set_state("default")
 
         return super().eventFilter(object, event)
 
-    def resizeEvent(self, event):
-        """add resize event to change the broadcast the size change
+    def paintEvent(self, event):
+        """Paint the background and the text in the colors of the state
 
-        THIs is used for resize the menu for color menu
+        The margins, paddings and font still come from the style sheet.
         """
-        super().resizeEvent(event)
-        self.sizeSig.emit(self.size())
 
+        option = QStyleOptionButton()
+        self.initStyleOption(option)
+        style = self.style()
+        bevel = style.subElementRect(QStyle.SE_PushButtonBevel, option, self)
+        contents = style.subElementRect(QStyle.SE_PushButtonContents, option, self)
+        color, background = self.colors[self.state]
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(background)
+        painter.drawRoundedRect(bevel, self.radius, self.radius)
+        painter.setPen(color)
+        painter.drawText(contents, Qt.AlignCenter | Qt.TextShowMnemonic, self.text())
+
+        if self.indicator:
+            size = style.pixelMetric(QStyle.PM_MenuButtonIndicator, option, self)
+            offset = 0 if self.state == "press" else self.indicator_offset
+            corner = bevel.bottomRight() - QPoint(size + offset, size + offset)
+            option.rect = QRect(corner, QSize(size, size))
+            option.palette.setColor(QPalette.ButtonText, color)
+            option.palette.setColor(QPalette.WindowText, color)
+            style.drawPrimitive(QStyle.PE_IndicatorArrowDown, option, painter, self)
+
+
+class TimingLabel(QLabel):
+    """Status bar summary of the last load, draw and save times
 
-class QLogSignal(QThread):
-    """Qt signal for logging
-    To create a thread safe logging, need to use signal-slot to pass the
-    logging and formatting message
+    The label listens to the spans of xban.timing. The saves finish in
+    a worker thread, the text is updated on the GUI thread through the
+    queued timed signal. detach stops listening.
     """
 
-    log_msg = Signal(str)
+    timed = Signal(str, float)
 
-    def __init__(self, parent=None):
+    # span name -> label of the phase
+    phases = {"process_yaml": "load", "draw_board": "draw", "save_yaml": "save"}
+
+    def __init__(self, timings=TIMINGS, parent=None):
         super().__init__(parent)
+        self.timings = timings
+        self.times = {}
+        for name in self.phases:
+            seconds = timings.last(name)
+            if seconds is not None:
+                self.times[name] = seconds
+        self.setToolTip("last load, draw and save times")
+        self.timed.connect(self.update_time)
+        timings.listeners.append(self.listen)
+        self.update_text()
+
+    def listen(self, name, seconds):
+        if name in self.phases:
+            self.timed.emit(name, seconds)
+
+    def update_time(self, name, seconds):
+        self.times[name] = seconds
+        self.update_text()
+
+    def update_text(self):
+        self.setText(
+            "  ".join(
+                f"{label} {self.times[name] * 1000:.1f} ms"
+                for name, label in self.phases.items()
+                if name in self.times
+            )
+        )
+
+    def detach(self):
+        if self.listen in self.timings.listeners:
+            self.timings.listeners.remove(self.listen)
+
+
+def coalesce(records, count=None):
+    """Status message of a batch of (level, message) records
+
+    The most severe record is shown, the latest one among equally
+    severe records. Its repeats are counted, the other records of the
+    batch (count records in total, some may have been dropped) are
+    summarized by their number.
+    """
+
+    level, message = max(reversed(records), key=lambda record: record[0])
+    repeats = sum(1 for record in records if record[1] == message)
+    others = (count or len(records)) - repeats
+    text = message if repeats == 1 else f"{message} (x{repeats})"
+    if others > 0:
+        text += f" (+{others} more)"
+    return level, text
+
+
+class QLogSignal(QObject):
+    """Qt signals of the QLogHandler
+
+    pending is emitted once for the first record buffered after a
+    delivery, from the thread of the record. The queued connection
+    schedules the delivery on the thread of the handler. log_msg carries
+    the coalesced status message and its timeout in ms, records the
+    delivered (level, message) records.
+    """
+
+    pending = Signal()
+    log_msg = Signal(str, int)
+    records = Signal(list)
 
 
 class QLogHandler(logging.Handler):
-    """Custom handler to stream log to QTextEdit
-    To have a thread safe to exit, need to define parent of the signal
-    thread, here passed as the parent parameters.
+    """Logging handler delivering the records to the GUI in batches
+
+    emit only buffers the record, it is safe to call from any thread.
+    The buffered records are delivered at most every interval seconds
+    on the GUI thread: a burst of records becomes a single status
+    message (see coalesce), shown for the timeout of its level. A less
+    severe message does not replace a more severe one that is still
+    shown. The last capacity records are kept in history for the
+    LogPanel.
     """
 
+    # seconds between two deliveries
+    interval = 0.25
+    # records kept in the history and buffered between deliveries
+    capacity = 1000
+    # ms the status message is shown, by minimum level
+    timeouts = ((logging.ERROR, 5000), (logging.WARNING, 3000), (0, 1500))
+
     def __init__(self, parent=None):
         super().__init__()
         self.signal = QLogSignal(parent)
+        self.history = deque(maxlen=self.capacity)
+        self._pending = deque(maxlen=self.capacity)
+        self._count = 0
+        self._scheduled = False
+        self._last = float("-inf")
+        self._shown = (0, float("-inf"))
+        self.timer = QTimer(self.signal, singleShot=True)
+        self.timer.timeout.connect(self.deliver)
+        self.signal.pending.connect(self.schedule, Qt.QueuedConnection)
 
     def emit(self, record):
-        """Emit colored log record"""
-        msg = self.format(record)
-        self.signal.log_msg.emit(msg)
+        """Buffer the record, called with the handler lock held"""
+
+        try:
+            entry = (record.levelno, self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+        self.history.append(entry)
+        self._pending.append(entry)
+        self._count += 1
+        if not self._scheduled:
+            self._scheduled = True
+            self.signal.pending.emit()
+
+    def schedule(self):
+        """Deliver interval seconds after the last delivery"""
+
+        delay = self._last + self.interval - time.perf_counter()
+        self.timer.start(int(max(0.0, delay) * 1000))
+
+    def timeout(self, level):
+        return next(ms for minimum, ms in self.timeouts if level >= minimum)
+
+    def deliver(self):
+        """Show the buffered records, on the GUI thread"""
+
+        self.acquire()
+        try:
+            records = list(self._pending)
+            count = self._count
+            self._pending.clear()
+            self._count = 0
+            self._scheduled = False
+        finally:
+            self.release()
+        now = time.perf_counter()
+        self._last = now
+        if not records:
+            return
+
+        level, message = coalesce(records, count)
+        shown_level, shown_until = self._shown
+        if level >= shown_level or now >= shown_until:
+            timeout = self.timeout(level)
+            self._shown = (level, now + timeout / 1000)
+            self.signal.log_msg.emit(message, timeout)
+        self.signal.records.emit(records)
+
+    def entries(self):
+        """Copy of the history, safe against concurrent records"""
+
+        self.acquire()
+        try:
+            return list(self.history)
+        finally:
+            self.release()
+
+
+class LogPanel(QPlainTextEdit):
+    """Read-only view of the log history of a QLogHandler
+
+    The panel keeps at most the capacity of the handler history. It
+    follows the delivered records while it is visible and reloads the
+    history when it is shown again.
+    """
+
+    def __init__(self, handler, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.setReadOnly(True)
+        self.setObjectName("logPanel")
+        self.setMaximumBlockCount(handler.capacity)
+        handler.signal.records.connect(self.append_records)
+
+    @staticmethod
+    def line(record):
+        level, message = record
+        return f"{logging.getLevelName(level):<8} {message}"
+
+    def append_records(self, records):
+        if self.isVisible():
+            self.appendPlainText("\n".join(self.line(record) for record in records))
+
+    def showEvent(self, event):
+        self.setPlainText("\n".join(self.line(r) for r in self.handler.entries()))
+        self.moveCursor(QTextCursor.End)
+        super().showEvent(event)
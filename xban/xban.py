@@ -2,10 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
+import json
 import click
 import logging
-from xban.mainwindow import main_app
-from xban.io import process_yaml
+from xban.io import process_yaml, check_content, dump_yaml, structure_problems
+from xban.cache import ParseCache
+from xban.style import RENDER_MODES
+from xban.timing import start_profiling, PROFILE_PREFIX
 
 
 cli_logger = logging.getLogger("xban-cli")
@@ -15,19 +19,56 @@ BASE_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "files")
 
 
 """The command line interface, the handler is called from setup.py
+
+Only the open command imports Qt (xban.mainwindow), the headless
+commands only need the yaml processing and start much faster.
 """
 
-@click.command()
+
+class XbanGroup(click.Group):
+    """Command group that opens the file if no command is given
+
+    `xban FILEPATH` is the same as `xban open FILEPATH`
+    """
+
+    default_command = "open"
+
+    def parse_args(self, ctx, args):
+        for i, arg in enumerate(args):
+            if arg.startswith("-"):
+                continue
+            if arg not in self.commands:
+                args.insert(i, self.default_command)
+            break
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=XbanGroup)
 @click.option(
     "-d/ ", "--debug", is_flag=True, default=False, help="Toggle debug mode"
 )
-@click.argument("filepath", type=click.Path(resolve_path=True))
-def cli(debug, filepath):
-
-    """FILEPATH should be a valid filepath with correct extension
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Use the cache of the parsed yaml files",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help=f"Write a cProfile dump ({PROFILE_PREFIX}.prof) and a Chrome trace "
+    f"({PROFILE_PREFIX}.trace.json) of the run to the current directory",
+)
+@click.option(
+    "--trace-memory",
+    is_flag=True,
+    help="Log the timings and memory peaks of the load, draw and save phases",
+)
+@click.pass_context
+def cli(ctx, debug, cache, profile, trace_memory):
+    """Offline personal kanban work-flow
 
-    xBan renders if the input file is a valid format,
-    or asks to create a new file if does not exist
+    Run `xban FILEPATH` to open a board, the other commands
+    do not start the GUI
     """
 
     root_logger = logging.getLogger()
@@ -36,25 +77,208 @@ def cli(debug, filepath):
         root_logger.setLevel(logging.DEBUG)
     else:
         root_logger.setLevel(logging.INFO)
+    ctx.obj = ParseCache() if cache else None
+    if profile or trace_memory:
+        ctx.call_on_close(start_profiling(profile, trace_memory))
+
+
+@cli.command("open")
+@click.option(
+    "--autosave",
+    default=2.0,
+    show_default=True,
+    help="Seconds without edits before saving, 0 disables autosave",
+)
+@click.option(
+    "--autosave-max",
+    default=30.0,
+    show_default=True,
+    help="Maximum seconds an edit stays unsaved",
+)
+@click.option(
+    "--multi-select",
+    is_flag=True,
+    help="Select tiles in several columns and drag them together",
+)
+@click.option(
+    "--render",
+    type=click.Choice(RENDER_MODES),
+    help="Shadow rendering, performance paints cached shadows and flat none "
+    "[default: render of the board config, else auto]",
+)
+@click.argument("filepath", type=click.Path(resolve_path=True))
+@click.pass_obj
+def open_board(cache, autosave, autosave_max, multi_select, render, filepath):
+
+    """Open the board at FILEPATH
+
+    FILEPATH should be a valid filepath with correct extension
+
+    xBan renders if the input file is a valid format,
+    or asks to create a new file if does not exist
+    """
+
+    options = {
+        "autosave": autosave,
+        "autosave_max": autosave_max,
+        "multi_select": multi_select,
+        "render": render,
+    }
 
     # check filepath
 
     file_dir, filename = os.path.split(filepath)
     if os.path.isfile(filepath):
-        file_config = process_yaml(filepath)
+        file_config = process_yaml(filepath, cache, replay=True)
 
         if file_config:
-            main_app(BASE_PATH, filepath, file_config)
+            main_app(filepath, file_config, **options)
         else:
             cli_logger.error(f'{file_dir} is not a valid ymal file')
 
-    elif not file_dir:
+    elif not os.path.isdir(file_dir):
         cli_logger.error(f"directory {file_dir} does not exist")
-    
+
     # create new file if does not exist
     elif click.confirm(f'{filepath} does not exist, create?'):
 
         with open(filepath, "w+"):
             pass
         file_config = process_yaml(filepath)
-        main_app(BASE_PATH, filepath, file_config)
+        main_app(filepath, file_config, **options)
+
+
+def main_app(filepath, file_config, **options):
+    """Start the GUI, Qt is only imported here"""
+
+    from xban.mainwindow import main_app
+
+    main_app(BASE_PATH, filepath, file_config, **options)
+
+
+def load(filepath, cache):
+    """Process the file, exit with an error if it is not a valid board"""
+
+    file_config = process_yaml(filepath, cache)
+    if not file_config:
+        raise click.ClickException(f"{filepath} is not a valid xban file")
+    problems = structure_problems(file_config)
+    if problems:
+        raise click.ClickException(f"{filepath}: {'; '.join(problems)}")
+    return file_config
+
+
+@cli.command()
+@click.argument(
+    "filepaths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option("-q", "--quiet", is_flag=True, help="Only report the invalid files")
+@click.pass_obj
+def validate(cache, filepaths, quiet):
+    """Check that FILEPATHS are valid xban files
+
+    Exits with 1 if any file is invalid
+    """
+
+    invalid = 0
+    for filepath in filepaths:
+        file_config = process_yaml(filepath, cache)
+        if not file_config:
+            problems = ["invalid yaml or xban format"]
+        else:
+            problems = check_content(file_config)
+        if problems:
+            invalid += 1
+            click.echo(f"FAIL {filepath}: {'; '.join(problems)}")
+        elif not quiet:
+            click.echo(f"OK   {filepath}")
+    if not quiet or invalid:
+        click.echo(f"{len(filepaths) - invalid} valid, {invalid} invalid")
+    sys.exit(1 if invalid else 0)
+
+
+@cli.command()
+@click.argument("filepath", type=click.Path(exists=True, dir_okay=False))
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+@click.pass_obj
+def stats(cache, filepath, as_json):
+    """Show the columns and tile counts of FILEPATH"""
+
+    config, content = load(filepath, cache)
+    xban_config = config["xban_config"]
+    colors = xban_config.get("board_color") or []
+    columns = [
+        {
+            "title": str(title),
+            "color": colors[i] if i < len(colors) else "black",
+            "tiles": len(tiles or ()),
+            "characters": sum(len(str(tile)) for tile in tiles or ()),
+        }
+        for i, (title, tiles) in enumerate(content.items())
+    ]
+    result = {
+        "title": str(xban_config.get("title") or ""),
+        "columns": len(columns),
+        "tiles": sum(column["tiles"] for column in columns),
+        "characters": sum(column["characters"] for column in columns),
+        "size": os.path.getsize(filepath),
+        "column_stats": columns,
+    }
+    if as_json:
+        click.echo(json.dumps(result, indent=2, ensure_ascii=False))
+        return
+
+    click.echo(f"{result['title']}: {result['columns']} columns, {result['tiles']} tiles")
+    for column in columns:
+        click.echo(f"  {column['title']} ({column['color']}): {column['tiles']} tiles")
+
+
+@cli.command()
+@click.argument("filepath", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(["yaml", "json"]),
+    default="yaml",
+    show_default=True,
+)
+@click.pass_obj
+def dump(cache, filepath, fmt):
+    """Print the processed content of FILEPATH
+
+    Plain yaml files are printed with the xban configuration added
+    """
+
+    file_config = load(filepath, cache)
+    if fmt == "json":
+        click.echo(json.dumps(file_config, indent=2, ensure_ascii=False, default=str))
+    else:
+        click.echo(dump_yaml(file_config), nl=False)
+
+
+@cli.command()
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "-j", "--jobs", type=int, default=None, help="Worker processes [default: cores]"
+)
+@click.option(
+    "--slowest", default=10, show_default=True, help="Number of slowest files reported"
+)
+@click.option("-q", "--quiet", is_flag=True, help="Only report the invalid files")
+def check(paths, jobs, slowest, quiet):
+    """Check all boards of PATHS in parallel
+
+    Directories are searched for .yaml and .yml files. Every file
+    result and the final summary are printed as JSON lines, exits
+    with 1 if any file is invalid
+    """
+
+    from xban.check import find_boards, check_files, Summary
+
+    summary = Summary(slowest)
+    for result in check_files(find_boards(paths), jobs):
+        summary.add(result)
+        if not quiet or not result["valid"]:
+            click.echo(json.dumps({"type": "file", **result}, ensure_ascii=False))
+    click.echo(json.dumps({"type": "summary", **summary.as_dict()}, ensure_ascii=False))
+    sys.exit(1 if summary.invalid else 0)